@@ -9,6 +9,9 @@ import sys
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent))
 
+from src.config.env import GEMINI_API_KEY, GENAI_WARMUP
+from src.services.client_registry import warm_up_in_background
+
 # Page configuration
 st.set_page_config(
     page_title="AI Auto-Creative Engine",
@@ -39,6 +42,10 @@ from webapp.ui import (
 def main():
     """Main application function."""
     
+    # Open Gemini connections once per server process
+    if GENAI_WARMUP and GEMINI_API_KEY:
+        warm_up_in_background(GEMINI_API_KEY)
+    
     render_header()
 
     # Sidebar + session state
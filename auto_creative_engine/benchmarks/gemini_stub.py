@@ -0,0 +1,213 @@
+"""
+Local HTTP stand-in for the Gemini text and Imagen REST endpoints.
+
+Speaks enough of the ``v1beta`` API for the Gen AI SDK pointed at it with
+``base_url``: ``generateContent``, ``streamGenerateContent`` (SSE),
+``predict`` for Imagen and model lookups. Responses come from the mock
+backends, and latency, 429s and timeouts from the same fault injector.
+
+    python benchmarks/gemini_stub.py --port 8765 --latency-scale 0.5
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import multiprocessing
+import re
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.config.settings import MockBackendConfig
+from src.image_gen.mock_backend import ASPECT_SIZES, encode_synthetic_image
+from src.llm.mock_backend import MockTextBackend
+from src.services.fault_injection import FaultInjector, MockAPIError
+
+ROUTE = re.compile(r"^/[^/]+/models/([^/:?]+)(?::(\w+))?")
+
+
+class StubState:
+    """Mock text backend and per-endpoint fault injectors shared by all handler threads."""
+
+    def __init__(self, config: MockBackendConfig):
+        self.config = config
+        self.text = MockTextBackend(config)
+        self.image_faults = FaultInjector(
+            latency=config.image_latency,
+            rate_limit_rate=config.rate_limit_rate,
+            timeout_rate=config.timeout_rate,
+            timeout_seconds=config.timeout_seconds,
+            latency_scale=config.latency_scale,
+            seed=config.seed
+        )
+
+
+class GeminiStubHandler(BaseHTTPRequestHandler):
+    """Routes SDK requests to the mock backends."""
+
+    protocol_version = 'HTTP/1.1'
+    state: StubState = None
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, error: Exception) -> None:
+        if isinstance(error, MockAPIError):
+            status, name = error.code, 'RESOURCE_EXHAUSTED'
+            details = [{"@type": "type.googleapis.com/google.rpc.RetryInfo", **(error.details or {})}]
+        else:
+            status, name, details = 504, 'DEADLINE_EXCEEDED', []
+        self._send_json(status, {"error": {"code": status, "message": str(error), "status": name, "details": details}})
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def do_GET(self) -> None:
+        match = ROUTE.match(self.path)
+        if not match:
+            self._send_json(404, {"error": {"code": 404, "message": "Not found", "status": "NOT_FOUND"}})
+            return
+        self._send_json(200, {"name": f"models/{match.group(1)}", "displayName": match.group(1)})
+
+    def do_POST(self) -> None:
+        match = ROUTE.match(self.path)
+        method = match.group(2) if match else None
+        handler = {
+            'generateContent': self._generate_content,
+            'streamGenerateContent': self._stream_generate_content,
+            'predict': self._predict,
+        }.get(method)
+        if handler is None:
+            self._send_json(404, {"error": {"code": 404, "message": f"Unsupported: {self.path}", "status": "NOT_FOUND"}})
+            return
+        try:
+            handler(match.group(1), self._read_json())
+        except (MockAPIError, TimeoutError) as e:
+            self._send_error(e)
+
+    def _text_request(self, body: Dict[str, Any]):
+        contents = "\n".join(
+            part.get('text', '')
+            for content in body.get('contents', [])
+            for part in content.get('parts', [])
+        )
+        schema = (body.get('generationConfig') or {}).get('responseSchema')
+        return contents, schema
+
+    def _text_response(self, model: str, contents: str, text: str) -> Dict[str, Any]:
+        usage = self.state.text.usage(contents, text)
+        return {
+            "candidates": [{"content": {"role": "model", "parts": [{"text": text}]}, "finishReason": "STOP"}],
+            "usageMetadata": {
+                "promptTokenCount": usage.prompt_token_count,
+                "candidatesTokenCount": usage.candidates_token_count,
+                "totalTokenCount": usage.total_token_count,
+            },
+            "modelVersion": model,
+        }
+
+    def _generate_content(self, model: str, body: Dict[str, Any]) -> None:
+        contents, schema = self._text_request(body)
+        self.state.text.faults.apply(f"text:{self.state.text.request_key(model, contents)}")
+        self._send_json(200, self._text_response(model, contents, self.state.text.respond(model, contents, schema)))
+
+    def _stream_generate_content(self, model: str, body: Dict[str, Any]) -> None:
+        contents, schema = self._text_request(body)
+        self.state.text.faults.apply(f"stream:{self.state.text.request_key(model, contents)}")
+        text = self.state.text.respond(model, contents, schema)
+        events = b"".join(
+            b"data: " + json.dumps(self._text_response(model, contents, piece)).encode('utf-8') + b"\r\n\r\n"
+            for piece in re.findall(r"\S+\s*", text) or [text]
+        )
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Content-Length', str(len(events)))
+        self.end_headers()
+        self.wfile.write(events)
+
+    def _predict(self, model: str, body: Dict[str, Any]) -> None:
+        prompt = (body.get('instances') or [{}])[0].get('prompt', '')
+        parameters = body.get('parameters') or {}
+        key = hashlib.sha256(f"{self.state.config.seed}\n{model}\n{prompt}".encode('utf-8')).digest()
+        if parameters.get('seed') is not None:
+            key = hashlib.sha256(key + str(parameters['seed']).encode('ascii')).digest()
+        self.state.image_faults.apply(f"image:{key.hex()}")
+
+        size = ASPECT_SIZES.get(parameters.get('aspectRatio', '1:1'), ASPECT_SIZES['1:1'])
+        options = parameters.get('outputOptions') or {}
+        mime_type = options.get('mimeType', 'image/png')
+        predictions = []
+        for i in range(max(1, int(parameters.get('sampleCount', 1)))):
+            data = encode_synthetic_image(
+                hashlib.sha256(key + bytes([i])).digest(), size, mime_type, options.get('compressionQuality', 75)
+            )
+            predictions.append({"bytesBase64Encoded": base64.b64encode(data).decode('ascii'), "mimeType": mime_type})
+        self._send_json(200, {"predictions": predictions})
+
+
+def make_server(config: Optional[MockBackendConfig] = None, host: str = '127.0.0.1', port: int = 0) -> ThreadingHTTPServer:
+    """Bind a stub server; port 0 picks a free one (see ``server.server_address``)."""
+    handler = type('BoundGeminiStubHandler', (GeminiStubHandler,), {'state': StubState(config or MockBackendConfig())})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def _serve(config: MockBackendConfig, ready) -> None:
+    server = make_server(config)
+    ready.put(server.server_address[1])
+    server.serve_forever()
+
+
+def start_in_process(config: Optional[MockBackendConfig] = None) -> tuple:
+    """Run the stub in a separate process so its CPU never competes with the engine under test.
+
+    Returns ``(process, base_url)``; terminate the process when done.
+    """
+    context = multiprocessing.get_context('spawn')
+    ready = context.Queue()
+    process = context.Process(target=_serve, args=(config or MockBackendConfig(), ready), daemon=True)
+    process.start()
+    port = ready.get(timeout=60)
+    return process, f"http://127.0.0.1:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the Gemini and Imagen endpoints")
+    parser.add_argument("--host", default='127.0.0.1')
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Scale the simulated API latency")
+    parser.add_argument("--429-rate", dest="rate_limit_rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="Fraction of requests answered with 504 after a stall")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = make_server(MockBackendConfig(
+        latency_scale=args.latency_scale,
+        rate_limit_rate=args.rate_limit_rate,
+        timeout_rate=args.timeout_rate,
+        seed=args.seed
+    ), args.host, args.port)
+    print(f"Gemini stand-in listening on http://{args.host}:{server.server_address[1]} (set GEMINI_BASE_URL to use it)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,338 @@
+"""
+Concurrent load test: many campaigns hitting "Generate" at once.
+
+Campaigns arrive at a configurable rate (Poisson, or all at once) and run
+``Orchestrator.run`` on a fixed pool of workers, as sessions of the app
+server would. By default every request goes over HTTP through the Gen AI SDK
+to a local stand-in for the Gemini endpoints, so connection pooling, retries
+and rate limiting are all exercised.
+
+The report covers queueing delay, end-to-end latency, thread and file
+descriptor counts, RSS and error rates. ``--sweep`` repeats the scenario
+over several arrival rates and reports where the configuration saturates.
+
+    python benchmarks/load_test.py --campaigns 30 --arrival-rate 0
+    python benchmarks/load_test.py --workers 8 --sweep 0.05,0.1,0.2,0.5
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.pipeline_throughput import RESULTS_DIR, UNTHROTTLED_QUOTAS, percentile
+
+PRODUCT_DESCRIPTIONS = [
+    "Insulated stainless steel water bottle that keeps drinks cold for 24 hours",
+    "Noise-cancelling wireless earbuds with a 30-hour battery",
+    "Organic cold brew coffee concentrate in a recyclable glass bottle",
+    "Lightweight waterproof trail running shoes",
+    "Plant-based protein bars with no added sugar",
+]
+# Achieved throughput below this share of the offered load means the system is saturated
+SATURATION_RATIO = 0.9
+
+
+def _open_fds() -> Optional[int]:
+    for path in ('/proc/self/fd', '/dev/fd'):
+        try:
+            return len(os.listdir(path))
+        except OSError:
+            continue
+    return None
+
+
+def _rss_mb() -> Optional[float]:
+    try:
+        with open('/proc/self/statm') as f:
+            return round(int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024), 1)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class ResourceSampler:
+    """Samples threads, open file descriptors and RSS on a background thread."""
+
+    def __init__(self, interval: float = 0.25):
+        self.interval = interval
+        self.samples: List[Dict[str, Any]] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="load-test-sampler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.samples.append({"threads": threading.active_count(), "fds": _open_fds(), "rss_mb": _rss_mb()})
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "ResourceSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def summary(self) -> Dict[str, Any]:
+        def _stats(name):
+            values = [s[name] for s in self.samples if s[name] is not None]
+            if not values:
+                return {"peak": None, "mean": None}
+            return {"peak": max(values), "mean": round(sum(values) / len(values), 1)}
+        return {name: _stats(name) for name in ("threads", "fds", "rss_mb")}
+
+
+def arrival_times(count: int, rate: float, seed: int) -> List[float]:
+    """Offsets in seconds of Poisson arrivals at ``rate`` per second; 0 means all at once."""
+    if rate <= 0:
+        return [0.0] * count
+    rng = random.Random(seed)
+    times, now = [], 0.0
+    for _ in range(count):
+        times.append(now)
+        now += rng.expovariate(rate)
+    return times
+
+
+def run_scenario(
+    make_settings: Callable[[], Any],
+    api_key: Optional[str],
+    campaigns: int,
+    creatives: int,
+    arrival_rate: float,
+    workers: int,
+    seed: int
+) -> Dict[str, Any]:
+    """Drive ``campaigns`` concurrent runs and measure how the engine holds up."""
+    from src.pipeline.orchestrator import Orchestrator
+    from src.pipeline.run_manifest import RunManifest
+
+    outcomes: List[Dict[str, Any]] = []
+    lock = threading.Lock()
+    origin = time.perf_counter()
+
+    def _campaign(index: int, arrived: float) -> None:
+        started = time.perf_counter()
+        run_id = f"load_{os.getpid()}_{seed}_{index:03d}"
+        outcome = {"index": index, "queue_delay": started - arrived, "completed": 0, "error": None}
+        try:
+            orchestrator = Orchestrator(settings=make_settings(), api_key=api_key)
+            results = orchestrator.run(
+                PRODUCT_DESCRIPTIONS[index % len(PRODUCT_DESCRIPTIONS)],
+                num_creatives=creatives,
+                brand_name=f"Brand {index}",
+                run_id=run_id,
+                prune_outputs=False
+            )
+            outcome["completed"] = results["count"]
+        except Exception as e:
+            outcome["error"] = f"{type(e).__name__}: {e}"
+        finally:
+            finished = time.perf_counter()
+            outcome.update(service=finished - started, latency=finished - arrived, finished=finished - origin)
+            shutil.rmtree(RunManifest.path_for(run_id).parent, ignore_errors=True)
+            with lock:
+                outcomes.append(outcome)
+
+    with ResourceSampler() as sampler, ThreadPoolExecutor(max_workers=workers, thread_name_prefix="campaign") as pool:
+        for index, offset in enumerate(arrival_times(campaigns, arrival_rate, seed)):
+            delay = origin + offset - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(_campaign, index, time.perf_counter())
+
+    failed_campaigns = sum(1 for o in outcomes if o["error"])
+    completed_creatives = sum(o["completed"] for o in outcomes)
+    span = max((o["finished"] for o in outcomes), default=0.0)
+    queue_delays = [o["queue_delay"] for o in outcomes]
+    latencies = [o["latency"] for o in outcomes if not o["error"]]
+    offered = arrival_rate * 60 if arrival_rate > 0 else None
+    achieved = (len(outcomes) - failed_campaigns) / span * 60 if span > 0 else None
+
+    return {
+        "arrival_rate": arrival_rate,
+        "campaigns": campaigns,
+        "creatives_per_campaign": creatives,
+        "workers": workers,
+        "offered_per_minute": round(offered, 2) if offered else None,
+        "achieved_per_minute": round(achieved, 2) if achieved else None,
+        "wall_seconds": round(span, 3),
+        "queue_delay": {p: _round(percentile(queue_delays, q)) for p, q in (("p50", 50), ("p95", 95), ("max", 100))},
+        "latency": {p: _round(percentile(latencies, q)) for p, q in (("p50", 50), ("p95", 95), ("p99", 99))},
+        "service_p50": _round(percentile([o["service"] for o in outcomes], 50)),
+        "campaign_error_rate": round(failed_campaigns / campaigns, 4) if campaigns else 0.0,
+        "creative_error_rate": round(1 - completed_creatives / (campaigns * creatives), 4) if campaigns else 0.0,
+        "errors": sorted({o["error"] for o in outcomes if o["error"]})[:10],
+        "resources": sampler.summary(),
+    }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 3) if value is not None else None
+
+
+def find_saturation(scenarios: List[Dict[str, Any]], max_queue_delay: float) -> Optional[Dict[str, Any]]:
+    """First arrival rate the configuration could not keep up with, if any."""
+    for scenario in sorted(scenarios, key=lambda s: s["arrival_rate"]):
+        offered, achieved = scenario["offered_per_minute"], scenario["achieved_per_minute"]
+        behind = offered is not None and (achieved or 0) < offered * SATURATION_RATIO
+        queued = (scenario["queue_delay"]["p95"] or 0) > max_queue_delay
+        if behind or queued:
+            return scenario
+    return None
+
+
+def format_scenario_table(scenarios: List[Dict[str, Any]]) -> str:
+    """Plain-text table of load-test scenarios."""
+    header = (
+        f"{'rate/s':>7} {'offered':>8} {'achieved':>9} {'q p95 s':>8} {'lat p50':>8} {'lat p95':>8} "
+        f"{'lat p99':>8} {'err %':>6} {'threads':>8} {'fds':>5} {'rss MB':>7}"
+    )
+    lines = [header, "-" * len(header)]
+
+    def _fmt(value, spec=".1f"):
+        return format(value, spec) if value is not None else "-"
+
+    for s in scenarios:
+        res = s["resources"]
+        lines.append(
+            f"{_fmt(s['arrival_rate'], '.2f'):>7} {_fmt(s['offered_per_minute']):>8} {_fmt(s['achieved_per_minute']):>9} "
+            f"{_fmt(s['queue_delay']['p95'], '.2f'):>8} {_fmt(s['latency']['p50'], '.2f'):>8} "
+            f"{_fmt(s['latency']['p95'], '.2f'):>8} {_fmt(s['latency']['p99'], '.2f'):>8} "
+            f"{s['creative_error_rate'] * 100:>6.1f} {_fmt(res['threads']['peak'], 'd'):>8} "
+            f"{_fmt(res['fds']['peak'], 'd'):>5} {_fmt(res['rss_mb']['peak'], '.0f'):>7}"
+        )
+    return "\n".join(lines)
+
+
+def _float_list(value: str) -> List[float]:
+    return [float(v) for v in value.split(',') if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the engine with many concurrent campaigns")
+    parser.add_argument("--campaigns", type=int, default=30, help="Campaigns per scenario")
+    parser.add_argument("--creatives", type=int, default=4, help="Creatives per campaign")
+    parser.add_argument("--workers", type=int, default=8, help="Campaigns that may run at once")
+    parser.add_argument("--arrival-rate", type=float, default=0.0, help="Campaign arrivals per second (0: all at once)")
+    parser.add_argument("--sweep", type=_float_list, help="Comma-separated arrival rates to find the saturation point")
+    parser.add_argument("--max-queue-delay", type=float, default=10.0, help="p95 queueing delay (s) counted as saturated")
+    parser.add_argument("--image-concurrency", type=int, help="Cap on in-flight image requests across all campaigns")
+    parser.add_argument("--transport", choices=["http", "inprocess"], default="http",
+                        help="'http' goes through the Gen AI SDK to a local stand-in; 'inprocess' uses the mock backend")
+    parser.add_argument("--latency-scale", type=float, default=0.25, help="Scale the simulated API latency (1 is realistic)")
+    parser.add_argument("--429-rate", dest="rate_limit_rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="Fraction of requests that time out")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--respect-quotas", action="store_true", help="Keep the configured Gemini rate limits")
+    parser.add_argument("--output", type=Path, help="Results file (default: data/benchmarks/load_<timestamp>.json)")
+    parser.add_argument("--verbose", action="store_true", help="Show pipeline logs")
+    args = parser.parse_args()
+
+    # Quotas, limits and the ledger path are read at import time, so set them before importing the engine
+    if not args.respect_quotas:
+        os.environ.update(UNTHROTTLED_QUOTAS)
+    scratch = Path(tempfile.mkdtemp(prefix='ace-load-'))
+    import src.config.constants as constants
+    constants.USAGE_LEDGER_PATH = scratch / 'usage_ledger.jsonl'
+    if args.image_concurrency:
+        constants.IMAGE_CONCURRENCY_MAX = args.image_concurrency
+
+    import logging
+    from src.config.settings import GenerationSettings, BrandConfig, MockBackendConfig
+    from src.utils.logger import get_logger
+    if not args.verbose:
+        get_logger().setLevel(logging.WARNING)
+
+    mock = MockBackendConfig(
+        latency_scale=args.latency_scale,
+        rate_limit_rate=args.rate_limit_rate,
+        timeout_rate=args.timeout_rate,
+        seed=args.seed
+    )
+    server, base_url, api_key = None, None, None
+    if args.transport == "http":
+        from benchmarks.gemini_stub import start_in_process
+        server, base_url = start_in_process(mock)
+        api_key = "load-test"
+        print(f"Gemini stand-in at {base_url}")
+
+    def make_settings() -> GenerationSettings:
+        settings = GenerationSettings()
+        settings.output_dir = scratch / 'outputs'
+        settings.brand_config = BrandConfig(name='Load Test', theme='modern', tone='professional')
+        settings.llm_config.cache_enabled = False
+        settings.image_config.cache_enabled = False
+        settings.set_backend('gemini' if base_url else 'mock', mock)
+        settings.llm_config.base_url = settings.image_config.base_url = base_url
+        return settings
+
+    scenarios = []
+    try:
+        for rate in args.sweep or [args.arrival_rate]:
+            scenario = run_scenario(
+                make_settings, api_key,
+                campaigns=args.campaigns,
+                creatives=args.creatives,
+                arrival_rate=rate,
+                workers=args.workers,
+                seed=args.seed
+            )
+            scenarios.append(scenario)
+            print(
+                f"rate {rate}/s: {scenario['achieved_per_minute']} campaigns/min, "
+                f"queue p95 {scenario['queue_delay']['p95']}s, latency p95 {scenario['latency']['p95']}s",
+                flush=True
+            )
+    finally:
+        if server is not None:
+            server.terminate()
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    saturation = find_saturation(scenarios, args.max_queue_delay) if args.sweep else None
+    report = {
+        'benchmark': 'load_test',
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'transport': args.transport,
+        'config': {
+            'workers': args.workers,
+            'image_concurrency': args.image_concurrency,
+            'latency_scale': args.latency_scale,
+            'rate_limit_rate': args.rate_limit_rate,
+            'timeout_rate': args.timeout_rate,
+            'respect_quotas': args.respect_quotas,
+            'seed': args.seed,
+        },
+        'scenarios': scenarios,
+        'saturation_rate': saturation["arrival_rate"] if saturation else None,
+    }
+    output = args.output or RESULTS_DIR / f"load_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding='utf-8')
+
+    print()
+    print(format_scenario_table(scenarios))
+    for scenario in scenarios:
+        for error in scenario["errors"]:
+            print(f"  error at {scenario['arrival_rate']}/s: {error}")
+    if args.sweep:
+        if saturation:
+            print(f"\nSaturates at {saturation['arrival_rate']} campaigns/s with {args.workers} workers")
+        else:
+            print(f"\nNo saturation up to {max(args.sweep)} campaigns/s with {args.workers} workers")
+    print(f"Results: {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,279 @@
+"""
+End-to-end throughput benchmark for the generation pipeline.
+
+Runs the real Orchestrator, CreativeEngine and Packager against the offline
+mock backend for every combination of run size and image concurrency, each
+case in a fresh process so peak RSS and CPU time are its own. Results are
+written as JSON; pass an earlier file as ``--baseline`` to flag regressions.
+
+    python benchmarks/pipeline_throughput.py
+    python benchmarks/pipeline_throughput.py --sizes 10,50 --concurrency 8 --baseline data/benchmarks/old.json
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+RESULTS_DIR = ROOT / 'data' / 'benchmarks'
+DEFAULT_SIZES = [1, 10, 50, 500]
+DEFAULT_CONCURRENCY = [4, 16]
+PRODUCT_DESCRIPTION = "Insulated stainless steel water bottle that keeps drinks cold for 24 hours"
+# Quotas high enough that only the pipeline and mock latency limit throughput
+UNTHROTTLED_QUOTAS = {
+    'GEMINI_TEXT_RPM': '1000000',
+    'GEMINI_TEXT_TPM': '0',
+    'GEMINI_IMAGE_RPM': '1000000',
+    'GEMINI_IMAGE_TPM': '0',
+}
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile, or None for no values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def run_case(case: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one benchmark case; called in its own process."""
+    if not case['respect_quotas']:
+        os.environ.update(UNTHROTTLED_QUOTAS)
+
+    # Limits are read when these modules are imported, so configure them first
+    import src.config.constants as constants
+    constants.IMAGE_CONCURRENCY_INITIAL = constants.IMAGE_CONCURRENCY_MAX = case['concurrency']
+
+    import logging
+    from src.config.settings import GenerationSettings, BrandConfig, MockBackendConfig
+    from src.pipeline.orchestrator import Orchestrator
+    from src.pipeline.packager import Packager
+    from src.pipeline.run_manifest import RunManifest
+    from src.utils.logger import get_logger
+
+    if not case['verbose']:
+        get_logger().setLevel(logging.WARNING)
+
+    size = case['size']
+    run_id = f"bench_{size}x{case['concurrency']}_{os.getpid()}"
+    scratch = Path(tempfile.mkdtemp(prefix='ace-bench-'))
+
+    settings = GenerationSettings()
+    settings.output_dir = scratch / 'outputs'
+    settings.num_creatives = size
+    settings.brand_config = BrandConfig(name='Benchmark', theme='modern', tone='professional')
+    # Cached responses would turn repeat runs into cache benchmarks
+    settings.llm_config.cache_enabled = False
+    settings.image_config.cache_enabled = False
+    postprocess = settings.image_config.postprocess
+    postprocess.workers = case['postprocess_workers']
+    if case['enhance']:
+        postprocess.brightness, postprocess.contrast, postprocess.saturation, postprocess.sharpness = constants.ENHANCE_PRESET
+    settings.set_backend('mock', MockBackendConfig(
+        latency_scale=case['latency_scale'],
+        rate_limit_rate=case['rate_limit_rate'],
+        timeout_rate=case['timeout_rate'],
+        seed=case['seed']
+    ))
+
+    finished_at: Dict[int, float] = {}
+
+    def _on_progress(stage: str, index: int, text: str, done: bool) -> None:
+        if done:
+            finished_at[index] = time.perf_counter()
+
+    try:
+        orchestrator = Orchestrator(settings=settings)
+        cpu_started = time.process_time()
+        started = time.perf_counter()
+        results = orchestrator.run(
+            PRODUCT_DESCRIPTION,
+            num_creatives=size,
+            run_id=run_id,
+            prune_outputs=False,
+            progress_callback=_on_progress
+        )
+        generated = time.perf_counter()
+        Packager().create_zip_from_results(results, results['output_dir'], brand_name='Benchmark')
+        wall = time.perf_counter() - started
+        cpu = time.process_time() - cpu_started
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+        shutil.rmtree(RunManifest.path_for(run_id).parent, ignore_errors=True)
+
+    completed = [r for r in results['records'] if r.ok]
+    # A creative is done when the last of its prompt, image and caption lands
+    latencies = [finished_at[r.index] - started for r in completed if r.index in finished_at]
+    return {
+        'size': size,
+        'concurrency': case['concurrency'],
+        'completed': len(completed),
+        'failed': size - len(completed),
+        'wall_seconds': round(wall, 3),
+        'generate_seconds': round(generated - started, 3),
+        'package_seconds': round(wall - (generated - started), 3),
+        'creatives_per_minute': round(len(completed) / wall * 60, 2) if wall > 0 else None,
+        'latency_p50': _round(percentile(latencies, 50)),
+        'latency_p95': _round(percentile(latencies, 95)),
+        'latency_p99': _round(percentile(latencies, 99)),
+        'cpu_seconds': round(cpu, 3),
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 3) if value is not None else None
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=ROOT, capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(cases: List[Dict[str, Any]], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Describe cases whose throughput fell or p95 latency rose by more than ``tolerance``."""
+    previous = {(c['size'], c['concurrency']): c for c in baseline.get('cases', [])}
+    regressions = []
+    for case in cases:
+        old = previous.get((case['size'], case['concurrency']))
+        if not old:
+            continue
+        label = f"{case['size']} creatives @ {case['concurrency']}"
+        if old.get('creatives_per_minute') and case['creatives_per_minute'] is not None:
+            change = case['creatives_per_minute'] / old['creatives_per_minute'] - 1
+            if change < -tolerance:
+                regressions.append(f"{label}: throughput {change:+.1%}")
+        if old.get('latency_p95') and case['latency_p95'] is not None:
+            change = case['latency_p95'] / old['latency_p95'] - 1
+            if change > tolerance:
+                regressions.append(f"{label}: p95 latency {change:+.1%}")
+    return regressions
+
+
+def format_results_table(cases: List[Dict[str, Any]]) -> str:
+    """Plain-text table of benchmark cases."""
+    header = (
+        f"{'size':>6} {'conc':>5} {'ok':>5} {'wall s':>8} {'cr/min':>9} "
+        f"{'p50 s':>7} {'p95 s':>7} {'p99 s':>7} {'cpu s':>7} {'rss MB':>8}"
+    )
+    lines = [header, "-" * len(header)]
+    for c in cases:
+        cells = [c['latency_p50'], c['latency_p95'], c['latency_p99']]
+        p50, p95, p99 = (f"{v:.2f}" if v is not None else "-" for v in cells)
+        rss = f"{c['peak_rss_mb']:.0f}" if c['peak_rss_mb'] is not None else "-"
+        lines.append(
+            f"{c['size']:>6} {c['concurrency']:>5} {c['completed']:>5} {c['wall_seconds']:>8.2f} "
+            f"{c['creatives_per_minute'] or 0:>9.1f} {p50:>7} {p95:>7} {p99:>7} "
+            f"{c['cpu_seconds']:>7.2f} {rss:>8}"
+        )
+    return "\n".join(lines)
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(',') if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark end-to-end pipeline throughput on the mock backend")
+    parser.add_argument("--sizes", type=_int_list, default=DEFAULT_SIZES, help="Comma-separated run sizes")
+    parser.add_argument("--concurrency", type=_int_list, default=DEFAULT_CONCURRENCY, help="Comma-separated image concurrency limits")
+    parser.add_argument("--latency-scale", type=float, default=0.1, help="Scale the mock backend's simulated API latency (1 is realistic)")
+    parser.add_argument("--429-rate", dest="rate_limit_rate", type=float, default=0.0, help="Fraction of calls failing with an injected 429")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="Fraction of calls that time out")
+    parser.add_argument("--seed", type=int, default=0, help="Mock backend seed")
+    parser.add_argument("--respect-quotas", action="store_true", help="Keep the configured Gemini rate limits")
+    parser.add_argument("--enhance", action="store_true", help="Post-process every image with the --enhance preset")
+    parser.add_argument("--postprocess-workers", type=int, default=os.cpu_count() or 1, help="Post-processing processes (0: on request threads)")
+    parser.add_argument("--output", type=Path, help="Results file (default: data/benchmarks/throughput_<timestamp>.json)")
+    parser.add_argument("--baseline", type=Path, help="Earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Allowed relative regression against the baseline")
+    parser.add_argument("--verbose", action="store_true", help="Show pipeline logs")
+    args = parser.parse_args()
+
+    config = {
+        'latency_scale': args.latency_scale,
+        'rate_limit_rate': args.rate_limit_rate,
+        'timeout_rate': args.timeout_rate,
+        'seed': args.seed,
+        'respect_quotas': args.respect_quotas,
+        'enhance': args.enhance,
+        'postprocess_workers': args.postprocess_workers,
+    }
+    cases = []
+    for size in args.sizes:
+        for concurrency in args.concurrency:
+            case = dict(config, size=size, concurrency=concurrency, verbose=args.verbose)
+            # A fresh spawned process per case keeps imports, limiters and peak RSS independent
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+                result = pool.submit(run_case, case).result()
+            cases.append(result)
+            print(
+                f"{size} creatives @ concurrency {concurrency}: "
+                f"{result['creatives_per_minute']} creatives/min, p95 {result['latency_p95']}s",
+                flush=True
+            )
+
+    report = {
+        'benchmark': 'pipeline_throughput',
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'config': config,
+        'cases': cases,
+    }
+    output = args.output or RESULTS_DIR / f"throughput_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding='utf-8')
+
+    print()
+    print(format_results_table(cases))
+    print(f"\nResults: {output}")
+
+    if args.baseline:
+        regressions = compare(cases, json.loads(args.baseline.read_text(encoding='utf-8')), args.tolerance)
+        if regressions:
+            print(f"\nRegressions against {args.baseline}:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == '__main__':
+    main()
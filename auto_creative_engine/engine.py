@@ -10,8 +10,19 @@ import sys
 sys.path.insert(0, str(Path(__file__).parent))
 
 from src.pipeline.orchestrator import Orchestrator
-from src.config.settings import GenerationSettings, BrandConfig
+from src.config.settings import GenerationSettings, BrandConfig, MockBackendConfig
 from src.pipeline.packager import Packager
+from src.pipeline.run_manifest import RunManifest
+from src.pipeline.batch import BatchRunner, Campaign, load_campaigns, format_batch_table
+from src.pipeline.worker import JobWorker
+from src.services.job_queue import JobQueue
+from src.services.naming_service import NamingService
+from src.config.constants import BATCH_MAX_CAMPAIGNS, ENHANCE_PRESET
+from src.config.env import (
+    GENAI_BACKEND, MOCK_LATENCY_SCALE, MOCK_429_RATE, MOCK_TIMEOUT_RATE, MOCK_SEED, POSTPROCESS_WORKERS
+)
+from src.services.usage_meter import format_usage_table
+from src.utils.tracing import Tracer, format_trace_table
 from src.utils.logger import get_logger
 
 logger = get_logger()
@@ -22,11 +33,18 @@ def main():
         description="AI Auto-Creative Engine - Generate ad creatives from product descriptions"
     )
     
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=["generate", "worker"],
+        default="generate",
+        help="'generate' (default) runs now or enqueues; 'worker' drains the job queue"
+    )
+    
     parser.add_argument(
         "--product-description",
         type=str,
-        required=True,
-        help="Description of the product to create ads for"
+        help="Description of the product to create ads for (required unless --resume or --manifest is given)"
     )
     
     parser.add_argument(
@@ -48,6 +66,56 @@ def main():
         help="Number of creatives to generate (default: 10)"
     )
     
+    parser.add_argument(
+        "--variations",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Creatives per prompt, rendered from one image request (max 4; default: 1)"
+    )
+    
+    parser.add_argument(
+        "--num-images",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Images requested per creative; extras are saved as alternates (default: 1)"
+    )
+    
+    parser.add_argument(
+        "--enhance",
+        action="store_true",
+        help="Apply a mild brightness, contrast, saturation and sharpness boost to every image"
+    )
+    
+    parser.add_argument(
+        "--brand-tint",
+        type=float,
+        default=0.0,
+        metavar="INTENSITY",
+        help="Blend the logo's dominant color over every image (0-1; default: 0, off)"
+    )
+    
+    parser.add_argument(
+        "--postprocess-workers",
+        type=int,
+        default=POSTPROCESS_WORKERS,
+        metavar="N",
+        help="Processes for image post-processing; 0 encodes on the request threads"
+    )
+    
+    parser.add_argument(
+        "--hedge",
+        action="store_true",
+        help="Send a duplicate image request when one runs past the usual latency (or set HEDGE_REQUESTS)"
+    )
+    
+    parser.add_argument(
+        "--refresh-cache",
+        action="store_true",
+        help="Ignore cached LLM responses but cache the fresh ones (or set LLM_CACHE_BYPASS)"
+    )
+    
     parser.add_argument(
         "--brand-name",
         type=str,
@@ -63,39 +131,161 @@ def main():
         help="Creative theme (default: modern)"
     )
     
+    parser.add_argument(
+        "--caption-tone",
+        type=str,
+        help="Tone for captions only (default: the brand tone); changing it keeps images"
+    )
+    
+    parser.add_argument(
+        "--from-run",
+        type=str,
+        metavar="RUN_ID",
+        help="Reuse an earlier run's prompts, images and captions wherever their inputs are unchanged"
+    )
+    
     parser.add_argument(
         "--api-key",
         type=str,
         help="Gemini API key (or set GEMINI_API_KEY env var)"
     )
     
+    parser.add_argument(
+        "--backend",
+        choices=["gemini", "mock"],
+        default=GENAI_BACKEND,
+        help="'gemini' calls the live API; 'mock' runs offline with synthetic output (no API key needed)"
+    )
+    
+    parser.add_argument(
+        "--mock-latency-scale",
+        type=float,
+        default=MOCK_LATENCY_SCALE,
+        help="Multiply the mock backend's simulated latencies (0 for none)"
+    )
+    
+    parser.add_argument(
+        "--mock-429-rate",
+        type=float,
+        default=MOCK_429_RATE,
+        help="Fraction of mock calls that fail with an injected 429"
+    )
+    
+    parser.add_argument(
+        "--mock-timeout-rate",
+        type=float,
+        default=MOCK_TIMEOUT_RATE,
+        help="Fraction of mock calls that time out"
+    )
+    
+    parser.add_argument(
+        "--mock-seed",
+        type=int,
+        default=MOCK_SEED,
+        help="Seed for mock output, latencies and injected faults"
+    )
+    
     parser.add_argument(
         "--output-dir",
         type=Path,
-        help="Output directory (default: data/outputs)"
+        help="Root for per-run output workspaces (default: data/outputs)"
+    )
+    
+    parser.add_argument(
+        "--resume",
+        type=str,
+        metavar="RUN_ID",
+        help="Resume an earlier run, regenerating only missing prompts, images and captions"
+    )
+    
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        help="Run every campaign in a .jsonl or .csv manifest; other options act as defaults"
+    )
+    
+    parser.add_argument(
+        "--max-parallel",
+        type=int,
+        default=BATCH_MAX_CAMPAIGNS,
+        help=f"Campaigns to run at once with --manifest (default: {BATCH_MAX_CAMPAIGNS})"
+    )
+    
+    parser.add_argument(
+        "--enqueue",
+        action="store_true",
+        help="Add the product (or every --manifest campaign) to the job queue instead of running it"
+    )
+    
+    parser.add_argument(
+        "--worker-id",
+        type=str,
+        help="Worker name shown in the job queue (default: host:pid)"
+    )
+    
+    parser.add_argument(
+        "--max-jobs",
+        type=int,
+        help="Worker stops after this many jobs"
+    )
+    
+    parser.add_argument(
+        "--exit-when-idle",
+        action="store_true",
+        help="Worker stops once the queue is empty"
     )
     
     args = parser.parse_args()
     
+    if args.resume and (args.manifest or args.enqueue or args.from_run):
+        parser.error("--resume cannot be combined with --manifest, --enqueue or --from-run")
+    if args.from_run and (args.manifest or args.enqueue):
+        parser.error("--from-run applies to a single direct run")
+    if args.command == "generate" and not args.resume and not args.manifest and not args.product_description:
+        parser.error("--product-description is required unless --resume or --manifest is given")
+    
     # Initialize settings
     settings = GenerationSettings()
     settings.num_creatives = args.num_creatives
+    settings.variations_per_prompt = args.variations
+    settings.image_config.num_images = args.num_images
+    postprocess = settings.image_config.postprocess
+    if args.enhance:
+        postprocess.brightness, postprocess.contrast, postprocess.saturation, postprocess.sharpness = ENHANCE_PRESET
+    postprocess.brand_tint = args.brand_tint
+    postprocess.workers = args.postprocess_workers
+    if args.hedge:
+        settings.image_config.hedge_requests = True
+    if args.refresh_cache:
+        settings.llm_config.cache_bypass = True
     settings.brand_config = BrandConfig(
         name=args.brand_name,
         theme=args.theme,
-        tone="professional"
+        tone="professional",
+        caption_tone=args.caption_tone
     )
     
     if args.output_dir:
         settings.output_dir = args.output_dir
     
+    settings.set_backend(args.backend, MockBackendConfig(
+        latency_scale=args.mock_latency_scale,
+        rate_limit_rate=args.mock_429_rate,
+        timeout_rate=args.mock_timeout_rate,
+        seed=args.mock_seed
+    ))
+    
+    if args.command == "generate" and args.enqueue:
+        enqueue_jobs(args)
+        return
+    
     # Get API key
     api_key = args.api_key
     if not api_key:
         from src.config.env import GEMINI_API_KEY
         api_key = GEMINI_API_KEY
     
-    if not api_key:
+    if not api_key and args.backend != "mock":
         logger.error("Gemini API key is required. Provide --api-key or set GEMINI_API_KEY env var.")
         sys.exit(1)
     
@@ -108,39 +298,148 @@ def main():
         logger.error(f"Product image not found: {args.product_image}")
         sys.exit(1)
     
-    # Run generation
+    if args.command == "worker":
+        run_worker(args, settings, api_key)
+        return
+    
+    if args.manifest:
+        run_batch(args, settings, api_key)
+        return
+    
+    # Run generation; the trace covers generation and packaging
+    run_id = args.resume or NamingService().generate_run_id()
+    tracer = Tracer(run_id)
     try:
         logger.info("Starting creative generation...")
         
-        orchestrator = Orchestrator(settings=settings, api_key=api_key)
-        
-        results = orchestrator.run(
-            product_description=args.product_description,
-            logo_path=args.logo,
-            product_image_path=args.product_image,
-            num_creatives=args.num_creatives,
-            brand_name=args.brand_name
-        )
-        
-        # Package results
-        packager = Packager()
-        zip_path = packager.create_zip_from_results(
-            results=results,
-            output_dir=settings.output_dir,
-            brand_name=args.brand_name
-        )
+        with tracer.activate():
+            orchestrator = Orchestrator(settings=settings, api_key=api_key)
+            
+            if args.resume:
+                results = orchestrator.resume(args.resume)
+            else:
+                results = orchestrator.run(
+                    product_description=args.product_description,
+                    logo_path=args.logo,
+                    product_image_path=args.product_image,
+                    num_creatives=args.num_creatives,
+                    brand_name=args.brand_name,
+                    run_id=run_id,
+                    base_run_id=args.from_run
+                )
+            
+            # Package results
+            packager = Packager()
+            zip_path = packager.create_zip_from_results(
+                results=results,
+                output_dir=results["output_dir"],
+                brand_name=settings.brand_config.name
+            )
         
         logger.info(f"✅ Generation complete!")
         logger.info(f"   - Generated {results['count']} images")
         logger.info(f"   - Created {len(results['captions'])} captions")
         logger.info(f"   - ZIP package: {zip_path}")
         
-        print(f"\n✅ Success! Generated {results['count']} creatives.")
+        print(f"\n✅ Success! Generated {results['count']}/{len(results['records'])} creatives.")
+        if results['count'] < len(results['records']):
+            print(f"⚠️  Some creatives failed; retry them with: --resume {results['run_id']}")
         print(f"📦 ZIP package: {zip_path}")
+        print(f"\n💰 Usage for run {results['run_id']} (estimated):")
+        print(format_usage_table(results['usage']))
+        print("\n⏱️  Time by stage:")
+        print(format_trace_table(tracer.summary()))
     
     except Exception as e:
         logger.error(f"Error during generation: {e}")
+        if RunManifest.path_for(run_id).exists():
+            print(f"\n❌ Generation failed; pick up where it stopped with: --resume {run_id}")
+        sys.exit(1)
+    
+    finally:
+        try:
+            print(f"🔍 Trace: {tracer.write(RunManifest.trace_path_for(run_id))}")
+        except OSError as e:
+            logger.warning(f"Could not write trace: {e}")
+
+
+def run_batch(args, settings: GenerationSettings, api_key: str):
+    """Run all campaigns of a manifest in this process and print the batch report."""
+    try:
+        campaigns = load_campaigns(args.manifest)
+    except (OSError, ValueError) as e:
+        logger.error(f"Could not read manifest {args.manifest}: {e}")
+        sys.exit(1)
+    
+    if not campaigns:
+        logger.error(f"Manifest {args.manifest} contains no campaigns")
         sys.exit(1)
+    
+    # Campaigns without their own image paths fall back to the CLI ones
+    for campaign in campaigns:
+        campaign.logo_path = campaign.logo_path or args.logo
+        campaign.product_image_path = campaign.product_image_path or args.product_image
+    
+    runner = BatchRunner(settings, api_key=api_key, max_parallel=args.max_parallel)
+    report = runner.run(campaigns)
+    totals = report["totals"]
+    
+    print(f"\n📋 Batch {report['batch_id']}: {totals['complete']}/{totals['campaigns']} campaigns complete")
+    print(format_batch_table(report))
+    for entry in report["campaigns"]:
+        if entry["status"] != "complete" and RunManifest.path_for(entry["run_id"]).exists():
+            print(f"⚠️  {entry['campaign']}: retry with --resume {entry['run_id']}")
+    print(f"\n📝 Report: {report['report_path']}")
+    
+    if totals["failed"]:
+        sys.exit(1)
+
+
+def enqueue_jobs(args):
+    """Submit the product, or every manifest campaign, as queued jobs for ``engine.py worker``."""
+    if args.manifest:
+        try:
+            campaigns = load_campaigns(args.manifest)
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not read manifest {args.manifest}: {e}")
+            sys.exit(1)
+    else:
+        campaigns = [Campaign(name=args.brand_name, product_description=args.product_description)]
+    
+    queue = JobQueue()
+    naming_service = NamingService()
+    for campaign in campaigns:
+        # Workers may run elsewhere, so bake the CLI defaults, generation options and absolute paths into the job
+        campaign.brand_name = campaign.brand_name or args.brand_name
+        campaign.num_creatives = campaign.num_creatives or args.num_creatives
+        campaign.theme = campaign.theme or args.theme
+        campaign.caption_tone = campaign.caption_tone or args.caption_tone
+        logo = campaign.logo_path or args.logo
+        product_image = campaign.product_image_path or args.product_image
+        campaign.logo_path = logo.resolve() if logo else None
+        campaign.product_image_path = product_image.resolve() if product_image else None
+        campaign.variations = args.variations
+        campaign.num_images = args.num_images
+        campaign.enhance = args.enhance
+        campaign.brand_tint = args.brand_tint
+        campaign.backend = args.backend
+        job_id = queue.submit(campaign.to_payload(), job_id=naming_service.generate_run_id())
+        print(f"📥 Queued {campaign.name} as job {job_id}")
+    
+    print(f"\n{len(campaigns)} jobs queued at {queue.db_path}; start workers with: python engine.py worker")
+
+
+def run_worker(args, settings: GenerationSettings, api_key: str):
+    """Process queued jobs until interrupted, idle or out of --max-jobs."""
+    runner = BatchRunner(settings, api_key=api_key, max_parallel=1)
+    worker = JobWorker(JobQueue(), runner, worker_id=args.worker_id)
+    try:
+        processed = worker.run(max_jobs=args.max_jobs, exit_when_idle=args.exit_when_idle)
+    except KeyboardInterrupt:
+        # The lease of an interrupted job expires and another worker resumes it
+        logger.warning("Worker interrupted")
+        sys.exit(130)
+    print(f"\n✅ Worker {worker.worker_id} processed {processed} jobs")
 
 
 if __name__ == "__main__":
@@ -6,6 +6,8 @@ import streamlit as st
 from pathlib import Path
 import sys
 import time
+import queue
+from concurrent.futures import ThreadPoolExecutor
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -15,10 +17,17 @@ from webapp.ui import (
     render_generation_status,
     render_results_preview,
     render_prompt_caption_panel,
+    render_usage_panel,
 )
 from src.pipeline.orchestrator import Orchestrator
 from src.config.settings import GenerationSettings, BrandConfig
 from src.pipeline.packager import Packager
+from src.pipeline.run_manifest import RunManifest
+from src.pipeline.batch import Campaign
+from src.services.naming_service import NamingService
+from src.services.job_queue import JobQueue, JOB_QUEUED, JOB_DONE, JOB_FAILED
+from src.config.constants import JOB_POLL_INTERVAL
+from src.config.env import GENAI_BACKEND, HEDGE_REQUESTS
 
 # Page config
 st.set_page_config(
@@ -27,6 +36,134 @@ st.set_page_config(
     layout="wide"
 )
 
+
+def run_with_progress(start, num_creatives):
+    """Run ``start(progress_callback)`` in a worker thread, streaming its progress into the page."""
+    render_generation_status("generating")
+    progress_bar = st.progress(0)
+    status_text = st.empty()
+    status_text.text("Generating prompts...")
+    
+    live_cols = st.columns(2)
+    with live_cols[0]:
+        st.markdown("**Prompts (live)**")
+        prompt_box = st.empty()
+    with live_cols[1]:
+        st.markdown("**Captions (live)**")
+        caption_box = st.empty()
+    
+    events = queue.Queue()
+    live = {"prompt": {}, "caption": {}}
+    finished = {"prompt": set(), "image": set(), "caption": set()}
+    
+    def on_progress(stage, index, text, done):
+        events.put((stage, index, text, done))
+    
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(start, on_progress)
+        
+        while True:
+            run_finished = future.done()
+            changed = False
+            while not events.empty():
+                stage, index, text, done = events.get_nowait()
+                if stage in live:
+                    live[stage][index] = text
+                if done:
+                    finished[stage].add(index)
+                changed = True
+            
+            if changed:
+                prompt_box.markdown("\n\n".join(
+                    f"**{i + 1}.** {text}" for i, text in sorted(live["prompt"].items())
+                ))
+                caption_box.markdown("\n\n".join(
+                    f"**{i + 1}.** {text}" for i, text in sorted(live["caption"].items())
+                ))
+                done_count = sum(len(items) for items in finished.values())
+                progress_bar.progress(min(99, int(100 * done_count / (3 * num_creatives))))
+                status_text.text(
+                    f"Prompts {len(finished['prompt'])}/{num_creatives} · "
+                    f"Images {len(finished['image'])}/{num_creatives} · "
+                    f"Captions {len(finished['caption'])}/{num_creatives}"
+                )
+            
+            if run_finished:
+                break
+            time.sleep(0.1)
+        
+        results = future.result()
+    
+    progress_bar.progress(100)
+    status_text.text("Complete!")
+    return results
+
+
+def show_results(results, zip_path):
+    """Store finished results for the download page and preview them."""
+    st.session_state["results"] = results
+    st.session_state["zip_path"] = zip_path
+    st.session_state["last_run_id"] = results["run_id"]
+    
+    render_generation_status("complete")
+    st.success(f"✅ Successfully generated {results['count']} creatives!")
+    if "resume_run_id" in st.session_state:
+        st.warning("Some creatives failed. Use the resume button to retry only those.")
+    
+    # Show preview + details
+    render_results_preview(results)
+    render_prompt_caption_panel(
+        prompts=results.get("prompts"),
+        captions=results.get("captions"),
+    )
+    render_usage_panel(results.get("usage"))
+
+    st.info("Next: head to Step 3 to download your creatives.zip package.")
+    
+    # Navigate to download
+    if st.button("📥 Go to Download", type="primary"):
+        st.switch_page("pages/3_Download_Output.py")
+
+
+def poll_job(job_id):
+    """Show a queued job's progress, rerunning the page until a worker finishes it."""
+    job = JobQueue().get(job_id)
+    if job is None:
+        st.session_state.pop("job_id", None)
+        st.error(f"Job {job_id} is no longer in the queue.")
+        return
+    
+    manifest_exists = RunManifest.path_for(job_id).exists()
+    if not job.finished:
+        render_generation_status("generating")
+        summary = RunManifest.load(job_id).summary() if manifest_exists else None
+        if summary:
+            st.progress(int(100 * summary["completed"] / max(1, summary["total"])))
+        st.info(
+            f"Job `{job_id}` is {job.status}"
+            + (f" (attempt {job.attempts}/{job.max_attempts})" if job.attempts else "")
+            + (f" · {summary['completed']}/{summary['total']} creatives complete" if summary else "")
+            + ". You can leave this page; the run continues in a worker."
+        )
+        if st.button("✖ Cancel job", disabled=job.status != JOB_QUEUED):
+            JobQueue().cancel(job_id)
+            st.session_state.pop("job_id", None)
+            st.rerun()
+        time.sleep(JOB_POLL_INTERVAL)
+        st.rerun()
+    
+    st.session_state.pop("job_id", None)
+    if job.status not in (JOB_DONE, JOB_FAILED) or not manifest_exists:
+        render_generation_status("error")
+        st.error(f"Job {job_id} {job.status}: {job.error or 'no output was produced'}")
+        return
+    
+    if job.status == JOB_FAILED:
+        st.session_state["resume_run_id"] = job_id
+    zip_path = (job.result or {}).get("zip_path")
+    show_results(RunManifest.load(job_id).results(), Path(zip_path) if zip_path else None)
+
+
 # Render UI
 render_header()
 
@@ -45,6 +182,7 @@ api_key = st.session_state.get("api_key", "")
 num_creatives = st.session_state.get("num_creatives", 10)
 brand_name = st.session_state.get("brand_name", "Brand")
 theme = st.session_state.get("theme", "modern")
+caption_tone = st.session_state.get("caption_tone") or None
 
 # Display current settings
 col1, col2, col3 = st.columns(3)
@@ -55,25 +193,75 @@ with col2:
 with col3:
     st.info(f"**Theme:** {theme}")
 
-# API Key input
-if not api_key:
+# API Key input; the offline mock backend (GENAI_BACKEND=mock) needs none
+offline = GENAI_BACKEND == "mock"
+if offline:
+    st.caption("Running on the offline mock backend; output is synthetic.")
+elif not api_key:
     api_key = st.text_input("Gemini API Key", type="password", help="Required for generation")
     if api_key:
         st.session_state["api_key"] = api_key
 
 # Generate button
-if st.button("🚀 Generate Creatives", type="primary", disabled=not api_key):
-    if not api_key:
+background = st.checkbox(
+    "Run in background",
+    help="Queue the run for `python engine.py worker` processes and follow its progress here"
+)
+hedge_requests = st.checkbox(
+    "Hedge slow image requests",
+    value=HEDGE_REQUESTS,
+    help="Send a duplicate request when an image takes longer than usual; uses a little more quota"
+)
+# Reruns after a tweak only regenerate the prompts, images and captions whose inputs changed
+last_run_id = st.session_state.get("last_run_id")
+reuse_last_run = last_run_id is not None and RunManifest.path_for(last_run_id).exists() and st.checkbox(
+    "Reuse unchanged creatives from the previous run",
+    value=True,
+    help="Only prompts, images and captions whose inputs changed are generated again"
+)
+generate_clicked = st.button("🚀 Generate Creatives", type="primary", disabled=not (api_key or offline))
+
+if generate_clicked and background:
+    logo_path = st.session_state.get("logo_path")
+    product_path = st.session_state.get("product_path")
+    campaign = Campaign(
+        name=brand_name,
+        product_description=st.session_state.get("product_description"),
+        brand_name=brand_name,
+        num_creatives=num_creatives,
+        theme=theme,
+        caption_tone=caption_tone,
+        logo_path=Path(logo_path).resolve() if logo_path else None,
+        product_image_path=Path(product_path).resolve() if product_path else None,
+    )
+    st.session_state["job_id"] = JobQueue().submit(campaign.to_payload(), job_id=NamingService().generate_run_id())
+    st.rerun()
+
+if "job_id" in st.session_state:
+    poll_job(st.session_state["job_id"])
+    generate_clicked = False
+
+# A run that failed, stopped early or was interrupted by a rerun can pick up where it left off
+resume_run_id = st.session_state.get("resume_run_id")
+resume_clicked = False
+if resume_run_id and not generate_clicked:
+    st.warning(f"Run `{resume_run_id}` did not finish. Completed creatives are kept on disk.")
+    resume_clicked = st.button(f"🔁 Resume run {resume_run_id}", disabled=not (api_key or offline))
+
+if generate_clicked or resume_clicked:
+    if not (api_key or offline):
         st.error("Please provide a Gemini API key.")
         st.stop()
     
     # Initialize settings
     settings = GenerationSettings()
     settings.num_creatives = num_creatives
+    settings.image_config.hedge_requests = hedge_requests
     settings.brand_config = BrandConfig(
         name=brand_name,
         theme=theme,
-        tone="professional"
+        tone="professional",
+        caption_tone=caption_tone
     )
     
     # Get file paths from session state
@@ -85,64 +273,39 @@ if st.button("🚀 Generate Creatives", type="primary", disabled=not api_key):
     try:
         orchestrator = Orchestrator(settings=settings, api_key=api_key)
         
-        # Show progress
-        render_generation_status("generating")
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        
-        # Generate
-        status_text.text("Initializing...")
-        progress_bar.progress(10)
-        
-        status_text.text("Generating prompts...")
-        progress_bar.progress(30)
-        time.sleep(0.5)
-        
-        status_text.text("Generating images with Gemini Imagen...")
-        progress_bar.progress(50)
-        
-        results = orchestrator.run(
-            product_description=product_description,
-            logo_path=logo_path,
-            product_image_path=product_path,
-            num_creatives=num_creatives,
-            brand_name=brand_name
-        )
+        total = num_creatives
+        if resume_clicked:
+            run_id = resume_run_id
+            total = RunManifest.load(run_id).summary()["total"]
+            start = lambda on_progress: orchestrator.resume(run_id, progress_callback=on_progress)
+        else:
+            run_id = orchestrator.naming_service.generate_run_id()
+            start = lambda on_progress: orchestrator.run(
+                product_description=product_description,
+                logo_path=logo_path,
+                product_image_path=product_path,
+                num_creatives=num_creatives,
+                brand_name=brand_name,
+                progress_callback=on_progress,
+                run_id=run_id,
+                base_run_id=last_run_id if reuse_last_run else None
+            )
         
-        progress_bar.progress(80)
-        status_text.text("Generating captions...")
-        time.sleep(0.5)
+        # Remember the run before it starts so a rerun mid-generation can resume it
+        st.session_state["resume_run_id"] = run_id
+        results = run_with_progress(start, total)
+        if results["count"] == len(results["records"]):
+            st.session_state.pop("resume_run_id", None)
         
         # Package results
         packager = Packager()
         zip_path = packager.create_zip_from_results(
             results=results,
-            output_dir=settings.output_dir,
-            brand_name=brand_name
+            output_dir=results["output_dir"],
+            brand_name=settings.brand_config.name
         )
         
-        progress_bar.progress(100)
-        status_text.text("Complete!")
-        
-        # Store results
-        st.session_state["results"] = results
-        st.session_state["zip_path"] = zip_path
-        
-        render_generation_status("complete")
-        st.success(f"✅ Successfully generated {results['count']} creatives!")
-        
-        # Show preview + details
-        render_results_preview(results)
-        render_prompt_caption_panel(
-            prompts=results.get("prompts"),
-            captions=results.get("captions"),
-        )
-
-        st.info("Next: head to Step 3 to download your creatives.zip package.")
-        
-        # Navigate to download
-        if st.button("📥 Go to Download", type="primary"):
-            st.switch_page("pages/3_Download_Output.py")
+        show_results(results, zip_path)
     
     except Exception as e:
         render_generation_status("error")
@@ -14,6 +14,7 @@ from webapp.ui import (
     render_download_section,
     render_results_preview,
     render_prompt_caption_panel,
+    render_usage_panel,
 )
 
 # Page config
@@ -50,6 +51,9 @@ render_prompt_caption_panel(
     captions=results.get("captions"),
 )
 
+# Token, image and cost usage
+render_usage_panel(results.get("usage"))
+
 # Show mapping info
 if results.get("captions"):
     st.subheader("📋 Caption Mapping")
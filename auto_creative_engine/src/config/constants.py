@@ -10,6 +10,10 @@ DATA_DIR = BASE_DIR / 'data'
 INPUT_DIR = DATA_DIR / 'input'
 OUTPUT_DIR = DATA_DIR / 'outputs'
 TEMP_DIR = DATA_DIR / 'temp'
+CACHE_DIR = DATA_DIR / 'cache'
+METADATA_DIR = DATA_DIR / 'metadata'
+RUNS_DIR = METADATA_DIR / 'runs'
+BATCHES_DIR = METADATA_DIR / 'batches'
 IMAGES_DIR = OUTPUT_DIR / 'images'
 CAPTIONS_DIR = OUTPUT_DIR / 'captions'
 
@@ -21,6 +25,20 @@ MIN_NUM_CREATIVES = 1
 # Image dimensions
 DEFAULT_IMAGE_SIZE = (1024, 1024)
 IMAGEN_ASPECT_RATIOS = ['1:1', '16:9', '9:16', '4:3', '3:4']
+IMAGEN_MODEL = 'imagen-4.0-generate-001'
+# Most images Imagen returns for one prompt in a single request
+IMAGEN_MAX_IMAGES_PER_REQUEST = 4
+
+# Adaptive image request concurrency (AIMD)
+IMAGE_CONCURRENCY_INITIAL = 4
+IMAGE_CONCURRENCY_MIN = 1
+IMAGE_CONCURRENCY_MAX = 16
+
+# Hedged image requests
+HEDGE_PERCENTILE = 0.95
+HEDGE_MAX_RATIO = 0.1
+HEDGE_MIN_SAMPLES = 10
+HEDGE_MIN_DELAY = 5.0
 
 # Supported image formats
 SUPPORTED_IMAGE_FORMATS = ['.jpg', '.jpeg', '.png', '.webp']
@@ -30,6 +48,64 @@ OUTPUT_IMAGE_QUALITY = 95
 # API settings
 GEMINI_MAX_RETRIES = 3
 GEMINI_TIMEOUT = 120
+GEMINI_CALL_DEADLINE = 300
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+
+# Shared HTTP connection pool
+HTTP_MAX_CONNECTIONS = 32
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 16
+HTTP_KEEPALIVE_EXPIRY = 60.0
+
+# Per-run output workspaces
+OUTPUT_RETENTION_RUNS = 20
+OUTPUT_RETENTION_DAYS = 7
+
+# Pipeline stage scheduling
+PIPELINE_MAX_WORKERS = 32
+# Fewest pipeline workers a campaign gets in batch mode; bounds how many campaigns run at once
+PIPELINE_MIN_WORKERS = 4
+
+# Image post-processing; the --enhance preset (brightness, contrast, saturation, sharpness)
+ENHANCE_PRESET = (1.03, 1.08, 1.1, 1.3)
+
+# Multi-campaign batch mode
+BATCH_MAX_CAMPAIGNS = 4
+
+# Durable job queue and workers
+JOB_LEASE_SECONDS = 120
+JOB_HEARTBEAT_SECONDS = 30
+JOB_MAX_ATTEMPTS = 3
+JOB_POLL_INTERVAL = 2.0
+JOB_RETRY_BASE_DELAY = 30.0
+JOB_RETRY_MAX_DELAY = 600.0
+
+# Batched LLM generation
+PROMPT_BATCH_RETRIES = 2
+LLM_BATCH_MAX_TOKENS = 8192
+CAPTION_BATCH_SIZE = 12
+
+# LLM response cache
+LLM_CACHE_PATH = CACHE_DIR / 'llm_responses.sqlite3'
+LLM_CACHE_TTL_SECONDS = 7 * 24 * 3600
+LLM_CACHE_MAX_BYTES = 64 * 1024 * 1024
+LLM_CACHE_MAX_ENTRIES = 20000
+
+# Generated image cache
+IMAGE_CACHE_DIR = CACHE_DIR / 'images'
+IMAGE_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+IMAGE_CACHE_MAX_ENTRIES = 5000
+
+# Usage metering (list prices in USD, used for cost estimates only)
+USAGE_LEDGER_PATH = METADATA_DIR / 'usage_ledger.jsonl'
+MODEL_PRICING = {
+    'gemini-2.5-flash': {'input_per_1m': 0.30, 'output_per_1m': 2.50},
+    'gemini-2.5-pro': {'input_per_1m': 1.25, 'output_per_1m': 10.00},
+    'gemini-2.0-flash': {'input_per_1m': 0.10, 'output_per_1m': 0.40},
+    'imagen-4.0-generate-001': {'per_image': 0.04},
+    'imagen-4.0-fast-generate-001': {'per_image': 0.02},
+    'imagen-4.0-ultra-generate-001': {'per_image': 0.06},
+}
 
 # Brand color extraction
 DEFAULT_COLOR_COUNT = 5
@@ -7,7 +7,7 @@ from pathlib import Path
 from typing import Optional
 from dotenv import load_dotenv
 
-from .constants import BASE_DIR
+from .constants import BASE_DIR, METADATA_DIR
 
 # Load .env file if it exists
 env_path = BASE_DIR / '.env'
@@ -62,5 +62,45 @@ DEFAULT_IMAGE_MODEL = EnvConfig.get('DEFAULT_IMAGE_MODEL', 'imagen3')
 DEFAULT_NUM_CREATIVES = EnvConfig.get_int('DEFAULT_NUM_CREATIVES', 10)
 MAX_IMAGE_SIZE = EnvConfig.get_int('MAX_IMAGE_SIZE', 2048)
 
+# Gemini quotas (requests / tokens per minute)
+GEMINI_TEXT_RPM = EnvConfig.get_int('GEMINI_TEXT_RPM', 1000)
+GEMINI_TEXT_TPM = EnvConfig.get_int('GEMINI_TEXT_TPM', 1000000)
+GEMINI_IMAGE_RPM = EnvConfig.get_int('GEMINI_IMAGE_RPM', 20)
+GEMINI_IMAGE_TPM = EnvConfig.get_int('GEMINI_IMAGE_TPM', 0)
+
+# Caching
+LLM_CACHE_ENABLED = EnvConfig.get_bool('LLM_CACHE_ENABLED', True)
+# Skip cached LLM responses but store the fresh ones
+LLM_CACHE_BYPASS = EnvConfig.get_bool('LLM_CACHE_BYPASS', False)
+IMAGE_CACHE_ENABLED = EnvConfig.get_bool('IMAGE_CACHE_ENABLED', True)
+
+# Hedge slow image requests with a duplicate once they pass the latency percentile
+HEDGE_REQUESTS = EnvConfig.get_bool('HEDGE_REQUESTS', False)
+
+# Job queue; point several machines at one database on a shared volume and disable WAL there
+JOB_QUEUE_PATH = Path(EnvConfig.get('JOB_QUEUE_PATH', str(METADATA_DIR / 'jobs.sqlite3')))
+JOB_QUEUE_WAL = EnvConfig.get_bool('JOB_QUEUE_WAL', True)
+
+# Generation backend: 'gemini' for the live API, 'mock' to run offline
+GENAI_BACKEND = EnvConfig.get('GENAI_BACKEND', 'gemini')
+
+# Alternate Gemini endpoint, e.g. a gateway or the load-test stand-in
+GEMINI_BASE_URL = EnvConfig.get('GEMINI_BASE_URL')
+
+# Mock backend latency (none, fixed:S, uniform:LOW:HIGH or lognormal:MEDIAN:SIGMA, in seconds) and faults
+MOCK_TEXT_LATENCY = EnvConfig.get('MOCK_TEXT_LATENCY', 'lognormal:0.8:0.4')
+MOCK_IMAGE_LATENCY = EnvConfig.get('MOCK_IMAGE_LATENCY', 'lognormal:4.0:0.3')
+MOCK_LATENCY_SCALE = EnvConfig.get_float('MOCK_LATENCY_SCALE', 1.0)
+MOCK_429_RATE = EnvConfig.get_float('MOCK_429_RATE', 0.0)
+MOCK_TIMEOUT_RATE = EnvConfig.get_float('MOCK_TIMEOUT_RATE', 0.0)
+MOCK_TIMEOUT_SECONDS = EnvConfig.get_float('MOCK_TIMEOUT_SECONDS', 2.0)
+MOCK_SEED = EnvConfig.get_int('MOCK_SEED', 0)
+
+# Processes for image post-processing (decode, adjust, tint, encode); started on first use
+POSTPROCESS_WORKERS = EnvConfig.get_int('POSTPROCESS_WORKERS', os.cpu_count() or 1)
+
+# Open Gemini connections at app startup
+GENAI_WARMUP = EnvConfig.get_bool('GENAI_WARMUP', False)
+
 # Logging
 LOG_LEVEL = EnvConfig.get('LOG_LEVEL', 'INFO')
@@ -9,23 +9,72 @@ from dataclasses import dataclass, field
 from .constants import (
     BASE_DIR, DATA_DIR, INPUT_DIR, OUTPUT_DIR, TEMP_DIR,
     IMAGES_DIR, CAPTIONS_DIR, DEFAULT_NUM_CREATIVES,
-    DEFAULT_IMAGE_SIZE
+    DEFAULT_IMAGE_SIZE, LLM_CACHE_TTL_SECONDS, OUTPUT_IMAGE_QUALITY,
+    HEDGE_PERCENTILE, HEDGE_MAX_RATIO, GEMINI_TIMEOUT
 )
 from .env import (
     GEMINI_API_KEY,
-    DEFAULT_LLM_PROVIDER, DEFAULT_IMAGE_MODEL
+    DEFAULT_LLM_PROVIDER, DEFAULT_IMAGE_MODEL, MAX_IMAGE_SIZE,
+    LLM_CACHE_ENABLED, LLM_CACHE_BYPASS, IMAGE_CACHE_ENABLED, GENAI_BACKEND, GEMINI_BASE_URL,
+    MOCK_TEXT_LATENCY, MOCK_IMAGE_LATENCY, MOCK_LATENCY_SCALE,
+    MOCK_429_RATE, MOCK_TIMEOUT_RATE, MOCK_TIMEOUT_SECONDS, MOCK_SEED,
+    POSTPROCESS_WORKERS, HEDGE_REQUESTS
 )
 from ..utils.logger import get_logger
 
 logger = get_logger()
 
 
+@dataclass
+class MockBackendConfig:
+    """Latency and fault injection for the offline mock backend."""
+    text_latency: str = MOCK_TEXT_LATENCY
+    image_latency: str = MOCK_IMAGE_LATENCY
+    latency_scale: float = MOCK_LATENCY_SCALE
+    rate_limit_rate: float = MOCK_429_RATE
+    timeout_rate: float = MOCK_TIMEOUT_RATE
+    timeout_seconds: float = MOCK_TIMEOUT_SECONDS
+    seed: int = MOCK_SEED
+
+
+@dataclass
+class PostProcessConfig:
+    """Adjustments applied to every generated image in the post-processing pool."""
+    brightness: float = 1.0
+    contrast: float = 1.0
+    saturation: float = 1.0
+    sharpness: float = 1.0
+    # Blend of the brand color over the image; 0 turns tinting off
+    brand_tint: float = 0.0
+    # Set from the colors extracted from the logo
+    brand_color: Optional[str] = None
+    # 0 keeps all encoding on the calling thread
+    workers: int = POSTPROCESS_WORKERS
+
+
 @dataclass
 class ImageGenConfig:
     """Image generation configuration."""
     model: str = 'imagen3'
     aspect_ratio: str = '1:1'
+    # Candidates requested per creative; extras are kept as alternates
     num_images: int = 1
+    # Ask for the format images are saved in so their bytes can be written without re-encoding
+    output_mime_type: str = 'image/jpeg'
+    output_quality: int = OUTPUT_IMAGE_QUALITY
+    max_image_size: Optional[int] = MAX_IMAGE_SIZE
+    # Fixed generation seed (Vertex AI only); part of the image cache key either way
+    seed: Optional[int] = None
+    cache_enabled: bool = IMAGE_CACHE_ENABLED
+    # Seconds allowed for one request attempt
+    timeout: int = GEMINI_TIMEOUT
+    postprocess: PostProcessConfig = field(default_factory=PostProcessConfig)
+    hedge_requests: bool = HEDGE_REQUESTS
+    hedge_percentile: float = HEDGE_PERCENTILE
+    hedge_max_ratio: float = HEDGE_MAX_RATIO
+    backend: str = GENAI_BACKEND
+    mock: MockBackendConfig = field(default_factory=MockBackendConfig)
+    base_url: Optional[str] = GEMINI_BASE_URL
     api_key: Optional[str] = None
 
 
@@ -37,6 +86,15 @@ class LLMConfig:
     temperature: float = 0.7
     max_tokens: int = 1000
     timeout: int = 60
+    max_concurrency: int = 8
+    batch_prompts: bool = True
+    batch_captions: bool = True
+    cache_enabled: bool = LLM_CACHE_ENABLED
+    cache_bypass: bool = LLM_CACHE_BYPASS
+    cache_ttl_seconds: Optional[int] = LLM_CACHE_TTL_SECONDS
+    backend: str = GENAI_BACKEND
+    mock: MockBackendConfig = field(default_factory=MockBackendConfig)
+    base_url: Optional[str] = GEMINI_BASE_URL
     api_key: Optional[str] = None
 
 
@@ -47,6 +105,8 @@ class BrandConfig:
     colors: list = field(default_factory=list)
     theme: str = 'modern'
     tone: str = 'professional'
+    # Tone for captions only; falls back to ``tone`` so images need not change with it
+    caption_tone: Optional[str] = None
     style_preferences: Dict[str, Any] = field(default_factory=dict)
 
 
@@ -54,6 +114,8 @@ class BrandConfig:
 class GenerationSettings:
     """Complete generation settings."""
     num_creatives: int = DEFAULT_NUM_CREATIVES
+    # Consecutive creatives that share one prompt and are filled from one image request
+    variations_per_prompt: int = 1
     image_config: ImageGenConfig = field(default_factory=ImageGenConfig)
     llm_config: LLMConfig = field(default_factory=LLMConfig)
     brand_config: BrandConfig = field(default_factory=BrandConfig)
@@ -74,6 +136,13 @@ class GenerationSettings:
             self.llm_config.api_key = GEMINI_API_KEY
             self.image_config.api_key = GEMINI_API_KEY
 
+    def set_backend(self, backend: str, mock: Optional[MockBackendConfig] = None) -> None:
+        """Point text and image generation at one backend, sharing its mock settings."""
+        mock = mock or self.llm_config.mock
+        for config in (self.llm_config, self.image_config):
+            config.backend = backend
+            config.mock = mock
+
 
 def get_default_settings() -> GenerationSettings:
     """Get default generation settings."""
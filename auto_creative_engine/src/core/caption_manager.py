@@ -2,14 +2,17 @@
 Caption manager for handling caption generation and storage.
 """
 
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Callable, Sequence
 from pathlib import Path
 
 from ..llm.caption_generator import CaptionGenerator
+from .creative_record import CreativeRecord
+from ..llm.llm_client import LLMClient
 from ..config.settings import GenerationSettings
 from ..utils.logger import get_logger
+from ..utils.async_utils import run_sync
 from ..utils.json_utils import save_json
-from ..utils.file_utils import ensure_dir
+from ..utils.file_utils import ensure_dir, atomic_write_text
 
 logger = get_logger()
 
@@ -17,9 +20,10 @@ logger = get_logger()
 class CaptionManager:
     """Manages caption generation and storage."""
     
-    def __init__(self, settings: GenerationSettings):
+    def __init__(self, settings: GenerationSettings, llm_client: Optional[LLMClient] = None):
         self.settings = settings
         self.caption_generator = CaptionGenerator(
+            llm_client=llm_client,
             llm_config=settings.llm_config,
             brand_config=settings.brand_config
         )
@@ -29,30 +33,83 @@ class CaptionManager:
         self,
         image_paths: List[Path],
         image_descriptions: List[str],
-        product_description: Optional[str] = None
+        product_description: Optional[str] = None,
+        on_delta: Optional[Callable[[int, str, bool], None]] = None
     ) -> Dict[str, str]:
-        """Generate captions for images."""
-        captions = {}
-        
-        for i, (image_path, description) in enumerate(zip(image_paths, image_descriptions)):
-            try:
-                caption = self.caption_generator.generate_caption(
-                    image_description=description,
-                    product_description=product_description
-                )
-                
-                image_name = image_path.stem
-                captions[image_name] = caption
-                
-                logger.debug(f"Generated caption for {image_name}")
-            
-            except Exception as e:
-                logger.error(f"Error generating caption for {image_path}: {e}")
-                captions[image_path.stem] = "Check out our amazing product!"
+        """Generate captions for images, streaming them to ``on_delta`` if given."""
+        variations = self.generate_caption_variations(
+            image_paths,
+            image_descriptions,
+            product_description,
+            on_delta=on_delta
+        )
+        captions = {name: options[0] for name, options in variations.items()}
         
         logger.info(f"Generated {len(captions)} captions")
         return captions
     
+    def generate_caption_variations(
+        self,
+        image_paths: Sequence[Optional[Path]],
+        image_descriptions: List[str],
+        product_description: Optional[str] = None,
+        num_variations: int = 1,
+        on_delta: Optional[Callable[[int, str, bool], None]] = None
+    ) -> Dict[str, List[str]]:
+        """Generate caption variations for all images in batched requests.
+        
+        ``image_paths`` is index-aligned with ``image_descriptions``; ``None``
+        entries (failed images) are skipped without shifting the others.
+        """
+        pairs = [
+            (path, desc) for path, desc in zip(image_paths, image_descriptions)
+            if path is not None
+        ]
+        generated = run_sync(self.caption_generator.agenerate_caption_batch(
+            image_descriptions=[desc for _, desc in pairs],
+            product_description=product_description,
+            num_variations=num_variations,
+            on_delta=on_delta
+        ))
+        
+        variations = {}
+        for (image_path, _), options in zip(pairs, generated):
+            image_name = image_path.stem
+            variations[image_name] = [
+                caption or "Check out our amazing product!" for caption in options
+            ]
+            logger.debug(f"Generated {len(options)} captions for {image_name}")
+        
+        return variations
+    
+    def generate_caption_texts(
+        self,
+        image_descriptions: List[str],
+        product_description: Optional[str] = None,
+        first_index: int = 0,
+        on_delta: Optional[Callable[[int, str, bool], None]] = None
+    ) -> List[str]:
+        """Generate one caption per description, before any image exists.
+        
+        ``first_index`` offsets the indices reported to ``on_delta`` so a slice
+        of a larger set reports its creatives' positions.
+        """
+        delta = None
+        if on_delta is not None:
+            delta = lambda index, text, done: on_delta(first_index + index, text, done)
+        
+        generated = run_sync(self.caption_generator.agenerate_caption_batch(
+            image_descriptions=image_descriptions,
+            product_description=product_description,
+            num_variations=1,
+            on_delta=delta
+        ))
+        return [options[0] or "Check out our amazing product!" for options in generated]
+    
+    def save_caption(self, image_name: str, caption: str, output_dir: Path) -> Path:
+        """Save one caption next to its siblings as ``<image_name>.txt``."""
+        return atomic_write_text(output_dir / f"{image_name}.txt", caption)
+    
     def save_captions(
         self,
         captions: Dict[str, str],
@@ -63,9 +120,7 @@ class CaptionManager:
         saved_paths = {}
         
         for image_name, caption in captions.items():
-            caption_path = output_dir / f"{image_name}.txt"
-            caption_path.write_text(caption, encoding='utf-8')
-            saved_paths[image_name] = caption_path
+            saved_paths[image_name] = self.save_caption(image_name, caption, output_dir)
         
         logger.info(f"Saved {len(saved_paths)} caption files")
         return saved_paths
@@ -73,12 +128,15 @@ class CaptionManager:
     def save_caption_mapping(
         self,
         captions: Dict[str, str],
-        output_path: Path
+        output_path: Path,
+        records: Optional[List[CreativeRecord]] = None
     ) -> Path:
-        """Save caption mapping to JSON."""
+        """Save caption mapping to JSON, with per-creative detail when records are given."""
         mapping = {
             "mapping": captions,
             "count": len(captions)
         }
+        if records is not None:
+            mapping["creatives"] = [record.to_dict() for record in records]
         return save_json(mapping, output_path)
 
@@ -0,0 +1,85 @@
+"""
+Per-creative record carried through every pipeline stage.
+"""
+
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..config.constants import CREATIVE_PREFIX
+
+# Lifecycle of a record; 'failed' can follow any stage
+STATUS_PENDING = 'pending'
+STATUS_PROMPTED = 'prompted'
+STATUS_RENDERED = 'rendered'
+STATUS_COMPLETE = 'complete'
+STATUS_FAILED = 'failed'
+
+
+class CreativeRecord:
+    """One creative, addressed by its position in the run.
+
+    Stages write their output onto the record at its index, so images,
+    captions and files can never drift out of step with their prompt.
+    """
+
+    __slots__ = (
+        'index', 'style', 'prompt', 'image_path', 'alternates',
+        'caption', 'timings', 'status', 'error', 'fingerprints'
+    )
+
+    def __init__(self, index: int, style: Optional[str] = None, prompt: Optional[str] = None):
+        self.index = index
+        self.style = style
+        self.prompt = prompt
+        self.image_path: Optional[Path] = None
+        # Extra candidates returned with the image, best-first after it
+        self.alternates: List[Path] = []
+        self.caption: Optional[str] = None
+        self.timings: Dict[str, float] = {}
+        self.status = STATUS_PENDING
+        self.error: Optional[str] = None
+        # Fingerprint of the inputs each stage's output was generated from
+        self.fingerprints: Dict[str, str] = {}
+
+    @property
+    def name(self) -> str:
+        """Stable file stem shared by the image and caption of this creative."""
+        return f"{CREATIVE_PREFIX}_{self.index + 1:03d}"
+
+    @property
+    def ok(self) -> bool:
+        return self.status == STATUS_COMPLETE
+
+    @contextmanager
+    def timed(self, stage: str):
+        """Record how long a stage took on this creative; a failure marks the record failed."""
+        started = time.monotonic()
+        try:
+            yield self
+        except Exception as e:
+            self.status = STATUS_FAILED
+            self.error = f"{stage}: {e}"
+            raise
+        finally:
+            self.timings[stage] = round(time.monotonic() - started, 3)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serialisable view of the record (image bytes are omitted)."""
+        return {
+            'index': self.index,
+            'name': self.name,
+            'style': self.style,
+            'prompt': self.prompt,
+            'image': self.image_path.name if self.image_path else None,
+            'alternates': [path.name for path in self.alternates],
+            'caption': self.caption,
+            'status': self.status,
+            'error': self.error,
+            'timings': dict(self.timings),
+            'fingerprints': dict(self.fingerprints),
+        }
+
+    def __repr__(self) -> str:
+        return f"CreativeRecord(index={self.index}, status={self.status!r})"
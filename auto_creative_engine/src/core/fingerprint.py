@@ -0,0 +1,117 @@
+"""
+Per-stage input fingerprints for incremental regeneration.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, List, Optional
+
+from .creative_record import (
+    CreativeRecord, STATUS_PENDING, STATUS_PROMPTED, STATUS_RENDERED
+)
+from ..config.settings import BrandConfig
+from ..utils.logger import get_logger
+
+logger = get_logger()
+
+# Bump when a stage's templates change enough that old outputs should be redone
+FINGERPRINT_VERSION = 1
+
+
+def fingerprint(*parts: Any) -> str:
+    """Short stable hash of JSON-serialisable parts."""
+    payload = json.dumps([FINGERPRINT_VERSION, *parts], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+class StageFingerprints:
+    """Fingerprints of what each stage of a creative depends on.
+
+    A prompt depends on the product, style and brand look (theme, tone,
+    colors) plus the text model; an image on its prompt, the image model
+    and any post-processing adjustments; a caption on its prompt, the
+    product, brand name, caption tone and the text model. Because images
+    and captions hash the prompt text, a new prompt invalidates both, while
+    a caption-only change keeps images.
+    """
+
+    def __init__(
+        self,
+        product_description: str,
+        brand_config: BrandConfig,
+        text_model: str,
+        image_model: str,
+        image_postprocess: Optional[Dict[str, Any]] = None
+    ):
+        self.product_description = product_description
+        self.brand_config = brand_config
+        self.text_model = text_model
+        self.image_model = image_model
+        self.image_postprocess = image_postprocess
+
+    def prompt(self, record: CreativeRecord) -> str:
+        brand = self.brand_config
+        return fingerprint(
+            'prompt', self.product_description, record.style,
+            brand.name, brand.theme, brand.tone, list(brand.colors), self.text_model
+        )
+
+    def image(self, record: CreativeRecord) -> str:
+        # Without post-processing adjustments, fingerprints match those written before they existed
+        if self.image_postprocess is None:
+            return fingerprint('image', record.prompt, self.image_model)
+        return fingerprint('image', record.prompt, self.image_model, self.image_postprocess)
+
+    def caption(self, record: CreativeRecord) -> str:
+        brand = self.brand_config
+        return fingerprint(
+            'caption', record.prompt, self.product_description,
+            brand.name, brand.caption_tone or brand.tone, self.text_model
+        )
+
+    def stamp(self, record: CreativeRecord, stage: str) -> None:
+        """Record the fingerprint of a stage that just produced its output."""
+        record.fingerprints[stage] = getattr(self, stage)(record)
+
+    def _stale(self, record: CreativeRecord, stage: str) -> bool:
+        # Outputs journaled before fingerprints existed are trusted
+        stored = record.fingerprints.get(stage)
+        return stored is not None and stored != getattr(self, stage)(record)
+
+    def invalidate(self, records: List[CreativeRecord]) -> Dict[str, int]:
+        """Drop outputs whose inputs changed so only those stages run again.
+
+        Returns how many prompts, images and captions were invalidated.
+        """
+        counts = {'prompt': 0, 'image': 0, 'caption': 0}
+        for record in records:
+            dropped = []
+            if record.prompt and self._stale(record, 'prompt'):
+                record.prompt = None
+                dropped.append('prompt')
+            if record.image_path is not None and (record.prompt is None or self._stale(record, 'image')):
+                record.image_path = None
+                record.alternates = []
+                dropped.append('image')
+            if record.caption and (record.prompt is None or self._stale(record, 'caption')):
+                record.caption = None
+                dropped.append('caption')
+            if not dropped:
+                continue
+
+            for stage in dropped:
+                counts[stage] += 1
+                record.fingerprints.pop(stage, None)
+            if record.prompt is None:
+                record.status = STATUS_PENDING
+            elif record.image_path is None:
+                record.status = STATUS_PROMPTED
+            else:
+                record.status = STATUS_RENDERED
+
+        if any(counts.values()):
+            logger.info(
+                f"Inputs changed: regenerating {counts['prompt']} prompts, "
+                f"{counts['image']} images and {counts['caption']} captions"
+            )
+        return counts
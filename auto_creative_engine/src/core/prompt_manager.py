@@ -2,10 +2,11 @@
 Prompt manager for handling prompt generation and storage.
 """
 
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Callable
 from pathlib import Path
 
 from ..llm.prompt_generator import PromptGenerator
+from ..llm.llm_client import LLMClient
 from ..config.settings import GenerationSettings, BrandConfig
 from ..utils.logger import get_logger
 from ..utils.json_utils import save_json, load_json
@@ -16,9 +17,10 @@ logger = get_logger()
 class PromptManager:
     """Manages prompt generation and storage."""
     
-    def __init__(self, settings: GenerationSettings):
+    def __init__(self, settings: GenerationSettings, llm_client: Optional[LLMClient] = None):
         self.settings = settings
         self.prompt_generator = PromptGenerator(
+            llm_client=llm_client,
             llm_config=settings.llm_config,
             brand_config=settings.brand_config
         )
@@ -27,19 +29,40 @@ class PromptManager:
     def generate_prompts(
         self,
         product_description: str,
-        num_prompts: Optional[int] = None
+        num_prompts: Optional[int] = None,
+        on_delta: Optional[Callable[[int, str, bool], None]] = None
     ) -> List[str]:
-        """Generate creative prompts for image generation."""
+        """Generate creative prompts for image generation, streaming to ``on_delta`` if given."""
         num_prompts = num_prompts or self.settings.num_creatives
         
         prompts = self.prompt_generator.generate_image_prompts(
             product_description=product_description,
-            num_prompts=num_prompts
+            num_prompts=num_prompts,
+            on_delta=on_delta
         )
         
         logger.info(f"Generated {len(prompts)} prompts")
         return prompts
     
+    def styles_for(self, num_prompts: int) -> List[str]:
+        """The style assigned to each prompt slot of a run."""
+        return self.prompt_generator._resolve_styles(num_prompts, None)
+    
+    def generate_prompt(
+        self,
+        product_description: str,
+        index: int,
+        num_prompts: Optional[int] = None,
+        on_delta: Optional[Callable[[int, str, bool], None]] = None
+    ) -> str:
+        """Generate the prompt for one creative so later stages can start on it early."""
+        return self.prompt_generator.generate_prompt(
+            product_description,
+            index=index,
+            num_prompts=num_prompts or self.settings.num_creatives,
+            on_delta=on_delta
+        )
+    
     def save_prompts(self, prompts: List[str], output_path: Path) -> Path:
         """Save prompts to a JSON file."""
         data = {
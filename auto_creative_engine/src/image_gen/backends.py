@@ -0,0 +1,70 @@
+"""
+Image generation backends behind GeminiImageClient: the Gen AI SDK or an offline mock.
+"""
+
+from typing import Any, Optional
+
+from ..config.settings import ImageGenConfig
+from ..config.constants import GEMINI_TIMEOUT
+from ..utils.logger import get_logger
+
+logger = get_logger()
+
+
+class ImageBackend:
+    """Provider interface used by ``GeminiImageClient``, mirroring ``client.models``."""
+
+    name = 'base'
+
+    def images_config(self, **fields) -> Any:
+        """Build an image generation config (number_of_images, aspect_ratio, output format)."""
+        raise NotImplementedError
+
+    def generate_images(self, model: str, prompt: str, config: Any, timeout: Optional[float] = None) -> Any:
+        """Return a response whose ``generated_images`` each carry an encoded ``image``.
+
+        ``timeout`` (seconds) bounds this one request.
+        """
+        raise NotImplementedError
+
+
+class GenAIImageBackend(ImageBackend):
+    """Google Gen AI SDK over the shared, pooled client."""
+
+    name = 'gemini'
+
+    def __init__(self, api_key: str, timeout: Optional[float] = GEMINI_TIMEOUT, base_url: Optional[str] = None):
+        from ..services.client_registry import get_genai_client
+
+        self.client = get_genai_client(api_key, timeout=timeout, base_url=base_url)
+
+    def images_config(self, **fields) -> Any:
+        from google.genai import types
+
+        try:
+            return types.GenerateImagesConfig(**fields)
+        except Exception as e:
+            # Older SDKs have no output options; images then arrive in the API's default format
+            logger.debug(f"Image output options unsupported by this SDK: {e}")
+            fields = {k: v for k, v in fields.items() if not k.startswith('output_')}
+            return types.GenerateImagesConfig(**fields)
+
+    def generate_images(self, model: str, prompt: str, config: Any, timeout: Optional[float] = None) -> Any:
+        if timeout is not None:
+            from google.genai import types
+
+            config = config.model_copy(update={"http_options": types.HttpOptions(timeout=int(timeout * 1000))})
+        return self.client.models.generate_images(model=model, prompt=prompt, config=config)
+
+
+def get_image_backend(config: ImageGenConfig, api_key: Optional[str] = None) -> ImageBackend:
+    """Backend named by ``config.backend``; only the Gen AI backend needs an API key."""
+    if config.backend == 'mock':
+        from .mock_backend import MockImageBackend
+
+        return MockImageBackend(config.mock)
+    if config.backend != 'gemini':
+        raise ValueError(f"Unknown image backend: {config.backend}")
+    if not api_key:
+        raise ValueError("Gemini API key is required for image generation")
+    return GenAIImageBackend(api_key, timeout=config.timeout, base_url=config.base_url)
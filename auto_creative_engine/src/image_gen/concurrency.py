@@ -0,0 +1,169 @@
+"""
+Adaptive (AIMD) concurrency control for image generation requests.
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+from ..config.constants import (
+    IMAGE_CONCURRENCY_INITIAL, IMAGE_CONCURRENCY_MIN, IMAGE_CONCURRENCY_MAX
+)
+from ..services.retry_policy import is_throttled
+from ..utils.logger import get_logger
+
+logger = get_logger()
+
+
+class AdaptiveConcurrencyLimiter:
+    """Additive-increase / multiplicative-decrease limit on in-flight requests.
+
+    The limit grows by roughly one slot per window of healthy completions
+    (latency within ``latency_tolerance`` of the best recent latency and a low
+    error rate) and is cut by ``decrease_factor`` when the service throttles
+    with 429/503. One burst of throttles only triggers one cut.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial: int = IMAGE_CONCURRENCY_INITIAL,
+        min_limit: int = IMAGE_CONCURRENCY_MIN,
+        max_limit: int = IMAGE_CONCURRENCY_MAX,
+        decrease_factor: float = 0.5,
+        latency_tolerance: float = 2.0,
+        max_error_rate: float = 0.2,
+        window: int = 20,
+        history_size: int = 200
+    ):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.max_error_rate = max_error_rate
+        self.limit = float(max(min_limit, min(initial, max_limit)))
+        self.in_flight = 0
+
+        self._latencies = deque(maxlen=window)
+        self._outcomes = deque(maxlen=window)
+        self._history = deque(maxlen=history_size)
+        self._counts = {"success": 0, "throttled": 0, "error": 0}
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        self._record("initial")
+
+    @property
+    def current_limit(self) -> int:
+        return int(self.limit)
+
+    def _record(self, reason: str) -> None:
+        self._history.append({
+            "time": time.time(),
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "reason": reason,
+        })
+
+    def acquire(self) -> float:
+        """Block until a slot is free; returns the acquisition timestamp."""
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+        return time.monotonic()
+
+    def try_acquire(self) -> Optional[float]:
+        """Take a slot only if one is free now; returns the acquisition timestamp or None."""
+        with self._cond:
+            if self.in_flight >= int(self.limit):
+                return None
+            self.in_flight += 1
+        return time.monotonic()
+
+    def abandon(self) -> None:
+        """Free a slot that was taken but never used for a request, leaving the limit as is."""
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def release(self, started: float, outcome: str) -> None:
+        """Free a slot and adapt the limit; outcome is success, throttled or error."""
+        latency = time.monotonic() - started
+        with self._cond:
+            self.in_flight -= 1
+            self._counts[outcome] += 1
+            self._outcomes.append(outcome)
+            previous = int(self.limit)
+
+            if outcome == "throttled":
+                # Requests already in flight when we cut will also see throttling; ignore those
+                if started >= self._last_decrease:
+                    self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+                    self._last_decrease = time.monotonic()
+            elif outcome == "success":
+                self._latencies.append(latency)
+                if self._healthy(latency):
+                    self.limit = min(self.max_limit, self.limit + 1.0 / max(1.0, self.limit))
+
+            if int(self.limit) != previous:
+                self._record(outcome)
+                logger.debug(f"Image concurrency for {self.name}: {previous} -> {int(self.limit)} ({outcome})")
+            self._cond.notify_all()
+
+    def _healthy(self, latency: float) -> bool:
+        """Latency near the best recent latency and few recent errors."""
+        errors = sum(1 for o in self._outcomes if o != "success")
+        if self._outcomes and errors / len(self._outcomes) > self.max_error_rate:
+            return False
+        baseline = min(self._latencies)
+        return latency <= baseline * self.latency_tolerance
+
+    @contextmanager
+    def slot(self, started: Optional[float] = None):
+        """Hold a concurrency slot for the duration of one request.
+
+        Pass ``started`` from ``try_acquire`` to use a slot already taken.
+        """
+        if started is None:
+            started = self.acquire()
+        outcome = "success"
+        try:
+            yield
+        except Exception as e:
+            outcome = "throttled" if is_throttled(e) else "error"
+            raise
+        finally:
+            self.release(started, outcome)
+
+    def metrics(self, history: Optional[int] = 50) -> Dict[str, Any]:
+        """Current limit, counters, latency and recent limit changes."""
+        with self._cond:
+            latencies = sorted(self._latencies)
+            return {
+                "name": self.name,
+                "limit": int(self.limit),
+                "min_limit": self.min_limit,
+                "max_limit": self.max_limit,
+                "in_flight": self.in_flight,
+                **self._counts,
+                "latency_p50": latencies[len(latencies) // 2] if latencies else None,
+                "latency_min": latencies[0] if latencies else None,
+                "history": list(self._history)[-history:] if history else list(self._history),
+            }
+
+
+_limiters: Dict[str, AdaptiveConcurrencyLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_concurrency_limiter(model: str) -> AdaptiveConcurrencyLimiter:
+    """Get the process-wide adaptive limiter for an image model."""
+    with _limiters_lock:
+        limiter = _limiters.get(model)
+        if limiter is None:
+            limiter = AdaptiveConcurrencyLimiter(model)
+            _limiters[model] = limiter
+        return limiter
@@ -1,13 +1,22 @@
-from typing import Optional, List
+import contextvars
+from dataclasses import asdict
+from typing import Optional, List, Callable, Dict
 from pathlib import Path
-from io import BytesIO
-
-from PIL import Image
-from google.genai import Client, types
 
 from ..config.settings import ImageGenConfig
+from ..config.constants import IMAGEN_MODEL
 from ..utils.logger import get_logger
 from ..utils.file_utils import ensure_dir
+from ..services.image_cache import ImageCache, get_image_cache
+from ..services.rate_limiter import get_rate_limiter, estimate_tokens
+from ..services.retry_policy import RetryPolicy
+from ..services.usage_meter import record_image_usage
+from ..utils.tracing import span
+from .backends import get_image_backend
+from .concurrency import get_concurrency_limiter
+from .hedging import RequestHedger
+from .image_utils import needs_reencode, save_encoded_image, save_image
+from .postprocess import ImagePostProcessor, PostProcessSpec, get_postprocessor, render
 
 logger = get_logger()
 
@@ -18,12 +27,81 @@ class GeminiImageClient:
     def __init__(self, api_key: Optional[str] = None, config: Optional[ImageGenConfig] = None):
         self.config = config or ImageGenConfig(model='imagen4')
         self.api_key = api_key or self.config.api_key
+        self.backend = get_image_backend(self.config, self.api_key)
+        self.model_name = IMAGEN_MODEL
+        self.rate_limiter = get_rate_limiter('image', self.model_name)
+        self.concurrency = get_concurrency_limiter(self.model_name)
+        self.hedger = RequestHedger(
+            self.model_name,
+            percentile=self.config.hedge_percentile,
+            max_hedge_ratio=self.config.hedge_max_ratio
+        ) if self.config.hedge_requests else None
+        self.retry_policy = RetryPolicy(attempt_timeout=self.config.timeout)
+        self.cache: Optional[ImageCache] = get_image_cache() if self.config.cache_enabled else None
+        workers = self.config.postprocess.workers
+        self.postprocessor: Optional[ImagePostProcessor] = get_postprocessor(workers) if workers > 0 else None
+        logger.info(f"Initialized Imagen client ({self.backend.name} backend)")
+    
+    def _request_images(
+        self,
+        prompt: str,
+        number_of_images: int = 1,
+        aspect_ratio: str = "1:1"
+    ) -> list:
+        """Call Imagen within the rate limit, retrying transient failures."""
+        fields = {
+            "number_of_images": number_of_images,
+            "aspect_ratio": aspect_ratio,
+            "output_mime_type": self.config.output_mime_type,
+            "output_compression_quality": self.config.output_quality,
+        }
+        if self.config.seed is not None:
+            fields["seed"] = self.config.seed
+        gen_cfg = self.backend.images_config(**fields)
+        
+        tokens = estimate_tokens(prompt)
         
-        if not self.api_key:
-            raise ValueError("Gemini API key is required for image generation")
+        def _call(timeout):
+            result = self.backend.generate_images(
+                model=self.model_name,
+                prompt=prompt,
+                config=gen_cfg,
+                timeout=timeout,
+            )
+            # Every successful call is billed, including hedges that lose the race
+            record_image_usage(self.model_name, len(getattr(result, "generated_images", None) or []))
+            return result
+        
+        def _attempt(timeout):
+            hedge_slot = []
+            
+            def _claim_hedge():
+                # A hedge is one more request: it needs a free concurrency slot and quota right now
+                started = self.concurrency.try_acquire()
+                if started is None:
+                    return False
+                if not self.rate_limiter.try_acquire(tokens):
+                    self.concurrency.abandon()
+                    return False
+                hedge_slot.append(started)
+                return True
+            
+            def _hedge():
+                with self.concurrency.slot(started=hedge_slot[0]):
+                    return _call(timeout)
+            
+            self.rate_limiter.acquire(tokens)
+            with self.concurrency.slot(), span("imagen.generate_images", category="imagen", model=self.model_name):
+                if self.hedger is not None:
+                    result = self.hedger.run(lambda: _call(timeout), can_hedge=_claim_hedge, hedge_fn=_hedge)
+                else:
+                    result = _call(timeout)
+            images = getattr(result, "generated_images", None) or []
+            if not images:
+                raise ValueError("No image generated in response")
+            return images
         
-        self.client = Client(api_key=self.api_key)
-        logger.info("Initialized Google Gen AI client for Imagen")
+        return self.retry_policy.call(_attempt, timed=True)
     
     def generate_image(
         self,
@@ -33,56 +111,137 @@ class GeminiImageClient:
         output_path: Optional[Path] = None
     ) -> Path:
         """Generate a single image using Gemini Imagen."""
+        if output_path is None:
+            output_path = Path(__file__).parent.parent.parent / 'data' / 'temp' / 'gemini_output.jpg'
+        return self.generate_image_set(
+            prompt, [output_path], number_of_images=number_of_images, aspect_ratio=aspect_ratio
+        )[0]
+    
+    def generate_image_set(
+        self,
+        prompt: str,
+        output_paths: List[Path],
+        number_of_images: Optional[int] = None,
+        aspect_ratio: str = "1:1",
+        spec: Optional[PostProcessSpec] = None
+    ) -> List[Path]:
+        """Generate several images for one prompt in a single request.
+        
+        Asks for ``number_of_images`` (default: one per output path) and writes
+        the returned images to ``output_paths`` in order, returning the paths
+        written. Imagen may return fewer images than asked for, e.g. when some
+        are filtered, so the result can be shorter than ``output_paths``.
+        
+        Images already in the image cache are written from there without a
+        network call, and freshly generated ones are added to it.
+        
+        ``spec`` is how to post-process the images (default: from this
+        client's config); callers sharing one client between campaigns pass
+        the spec of their own run.
+        """
+        number_of_images = number_of_images or len(output_paths)
+        spec = spec or PostProcessSpec.from_config(self.config)
+        cache_keys = None
+        if self.cache is not None:
+            cache_keys = self._cache_keys(prompt, aspect_ratio, min(number_of_images, len(output_paths)), spec)
+            cached = self.cache.get_many(cache_keys)
+            if cached is not None:
+                record_image_usage(self.model_name, len(cached), cached=True)
+                with span("image.write", category="encode", cached=True):
+                    for data, output_path in zip(cached, output_paths):
+                        ensure_dir(output_path.parent)
+                        output_path.write_bytes(data)
+                logger.info(f"Served {len(cached)} image(s) from cache: {prompt[:50]}...")
+                return list(output_paths[:len(cached)])
+        
         try:
-            logger.info(f"Generating image with Imagen: {prompt[:50]}...")
-            
-            gen_cfg = types.GenerateImagesConfig(
-                number_of_images=number_of_images,
-                aspect_ratio=aspect_ratio,
-            )
+            logger.info(f"Generating {number_of_images} image(s) with Imagen: {prompt[:50]}...")
             
-            result = self.client.models.generate_images(
-                model='imagen-4.0-generate-001',
-                prompt=prompt,
-                config=gen_cfg,
-            )
-            
-            images = getattr(result, "generated_images", [])
-            if not images:
-                raise ValueError("No image generated in response")
-            first = images[0]
-            img_obj = getattr(first, "image", None)
+            images = self._request_images(prompt, number_of_images, aspect_ratio)
             
-            if output_path is None:
-                output_path = Path(__file__).parent.parent.parent / 'data' / 'temp' / 'gemini_output.jpg'
-            
-            ensure_dir(output_path.parent)
-            
-            if img_obj is not None:
-                if getattr(img_obj, "mode", None) != 'RGB':
-                    img_obj = img_obj.convert('RGB')
-                img_obj.save(output_path, 'JPEG', quality=95)
-            else:
-                data = getattr(first, "data", None)
-                if data is None:
-                    raise ValueError("No image data in response")
-                with Image.open(BytesIO(data)) as img:
-                    if img.mode != 'RGB':
-                        img = img.convert('RGB')
-                    img.save(output_path, 'JPEG', quality=95)
-            
-            logger.info(f"Generated image saved to {output_path}")
-            return output_path
+            written = self._write_images(images, output_paths, spec)
+            if cache_keys is not None:
+                self.cache.put_many(
+                    {key: path.read_bytes() for key, path in zip(cache_keys, written)}, self.model_name
+                )
+            return written
         
         except Exception as e:
             logger.error(f"Error generating image with Gemini Imagen: {e}")
             # Fallback: Try using Vertex AI Imagen API format
             try:
-                return self._generate_with_vertex_api(prompt, output_path)
+                return [self._generate_with_vertex_api(prompt, output_paths[0])]
             except Exception as e2:
                 logger.error(f"Fallback also failed: {e2}")
                 raise
     
+    def _cache_keys(self, prompt: str, aspect_ratio: str, count: int, spec: PostProcessSpec) -> List[str]:
+        """Image cache keys for the first ``count`` images of a request."""
+        model_name = self.model_name
+        # Mock images must never be served in place of real ones
+        if self.backend.name != 'gemini':
+            model_name = f"{self.backend.name}/{model_name}"
+        output = {
+            "mime_type": self.config.output_mime_type,
+            "quality": spec.quality,
+            "max_size": spec.max_size,
+        }
+        if spec.adjusts:
+            output["postprocess"] = asdict(spec)
+        return [
+            ImageCache.make_key(model_name, prompt, aspect_ratio, self.config.seed, output, candidate=i)
+            for i in range(count)
+        ]
+    
+    def _write_images(self, images: list, output_paths: List[Path], spec: PostProcessSpec) -> List[Path]:
+        """Save generated images to ``output_paths`` in order.
+        
+        Images whose bytes can be written as they are go straight to disk.
+        Those that must be decoded (post-processing adjustments, or a format
+        or size change) are rendered as one batch in the post-processing
+        pool, or on this thread when the pool is disabled.
+        """
+        written, batch = [], []
+        for generated, output_path in zip(images, output_paths):
+            ensure_dir(output_path.parent)
+            data = self._image_bytes(generated)
+            written.append(output_path)
+            if data is not None and (spec.adjusts or needs_reencode(data, output_path, spec.max_size)):
+                batch.append((data, output_path))
+                continue
+            with span("image.write", category="encode"):
+                reencoded = self._write_image(generated, output_path, spec)
+            logger.info(f"Generated image saved to {output_path}{' (re-encoded)' if reencoded else ''}")
+        
+        if batch:
+            buffers, paths = [data for data, _ in batch], [path for _, path in batch]
+            with span("image.postprocess", category="encode", images=len(batch)):
+                if self.postprocessor is not None:
+                    self.postprocessor.process(buffers, paths, spec)
+                else:
+                    for data, path in batch:
+                        render(data, path, spec)
+            logger.info(f"Post-processed {len(batch)} image(s) to {', '.join(p.name for p in paths)}")
+        return written
+    
+    @staticmethod
+    def _image_bytes(generated) -> Optional[bytes]:
+        """Encoded bytes of a generated image, or None when the SDK returned a PIL image."""
+        img_obj = getattr(generated, "image", None)
+        # The SDK returns encoded bytes; some older SDKs return PIL images or raw ``data``
+        return getattr(img_obj, "image_bytes", None) if img_obj is not None else getattr(generated, "data", None)
+    
+    def _write_image(self, generated, output_path: Path, spec: PostProcessSpec) -> bool:
+        """Save one generated image, re-encoding only when its format or size must change."""
+        img_obj = getattr(generated, "image", None)
+        data = self._image_bytes(generated)
+        if data is not None:
+            return save_encoded_image(data, output_path, quality=spec.quality, max_size=spec.max_size)
+        if img_obj is None:
+            raise ValueError("No image data in response")
+        save_image(img_obj, output_path, quality=spec.quality, max_size=spec.max_size)
+        return True
+    
     def _generate_with_vertex_api(self, prompt: str, output_path: Optional[Path] = None) -> Path:
         """Alternative method using Vertex AI format."""
         # This is a placeholder - Vertex AI requires project setup
@@ -93,10 +252,14 @@ class GeminiImageClient:
         self,
         prompts: List[str],
         output_dir: Path,
-        aspect_ratio: str = "1:1"
-    ) -> List[Path]:
-        """Generate multiple images from prompts."""
-        output_paths = []
+        aspect_ratio: str = "1:1",
+        on_complete: Optional[Callable[[int, Path], None]] = None
+    ) -> List[Optional[Path]]:
+        """Generate multiple images from prompts, calling ``on_complete(index, path)`` as each lands.
+        
+        The result is index-aligned with ``prompts``; failed images are ``None``.
+        """
+        output_paths: List[Optional[Path]] = [None] * len(prompts)
         ensure_dir(output_dir)
         
         from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -106,17 +269,43 @@ class GeminiImageClient:
             out = output_dir / f"creative_{i+1:03d}.jpg"
             return self.generate_image(prompt, aspect_ratio=aspect_ratio, output_path=out)
         
-        with ThreadPoolExecutor(max_workers=min(6, len(prompts))) as ex:
-            futures = {ex.submit(_task, (i, p)): i for i, p in enumerate(prompts)}
+        # Workers beyond the adaptive limit wait for a slot inside _request_images
+        with ThreadPoolExecutor(max_workers=max(1, min(self.concurrency.max_limit, len(prompts)))) as ex:
+            # Each worker runs in a copy of the caller's context so usage is attributed to this run
+            futures = {
+                ex.submit(contextvars.copy_context().run, _task, (i, p)): i
+                for i, p in enumerate(prompts)
+            }
             for fut in as_completed(futures):
                 i = futures[fut]
                 try:
                     path = fut.result()
-                    output_paths.append(path)
+                    output_paths[i] = path
                     logger.info(f"Generated image {i+1}/{len(prompts)}")
+                    if on_complete:
+                        on_complete(i, path)
                 except Exception as e:
                     logger.error(f"Failed to generate image {i+1}: {e}")
         
-        logger.info(f"Generated {len(output_paths)}/{len(prompts)} images")
+        logger.info(
+            f"Generated {sum(p is not None for p in output_paths)}/{len(prompts)} images "
+            f"(concurrency limit {self.concurrency.current_limit})"
+        )
         return output_paths
+    
+    def concurrency_metrics(self) -> dict:
+        """Adaptive concurrency limit and history for this model."""
+        return self.concurrency.metrics()
+    
+    def cache_metrics(self) -> Optional[Dict]:
+        """Image cache hit rate and size, or None when the cache is disabled."""
+        return self.cache.stats() if self.cache is not None else None
+    
+    def postprocess_metrics(self) -> Optional[Dict]:
+        """Post-processing pool counters, or None when the pool is disabled."""
+        return self.postprocessor.metrics() if self.postprocessor is not None else None
+    
+    def hedging_metrics(self) -> Optional[dict]:
+        """Hedge counts and win rate, or None when hedging is disabled."""
+        return self.hedger.metrics() if self.hedger is not None else None
 
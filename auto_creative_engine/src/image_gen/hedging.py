@@ -0,0 +1,183 @@
+"""
+Hedged requests for cutting tail latency on image generation.
+"""
+
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+
+from ..config.constants import (
+    HEDGE_PERCENTILE, HEDGE_MAX_RATIO, HEDGE_MIN_SAMPLES, HEDGE_MIN_DELAY
+)
+from ..utils.logger import get_logger
+
+logger = get_logger()
+
+
+class LatencyTracker:
+    """Sliding window of successful request latencies for one model."""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float) -> None:
+        with self._lock:
+            self._samples.append(latency)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Latency at quantile q (0-1) over the window, or None without samples."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(q * len(samples)))
+        return samples[index]
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_hedge_executor() -> ThreadPoolExecutor:
+    """Get the process-wide pool that runs hedged attempts, shared by every hedger."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="image-hedge")
+        return _executor
+
+
+_trackers: Dict[str, LatencyTracker] = {}
+_trackers_lock = threading.Lock()
+
+
+def get_latency_tracker(model: str) -> LatencyTracker:
+    """Get the process-wide latency tracker for a model."""
+    with _trackers_lock:
+        tracker = _trackers.get(model)
+        if tracker is None:
+            tracker = LatencyTracker()
+            _trackers[model] = tracker
+        return tracker
+
+
+class RequestHedger:
+    """Fires a duplicate request once the primary exceeds a latency percentile.
+
+    Whichever attempt succeeds first wins. Hedges are capped at
+    ``max_hedge_ratio`` of primary requests (plus one) so quota spend
+    stays bounded; the losing attempt is left to finish in the background.
+    Wrap only the backend call, so latency excludes queueing for quota or
+    a concurrency slot; the hedge itself must claim both, via ``can_hedge``.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        percentile: float = HEDGE_PERCENTILE,
+        max_hedge_ratio: float = HEDGE_MAX_RATIO,
+        min_samples: int = HEDGE_MIN_SAMPLES,
+        min_delay: float = HEDGE_MIN_DELAY
+    ):
+        self.model = model
+        self.percentile = percentile
+        self.max_hedge_ratio = max_hedge_ratio
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.tracker = get_latency_tracker(model)
+        self._lock = threading.Lock()
+        self._counts = {
+            "requests": 0, "hedges_fired": 0, "hedges_won": 0, "budget_denied": 0, "hedges_blocked": 0
+        }
+
+    def hedge_delay(self) -> Optional[float]:
+        """How long to wait before hedging, or None while latency data is insufficient."""
+        if len(self.tracker) < self.min_samples:
+            return None
+        return max(self.min_delay, self.tracker.percentile(self.percentile))
+
+    def _take_budget(self) -> bool:
+        with self._lock:
+            if self._counts["hedges_fired"] < self.max_hedge_ratio * self._counts["requests"] + 1:
+                self._counts["hedges_fired"] += 1
+                return True
+            self._counts["budget_denied"] += 1
+            return False
+
+    def _return_budget(self) -> None:
+        """Give back a hedge taken from the budget that was never sent."""
+        with self._lock:
+            self._counts["hedges_fired"] -= 1
+            self._counts["hedges_blocked"] += 1
+
+    def _submit(self, fn: Callable[[], Any]) -> Future:
+        """Run one attempt, recording its own latency when it succeeds."""
+        started = time.monotonic()
+        future = get_hedge_executor().submit(contextvars.copy_context().run, fn)
+
+        def _record(f: Future):
+            if not f.cancelled() and f.exception() is None:
+                self.tracker.record(time.monotonic() - started)
+
+        future.add_done_callback(_record)
+        return future
+
+    def run(
+        self,
+        fn: Callable[[], Any],
+        can_hedge: Optional[Callable[[], bool]] = None,
+        hedge_fn: Optional[Callable[[], Any]] = None
+    ) -> Any:
+        """Call fn, hedging with a second call if it runs past the latency percentile.
+
+        Once the hedge budget allows it, ``can_hedge`` is asked to claim what
+        the hedge needs (quota, a concurrency slot); when it returns False the
+        primary is awaited alone. The hedge calls ``hedge_fn`` (default: fn).
+        """
+        with self._lock:
+            self._counts["requests"] += 1
+
+        delay = self.hedge_delay()
+        primary = self._submit(fn)
+        if delay is None:
+            return primary.result()
+
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._take_budget():
+            return primary.result()
+        if can_hedge is not None and not can_hedge():
+            self._return_budget()
+            return primary.result()
+
+        logger.debug(f"Hedging {self.model} request after {delay:.1f}s")
+        hedge = self._submit(hedge_fn or fn)
+        pending = {primary, hedge}
+        first_error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        with self._lock:
+                            self._counts["hedges_won"] += 1
+                    return future.result()
+                first_error = first_error or future.exception()
+        raise first_error
+
+    def metrics(self) -> Dict[str, Any]:
+        """Hedge counts, win rate and the current latency thresholds."""
+        with self._lock:
+            counts = dict(self._counts)
+        fired = counts["hedges_fired"]
+        counts["hedge_win_rate"] = round(counts["hedges_won"] / fired, 3) if fired else 0.0
+        counts["hedge_delay"] = self.hedge_delay()
+        counts["latency_p50"] = self.tracker.percentile(0.5)
+        counts["latency_p95"] = self.tracker.percentile(0.95)
+        return counts
@@ -1,7 +1,8 @@
-from typing import List, Optional
+from typing import Callable, List, Optional
 from pathlib import Path
 
 from .gemini_image_client import GeminiImageClient
+from .postprocess import PostProcessSpec
 from ..config.settings import GenerationSettings
 from ..utils.logger import get_logger
 from ..utils.file_utils import ensure_dir
@@ -16,12 +17,13 @@ class ImageGenerationPipeline:
         self,
         settings: Optional[GenerationSettings] = None,
         api_key: Optional[str] = None,
+        image_client: Optional[GeminiImageClient] = None,
     ):
         self.settings = settings or GenerationSettings()
         self.api_key = api_key or self.settings.image_config.api_key
 
-        # Initialize Gemini Imagen client
-        self.image_client = GeminiImageClient(
+        # Initialize Gemini Imagen client, unless one is shared across pipelines
+        self.image_client = image_client or GeminiImageClient(
             api_key=self.api_key,
             config=self.settings.image_config,
         )
@@ -33,8 +35,9 @@ class ImageGenerationPipeline:
         prompts: List[str],
         output_dir: Optional[Path] = None,
         product_image_path: Optional[Path] = None,  # kept for API compatibility
-    ) -> List[Path]:
-        """Generate creative images from prompts."""
+        on_complete: Optional[Callable[[int, Path], None]] = None,
+    ) -> List[Optional[Path]]:
+        """Generate creative images from prompts, index-aligned with ``prompts`` (``None`` on failure)."""
         output_dir = output_dir or self.settings.output_dir / "images"
         ensure_dir(output_dir)
 
@@ -44,9 +47,12 @@ class ImageGenerationPipeline:
             prompts=prompts,
             output_dir=output_dir,
             aspect_ratio="1:1",
+            on_complete=on_complete,
         )
 
-        logger.info(f"Successfully generated {len(generated_images)} creatives")
+        logger.info(
+            f"Successfully generated {sum(p is not None for p in generated_images)} creatives"
+        )
         return generated_images
 
     def generate_single_creative(
@@ -69,3 +75,23 @@ class ImageGenerationPipeline:
         )
 
         return image_path
+
+    def generate_creative_set(
+        self,
+        prompt: str,
+        output_paths: List[Path],
+        spec: Optional[PostProcessSpec] = None,
+    ) -> List[Path]:
+        """Generate one image per output path for a prompt from a single request.
+
+        Returns the paths actually written, in order; the request may yield fewer images.
+        ``spec`` is the run's post-processing (default: the image client's config).
+        """
+        logger.info(f"Generating {len(output_paths)} images for one prompt: {prompt[:50]}...")
+
+        return self.image_client.generate_image_set(
+            prompt=prompt,
+            output_paths=output_paths,
+            aspect_ratio="1:1",
+            spec=spec,
+        )
@@ -1,11 +1,109 @@
+from io import BytesIO
 from pathlib import Path
 from typing import Tuple, Optional
 from PIL import Image, ImageEnhance
 
+from ..config.constants import OUTPUT_IMAGE_QUALITY
 from ..utils.logger import get_logger
 
 logger = get_logger()
 
+SUFFIX_FORMATS = {'.jpg': 'JPEG', '.jpeg': 'JPEG', '.png': 'PNG', '.webp': 'WEBP'}
+
+
+def sniff_format(data: bytes) -> Optional[str]:
+    """PIL format name of encoded image bytes, read from their magic number."""
+    if data[:3] == b'\xff\xd8\xff':
+        return 'JPEG'
+    if data[:8] == b'\x89PNG\r\n\x1a\n':
+        return 'PNG'
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'WEBP'
+    return None
+
+
+def save_image(
+    img: Image.Image,
+    output_path: Path,
+    quality: int = OUTPUT_IMAGE_QUALITY,
+    max_size: Optional[int] = None
+) -> Path:
+    """Encode a PIL image in the format named by ``output_path``'s suffix."""
+    target = SUFFIX_FORMATS.get(output_path.suffix.lower(), 'JPEG')
+    if max_size and max(img.size) > max_size:
+        img = img.copy()
+        img.thumbnail((max_size, max_size), Image.LANCZOS)
+    if target == 'JPEG' and img.mode != 'RGB':
+        img = img.convert('RGB')
+    img.save(output_path, target, quality=quality)
+    return output_path
+
+
+def save_encoded_image(
+    data: bytes,
+    output_path: Path,
+    quality: int = OUTPUT_IMAGE_QUALITY,
+    max_size: Optional[int] = None
+) -> bool:
+    """Write encoded image bytes to ``output_path``; returns whether they had to be re-encoded.
+
+    Bytes already in the target format are written as they are. They are
+    only decoded to change format or to shrink an image beyond ``max_size``;
+    the size check reads just the header.
+    """
+    if not needs_reencode(data, output_path, max_size):
+        output_path.write_bytes(data)
+        return False
+    with Image.open(BytesIO(data)) as img:
+        save_image(img, output_path, quality=quality, max_size=max_size)
+    return True
+
+
+def needs_reencode(data: bytes, output_path: Path, max_size: Optional[int] = None) -> bool:
+    """Whether encoded bytes must be decoded to match ``output_path``'s format or ``max_size``.
+
+    Only the magic number and image header are read.
+    """
+    if sniff_format(data) != SUFFIX_FORMATS.get(output_path.suffix.lower(), 'JPEG'):
+        return True
+    if not max_size:
+        return False
+    with Image.open(BytesIO(data)) as img:
+        return max(img.size) > max_size
+
+
+def adjust_image(
+    img: Image.Image,
+    brightness: float = 1.0,
+    contrast: float = 1.0,
+    saturation: float = 1.0,
+    sharpness: float = 1.0
+) -> Image.Image:
+    """Apply brightness, contrast, saturation and sharpness factors (1.0 leaves each unchanged)."""
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    for enhancer, factor in (
+        (ImageEnhance.Brightness, brightness),
+        (ImageEnhance.Contrast, contrast),
+        (ImageEnhance.Color, saturation),
+        (ImageEnhance.Sharpness, sharpness),
+    ):
+        if factor != 1.0:
+            img = enhancer(img).enhance(factor)
+    return img
+
+
+def tint_image(img: Image.Image, color: str, intensity: float = 0.3) -> Image.Image:
+    """Blend a flat ``#rrggbb`` color over the image."""
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    color_hex = color.replace('#', '')
+    r = int(color_hex[0:2], 16)
+    g = int(color_hex[2:4], 16)
+    b = int(color_hex[4:6], 16)
+    overlay = Image.new('RGB', img.size, (r, g, b))
+    return Image.blend(img, overlay, intensity)
+
 
 def enhance_image(
     image_path: Path,
@@ -17,27 +115,7 @@ def enhance_image(
 ) -> Path:
     try:
         with Image.open(image_path) as img:
-            # Convert to RGB if necessary
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
-            
-            # Apply enhancements
-            if brightness != 1.0:
-                enhancer = ImageEnhance.Brightness(img)
-                img = enhancer.enhance(brightness)
-            
-            if contrast != 1.0:
-                enhancer = ImageEnhance.Contrast(img)
-                img = enhancer.enhance(contrast)
-            
-            if saturation != 1.0:
-                enhancer = ImageEnhance.Color(img)
-                img = enhancer.enhance(saturation)
-            
-            if sharpness != 1.0:
-                enhancer = ImageEnhance.Sharpness(img)
-                img = enhancer.enhance(sharpness)
-            
+            img = adjust_image(img, brightness, contrast, saturation, sharpness)
             img.save(output_path, 'JPEG', quality=95)
             logger.debug(f"Enhanced image saved to {output_path}")
             return output_path
@@ -58,16 +136,9 @@ def apply_brand_colors(
             if img.mode != 'RGB':
                 img = img.convert('RGB')
             
-            # Create a color overlay based on brand colors
+            # Use the first brand color as overlay
             if brand_colors:
-                # Use the first brand color as overlay
-                color_hex = brand_colors[0].replace('#', '')
-                r = int(color_hex[0:2], 16)
-                g = int(color_hex[2:4], 16)
-                b = int(color_hex[4:6], 16)
-                
-                overlay = Image.new('RGB', img.size, (r, g, b))
-                img = Image.blend(img, overlay, intensity)
+                img = tint_image(img, brand_colors[0], intensity)
             
             img.save(output_path, 'JPEG', quality=95)
             logger.debug(f"Applied brand colors to {output_path}")
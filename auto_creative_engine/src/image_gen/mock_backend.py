@@ -0,0 +1,118 @@
+"""
+Offline image backend rendering deterministic synthetic creatives with Pillow and NumPy.
+"""
+
+import hashlib
+import io
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from ..config.settings import MockBackendConfig
+from ..services.fault_injection import FaultInjector
+from .backends import ImageBackend
+
+# Output sizes Imagen returns for each aspect ratio
+ASPECT_SIZES = {
+    '1:1': (1024, 1024),
+    '16:9': (1408, 768),
+    '9:16': (768, 1408),
+    '4:3': (1280, 896),
+    '3:4': (896, 1280),
+}
+
+
+@dataclass
+class MockImagesConfig:
+    """Stand-in for ``types.GenerateImagesConfig``."""
+    number_of_images: int = 1
+    aspect_ratio: str = '1:1'
+    output_mime_type: Optional[str] = None
+    output_compression_quality: Optional[int] = None
+    seed: Optional[int] = None
+
+
+def render_synthetic_image(seed: bytes, size: Tuple[int, int]) -> Image.Image:
+    """Gradient backdrop, soft shapes and grain, all derived from ``seed``."""
+    rng = np.random.default_rng(int.from_bytes(seed[:8], 'big'))
+    width, height = size
+    top, bottom = rng.integers(0, 256, size=(2, 3))
+
+    ramp = np.linspace(0.0, 1.0, height, dtype=np.float32)[:, None, None]
+    pixels = top[None, None, :] * (1 - ramp) + bottom[None, None, :] * ramp
+    pixels = np.broadcast_to(pixels, (height, width, 3)).astype(np.float32)
+    # Grain keeps JPEG sizes and encode times close to a real photo
+    pixels = pixels + rng.normal(0, 6, size=(height, width, 3)).astype(np.float32)
+    image = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8), 'RGB')
+
+    draw = ImageDraw.Draw(image)
+    for _ in range(int(rng.integers(3, 7))):
+        x, y = rng.integers(0, width), rng.integers(0, height)
+        radius = int(rng.integers(min(size) // 12, min(size) // 3))
+        fill = tuple(int(c) for c in rng.integers(0, 256, size=3))
+        box = (x - radius, y - radius, x + radius, y + radius)
+        if rng.random() < 0.5:
+            draw.ellipse(box, fill=fill)
+        else:
+            draw.rectangle(box, fill=fill)
+    return image
+
+
+def encode_synthetic_image(seed: bytes, size: Tuple[int, int], mime_type: str = 'image/png', quality: int = 75) -> bytes:
+    """``render_synthetic_image`` encoded as PNG or, for ``image/jpeg``, JPEG."""
+    buffer = io.BytesIO()
+    image = render_synthetic_image(seed, size)
+    if mime_type == 'image/jpeg':
+        image.save(buffer, 'JPEG', quality=quality)
+    else:
+        image.save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class MockImageBackend(ImageBackend):
+    """Renders an image per request locally; the same prompt always gives the same pixels.
+
+    Images come back encoded, PNG unless another output format is asked for,
+    as the API returns them.
+    """
+
+    name = 'mock'
+
+    def __init__(self, config: Optional[MockBackendConfig] = None):
+        self.config = config or MockBackendConfig()
+        self.faults = FaultInjector(
+            latency=self.config.image_latency,
+            rate_limit_rate=self.config.rate_limit_rate,
+            timeout_rate=self.config.timeout_rate,
+            timeout_seconds=self.config.timeout_seconds,
+            latency_scale=self.config.latency_scale,
+            seed=self.config.seed
+        )
+
+    def images_config(self, **fields) -> MockImagesConfig:
+        return MockImagesConfig(**fields)
+
+    def generate_images(self, model: str, prompt: str, config: Any, timeout: Optional[float] = None) -> Any:
+        key = hashlib.sha256(f"{self.config.seed}\n{model}\n{prompt}".encode('utf-8')).digest()
+        if getattr(config, 'seed', None) is not None:
+            key = hashlib.sha256(key + str(config.seed).encode('ascii')).digest()
+        self.faults.apply(f"image:{key.hex()}", timeout=timeout)
+
+        size = ASPECT_SIZES.get(getattr(config, 'aspect_ratio', '1:1'), ASPECT_SIZES['1:1'])
+        count = max(1, getattr(config, 'number_of_images', 1) or 1)
+        mime_type = getattr(config, 'output_mime_type', None) or 'image/png'
+        quality = getattr(config, 'output_compression_quality', None) or 75
+        images = [
+            SimpleNamespace(image=SimpleNamespace(
+                image_bytes=encode_synthetic_image(hashlib.sha256(key + bytes([i])).digest(), size, mime_type, quality),
+                mime_type=mime_type
+            ))
+            for i in range(count)
+        ]
+        return SimpleNamespace(generated_images=images)
+
+    def metrics(self) -> Dict[str, int]:
+        return self.faults.metrics()
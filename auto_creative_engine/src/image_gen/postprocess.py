@@ -0,0 +1,201 @@
+"""
+Image post-processing (resize, adjust, brand tint, encode) in a pool of processes.
+"""
+
+import multiprocessing
+import multiprocessing.util
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from io import BytesIO
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from ..config.constants import OUTPUT_IMAGE_QUALITY
+from ..config.settings import ImageGenConfig
+from ..utils.logger import get_logger
+from .image_utils import adjust_image, save_image, tint_image
+
+logger = get_logger()
+
+
+@dataclass(frozen=True)
+class PostProcessSpec:
+    """What to do to each image of a batch; small and picklable, unlike the images."""
+    max_size: Optional[int] = None
+    quality: int = OUTPUT_IMAGE_QUALITY
+    brightness: float = 1.0
+    contrast: float = 1.0
+    saturation: float = 1.0
+    sharpness: float = 1.0
+    tint_color: Optional[str] = None
+    tint_intensity: float = 0.0
+
+    @classmethod
+    def from_config(cls, config: ImageGenConfig) -> "PostProcessSpec":
+        post = config.postprocess
+        tinted = bool(post.brand_color) and post.brand_tint > 0
+        return cls(
+            max_size=config.max_image_size,
+            quality=config.output_quality,
+            brightness=post.brightness,
+            contrast=post.contrast,
+            saturation=post.saturation,
+            sharpness=post.sharpness,
+            tint_color=post.brand_color if tinted else None,
+            tint_intensity=post.brand_tint if tinted else 0.0
+        )
+
+    @property
+    def adjusts(self) -> bool:
+        """Whether pixels change beyond resizing, so every image must be decoded."""
+        return (
+            (self.brightness, self.contrast, self.saturation, self.sharpness) != (1.0, 1.0, 1.0, 1.0)
+            or self.tint_color is not None
+        )
+
+
+def render(data, output_path: Path, spec: PostProcessSpec) -> int:
+    """Decode, resize, adjust, tint and encode one image to ``output_path``; returns the bytes written."""
+    with Image.open(BytesIO(data)) as img:
+        # Shrink first so the adjustments touch fewer pixels; JPEGs decode at reduced scale
+        if spec.max_size and max(img.size) > spec.max_size:
+            img.thumbnail((spec.max_size, spec.max_size), Image.LANCZOS)
+        img = adjust_image(img, spec.brightness, spec.contrast, spec.saturation, spec.sharpness)
+        if spec.tint_color is not None:
+            img = tint_image(img, spec.tint_color, spec.tint_intensity)
+        save_image(img, output_path, quality=spec.quality)
+    return output_path.stat().st_size
+
+
+def _render_shared(name: str, offset: int, length: int, output_path: str, spec: PostProcessSpec) -> Tuple[int, float]:
+    """Pool task: render one image of a batch held in shared memory; returns bytes written and CPU time."""
+    started = time.process_time()
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        view = block.buf[offset:offset + length]
+        try:
+            size = render(view, Path(output_path), spec)
+        finally:
+            view.release()
+    finally:
+        block.close()
+    return size, time.process_time() - started
+
+
+class ImagePostProcessor:
+    """Post-processes batches of encoded images in worker processes.
+
+    A batch is copied once into a shared-memory block; each worker reads its
+    image from there and writes the encoded file itself, so neither buffers
+    nor PIL images are pickled. Decoding and encoding scale with cores while
+    the calling network threads hold no GIL, only wait. The pool starts on
+    first use. If it breaks, that batch is rendered on the calling thread
+    and the pool is restarted, up to ``max_restarts`` times; after that
+    every batch is rendered in-process.
+    """
+
+    def __init__(self, workers: int, max_restarts: int = 1):
+        self.workers = max(1, workers)
+        self.restarts_left = max_restarts
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._stats = {
+            "batches": 0, "images": 0, "bytes_in": 0, "bytes_out": 0,
+            "worker_cpu_seconds": 0.0, "fallbacks": 0
+        }
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # Spawned workers are safe to start from a process full of threads
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+                )
+                # A multiprocessing child joins its children before atexit hooks run, so stop the
+                # workers from a finalizer that runs before the pool's queues close; otherwise a
+                # run inside a worker process never exits
+                multiprocessing.util.Finalize(self, self.shutdown, exitpriority=100)
+                logger.info(f"Started image post-processing pool ({self.workers} workers)")
+            return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+                self.restarts_left -= 1
+            self._stats["fallbacks"] += 1
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def process(self, buffers: List[bytes], output_paths: List[Path], spec: PostProcessSpec) -> List[Path]:
+        """Render each buffer to its output path, in parallel; returns the paths."""
+        if not buffers:
+            return []
+        block = shared_memory.SharedMemory(create=True, size=sum(len(data) for data in buffers))
+        try:
+            offsets = []
+            position = 0
+            for data in buffers:
+                block.buf[position:position + len(data)] = data
+                offsets.append(position)
+                position += len(data)
+
+            results = None
+            if self.restarts_left >= 0:
+                pool = self._get_pool()
+                try:
+                    futures = [
+                        pool.submit(_render_shared, block.name, offset, len(data), str(path), spec)
+                        for offset, data, path in zip(offsets, buffers, output_paths)
+                    ]
+                    # Every worker must be done with the block before it is unlinked
+                    wait(futures)
+                    results = [future.result() for future in futures]
+                except BrokenProcessPool as e:
+                    logger.warning(f"Image post-processing pool failed ({e}); rendering this batch in-process")
+                    self._discard_pool(pool)
+            if results is None:
+                results = [(render(data, path, spec), 0.0) for data, path in zip(buffers, output_paths)]
+        finally:
+            block.close()
+            block.unlink()
+
+        with self._lock:
+            self._stats["batches"] += 1
+            self._stats["images"] += len(buffers)
+            self._stats["bytes_in"] += position
+            self._stats["bytes_out"] += sum(size for size, _ in results)
+            self._stats["worker_cpu_seconds"] += sum(cpu for _, cpu in results)
+        return list(output_paths)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Batches, images and bytes processed, and CPU time spent in workers."""
+        with self._lock:
+            stats = dict(self._stats, workers=self.workers)
+        stats["worker_cpu_seconds"] = round(stats["worker_cpu_seconds"], 3)
+        return stats
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
+
+
+_processors: Dict[int, ImagePostProcessor] = {}
+_processors_lock = threading.Lock()
+
+
+def get_postprocessor(workers: int) -> ImagePostProcessor:
+    """Get the process-wide post-processor for a worker count, so clients share one pool."""
+    with _processors_lock:
+        processor = _processors.get(workers)
+        if processor is None:
+            processor = ImagePostProcessor(workers)
+            _processors[workers] = processor
+        return processor
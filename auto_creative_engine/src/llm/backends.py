@@ -0,0 +1,65 @@
+"""
+Text generation backends behind GeminiClient: the Gen AI SDK or an offline mock.
+"""
+
+from typing import Any, AsyncIterator, Optional
+
+from ..config.settings import LLMConfig
+from ..config.constants import GEMINI_TIMEOUT
+
+
+class TextBackend:
+    """Provider interface used by ``GeminiClient``.
+
+    Mirrors the slice of ``client.aio.models`` the client calls, so the SDK
+    backend is a thin pass-through and fakes need no SDK types.
+    """
+
+    name = 'base'
+
+    def content_config(self, **fields) -> Any:
+        """Build a generation config (temperature, max_output_tokens, response schema)."""
+        raise NotImplementedError
+
+    async def generate_content(self, model: str, contents: str, config: Any) -> Any:
+        """Return a response with ``text`` and ``usage_metadata``."""
+        raise NotImplementedError
+
+    async def generate_content_stream(self, model: str, contents: str, config: Any) -> AsyncIterator[Any]:
+        """Return an async iterator of response chunks."""
+        raise NotImplementedError
+
+
+class GenAITextBackend(TextBackend):
+    """Google Gen AI SDK over the shared, pooled client."""
+
+    name = 'gemini'
+
+    def __init__(self, api_key: str, timeout: Optional[float] = GEMINI_TIMEOUT, base_url: Optional[str] = None):
+        from ..services.client_registry import get_genai_client
+
+        self.client = get_genai_client(api_key, timeout=timeout, base_url=base_url)
+
+    def content_config(self, **fields) -> Any:
+        from google.genai import types
+
+        return types.GenerateContentConfig(**fields)
+
+    async def generate_content(self, model: str, contents: str, config: Any) -> Any:
+        return await self.client.aio.models.generate_content(model=model, contents=contents, config=config)
+
+    async def generate_content_stream(self, model: str, contents: str, config: Any) -> AsyncIterator[Any]:
+        return await self.client.aio.models.generate_content_stream(model=model, contents=contents, config=config)
+
+
+def get_text_backend(config: LLMConfig, api_key: Optional[str] = None) -> TextBackend:
+    """Backend named by ``config.backend``; only the Gen AI backend needs an API key."""
+    if config.backend == 'mock':
+        from .mock_backend import MockTextBackend
+
+        return MockTextBackend(config.mock)
+    if config.backend != 'gemini':
+        raise ValueError(f"Unknown text backend: {config.backend}")
+    if not api_key:
+        raise ValueError("Gemini API key is required")
+    return GenAITextBackend(api_key, base_url=config.base_url)
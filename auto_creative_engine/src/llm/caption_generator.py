@@ -2,15 +2,39 @@
 Caption generator for creating ad captions.
 """
 
-from typing import List, Dict, Any, Optional
+import asyncio
+from typing import List, Dict, Optional, Tuple, AsyncIterator, Callable, Iterator
 from pathlib import Path
 
 from .llm_client import get_llm_client, LLMClient
 from ..config.settings import LLMConfig, BrandConfig
+from ..config.constants import CAPTION_BATCH_SIZE, LLM_BATCH_MAX_TOKENS
 from ..utils.logger import get_logger
+from ..utils.async_utils import run_sync, iterate_sync, merge_streams
+from ..utils.json_utils import parse_batch_items
 
 logger = get_logger()
 
+CAPTION_STYLES = ['engaging', 'professional', 'playful', 'bold']
+
+CAPTION_BATCH_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "captions": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "index": {"type": "INTEGER"},
+                    "caption": {"type": "STRING"},
+                },
+                "required": ["index", "caption"],
+            },
+        },
+    },
+    "required": ["captions"],
+}
+
 
 class CaptionGenerator:
     """Generates creative captions for ad creatives."""
@@ -26,8 +50,14 @@ class CaptionGenerator:
             config=llm_config
         )
         self.brand_config = brand_config or BrandConfig()
+        self.batched = llm_config.batch_captions if llm_config else True
         logger.info("Initialized CaptionGenerator")
     
+    @property
+    def tone(self) -> str:
+        """Caption tone, which may differ from the tone used for image prompts."""
+        return self.brand_config.caption_tone or self.brand_config.tone
+    
     def generate_caption(
         self,
         image_description: str,
@@ -36,24 +66,7 @@ class CaptionGenerator:
         max_length: int = 150
     ) -> str:
         """Generate a single ad caption."""
-        llm_prompt = f"""Generate a compelling social media ad caption for this creative.
-
-Image Description: {image_description}
-Product: {product_description or 'Not specified'}
-Brand: {self.brand_config.name}
-Brand Tone: {self.brand_config.tone}
-Style: {style}
-
-Requirements:
-- Engaging and attention-grabbing
-- Suitable for social media (Instagram, Facebook, Twitter)
-- Include a call-to-action
-- Match the brand tone: {self.brand_config.tone}
-- Maximum {max_length} characters
-- Use emojis sparingly (1-2 max)
-- Be concise and impactful
-
-Generate ONLY the caption text, nothing else:"""
+        llm_prompt = self._build_llm_prompt(image_description, product_description, style, max_length)
         
         try:
             caption = self.llm_client.generate(
@@ -61,23 +74,237 @@ Generate ONLY the caption text, nothing else:"""
                 temperature=0.7,
                 max_tokens=200
             )
-            
-            # Clean up and validate length
-            caption = caption.strip()
-            if caption.startswith('"') and caption.endswith('"'):
-                caption = caption[1:-1]
-            
-            # Truncate if too long
-            if len(caption) > max_length:
-                caption = caption[:max_length-3] + "..."
-            
-            logger.debug(f"Generated caption ({len(caption)} chars)")
-            return caption
+            return self._clean_caption(caption, max_length)
         
         except Exception as e:
             logger.warning(f"LLM caption generation failed, using template: {e}")
             return self._get_fallback_caption(product_description or "product")
     
+    async def agenerate_captions(
+        self,
+        image_descriptions: List[str],
+        product_description: Optional[str] = None,
+        styles: Optional[List[str]] = None,
+        max_length: int = 150
+    ) -> List[str]:
+        """Generate one caption per image description concurrently."""
+        styles = styles or ['engaging'] * len(image_descriptions)
+        llm_prompts = [
+            self._build_llm_prompt(desc, product_description, style, max_length)
+            for desc, style in zip(image_descriptions, styles)
+        ]
+        responses = await self.llm_client.agenerate_many(
+            llm_prompts,
+            temperature=0.7,
+            max_tokens=200,
+            return_exceptions=True
+        )
+        
+        captions = []
+        for response in responses:
+            if isinstance(response, BaseException):
+                logger.warning(f"LLM caption generation failed, using template: {response}")
+                captions.append(self._get_fallback_caption(product_description or "product"))
+            else:
+                captions.append(self._clean_caption(response, max_length))
+        return captions
+    
+    async def astream_captions(
+        self,
+        image_descriptions: List[str],
+        product_description: Optional[str] = None,
+        styles: Optional[List[str]] = None,
+        max_length: int = 150
+    ) -> AsyncIterator[Tuple[int, str, bool]]:
+        """Stream one caption per description concurrently, yielding (index, text_so_far, done)."""
+        styles = styles or ['engaging'] * len(image_descriptions)
+        streams = [
+            self._astream_single_caption(i, desc, product_description, style, max_length)
+            for i, (desc, style) in enumerate(zip(image_descriptions, styles))
+        ]
+        async for event in merge_streams(streams):
+            yield event
+    
+    def stream_captions(
+        self,
+        image_descriptions: List[str],
+        product_description: Optional[str] = None,
+        styles: Optional[List[str]] = None,
+        max_length: int = 150
+    ) -> Iterator[Tuple[int, str, bool]]:
+        """Stream captions from synchronous code."""
+        return iterate_sync(self.astream_captions(
+            image_descriptions,
+            product_description,
+            styles=styles,
+            max_length=max_length
+        ))
+    
+    def stream_caption(
+        self,
+        image_description: str,
+        product_description: Optional[str] = None,
+        style: str = 'engaging',
+        max_length: int = 150
+    ) -> Iterator[str]:
+        """Stream a single caption, yielding the text so far; the last item is final."""
+        for _, text, _ in self.stream_captions(
+            [image_description],
+            product_description,
+            styles=[style],
+            max_length=max_length
+        ):
+            yield text
+    
+    async def _astream_single_caption(
+        self,
+        index: int,
+        image_description: str,
+        product_description: Optional[str],
+        style: str,
+        max_length: int
+    ) -> AsyncIterator[Tuple[int, str, bool]]:
+        """Stream one caption, finishing with the cleaned text or the fallback."""
+        text = ""
+        try:
+            async for delta in self.llm_client.agenerate_stream(
+                self._build_llm_prompt(image_description, product_description, style, max_length),
+                temperature=0.7,
+                max_tokens=200
+            ):
+                text += delta
+                yield index, text, False
+        except Exception as e:
+            logger.warning(f"LLM caption streaming failed, using template: {e}")
+            text = ""
+        
+        if text.strip():
+            yield index, self._clean_caption(text, max_length), True
+        else:
+            yield index, self._get_fallback_caption(product_description or "product"), True
+    
+    async def agenerate_caption_batch(
+        self,
+        image_descriptions: List[str],
+        product_description: Optional[str] = None,
+        num_variations: int = 1,
+        max_length: int = 150,
+        on_delta: Optional[Callable[[int, str, bool], None]] = None
+    ) -> List[List[str]]:
+        """Generate every caption variation for every image in a few structured requests.
+        
+        When ``on_delta`` is given, captions are streamed individually instead and
+        the callback receives ``(item_index, text_so_far, done)``.
+        """
+        styles = [CAPTION_STYLES[j % len(CAPTION_STYLES)] for j in range(num_variations)]
+        items = [(i, style) for i in range(len(image_descriptions)) for style in styles]
+        
+        if on_delta is not None:
+            captions = [""] * len(items)
+            async for index, text, done in self.astream_captions(
+                [image_descriptions[i] for i, _ in items],
+                product_description,
+                styles=[style for _, style in items],
+                max_length=max_length
+            ):
+                on_delta(index, text, done)
+                if done:
+                    captions[index] = text
+        elif not self.batched:
+            captions = await self.agenerate_captions(
+                [image_descriptions[i] for i, _ in items],
+                product_description,
+                styles=[style for _, style in items],
+                max_length=max_length
+            )
+        else:
+            # Keep all variations of an image in the same request
+            images_per_chunk = max(1, CAPTION_BATCH_SIZE // max(1, num_variations))
+            chunk_size = images_per_chunk * num_variations
+            chunks = [items[k:k + chunk_size] for k in range(0, len(items), chunk_size)]
+            
+            results = await asyncio.gather(*[
+                self._agenerate_caption_chunk(chunk, image_descriptions, product_description, max_length)
+                for chunk in chunks
+            ])
+            captions = [caption for chunk_captions in results for caption in chunk_captions]
+        
+        return [
+            captions[i * num_variations:(i + 1) * num_variations]
+            for i in range(len(image_descriptions))
+        ]
+    
+    async def _agenerate_caption_chunk(
+        self,
+        chunk: List[Tuple[int, str]],
+        image_descriptions: List[str],
+        product_description: Optional[str],
+        max_length: int
+    ) -> List[str]:
+        """Caption one chunk of (image, style) items, falling back per missing item."""
+        parsed: Dict[int, str] = {}
+        try:
+            data = await self.llm_client.agenerate_json(
+                self._build_batch_llm_prompt(chunk, image_descriptions, product_description, max_length),
+                CAPTION_BATCH_SCHEMA,
+                temperature=0.7,
+                max_tokens=min(200 * len(chunk) + 200, LLM_BATCH_MAX_TOKENS)
+            )
+            parsed = parse_batch_items(
+                data, 'captions', 'caption', len(chunk), lambda text: self._clean_caption(text, max_length)
+            )
+        except Exception as e:
+            logger.warning(f"Batched caption request failed: {e}")
+        
+        missing = [slot for slot in range(len(chunk)) if slot not in parsed]
+        if missing:
+            logger.info(f"Batched caption response missing {len(missing)} items, generating individually")
+            retried = await self.agenerate_captions(
+                [image_descriptions[chunk[slot][0]] for slot in missing],
+                product_description,
+                styles=[chunk[slot][1] for slot in missing],
+                max_length=max_length
+            )
+            parsed.update(zip(missing, retried))
+        
+        return [parsed[slot] for slot in range(len(chunk))]
+    
+    def _build_batch_llm_prompt(
+        self,
+        chunk: List[Tuple[int, str]],
+        image_descriptions: List[str],
+        product_description: Optional[str],
+        max_length: int
+    ) -> str:
+        """Build one LLM request covering several captions."""
+        image_ids = sorted({i for i, _ in chunk})
+        image_lines = "\n".join(f"Image {i + 1}: {image_descriptions[i]}" for i in image_ids)
+        item_lines = "\n".join(
+            f"{slot + 1}. Image {i + 1}, style: {style}"
+            for slot, (i, style) in enumerate(chunk)
+        )
+        return f"""Generate compelling social media ad captions for these creatives.
+
+Product: {product_description or 'Not specified'}
+Brand: {self.brand_config.name}
+Brand Tone: {self.tone}
+
+{image_lines}
+
+Captions to write:
+{item_lines}
+
+Requirements for every caption:
+- Engaging and attention-grabbing
+- Suitable for social media (Instagram, Facebook, Twitter)
+- Include a call-to-action
+- Match the brand tone: {self.tone}
+- Maximum {max_length} characters
+- Use emojis sparingly (1-2 max)
+- Be concise and impactful
+
+Return JSON with a "captions" array containing exactly {len(chunk)} objects, each with the caption number as "index" and the "caption" text."""
+    
     def generate_multiple_captions(
         self,
         image_descriptions: List[str],
@@ -85,24 +312,57 @@ Generate ONLY the caption text, nothing else:"""
         num_variations: int = 1
     ) -> Dict[str, List[str]]:
         """Generate multiple caption variations for each image."""
-        results = {}
+        captions = run_sync(self.agenerate_caption_batch(
+            image_descriptions,
+            product_description,
+            num_variations=num_variations
+        ))
         
-        for i, desc in enumerate(image_descriptions):
-            variations = []
-            for j in range(num_variations):
-                style = ['engaging', 'professional', 'playful', 'bold'][j % 4]
-                caption = self.generate_caption(
-                    desc,
-                    product_description,
-                    style=style
-                )
-                variations.append(caption)
-            
-            results[f"image_{i+1}"] = variations
+        results = {f"image_{i+1}": variations for i, variations in enumerate(captions)}
         
         logger.info(f"Generated captions for {len(image_descriptions)} images")
         return results
     
+    def _build_llm_prompt(
+        self,
+        image_description: str,
+        product_description: Optional[str],
+        style: str,
+        max_length: int
+    ) -> str:
+        """Build the LLM request for a single caption."""
+        return f"""Generate a compelling social media ad caption for this creative.
+
+Image Description: {image_description}
+Product: {product_description or 'Not specified'}
+Brand: {self.brand_config.name}
+Brand Tone: {self.tone}
+Style: {style}
+
+Requirements:
+- Engaging and attention-grabbing
+- Suitable for social media (Instagram, Facebook, Twitter)
+- Include a call-to-action
+- Match the brand tone: {self.tone}
+- Maximum {max_length} characters
+- Use emojis sparingly (1-2 max)
+- Be concise and impactful
+
+Generate ONLY the caption text, nothing else:"""
+    
+    def _clean_caption(self, caption: str, max_length: int) -> str:
+        """Clean up and validate the length of an LLM caption."""
+        caption = caption.strip()
+        if caption.startswith('"') and caption.endswith('"'):
+            caption = caption[1:-1]
+        
+        # Truncate if too long
+        if len(caption) > max_length:
+            caption = caption[:max_length-3] + "..."
+        
+        logger.debug(f"Generated caption ({len(caption)} chars)")
+        return caption
+    
     def _get_fallback_caption(self, product_description: str) -> str:
         """Generate a fallback caption if LLM fails."""
         templates = [
@@ -2,68 +2,342 @@
 LLM client for Google Gemini API.
 """
 
-from typing import Optional
-from google.genai import Client, types
+import asyncio
+import contextlib
+import weakref
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Union
 
 from ..config.settings import LLMConfig
 from ..utils.logger import get_logger
+from ..utils.async_utils import run_sync, iterate_sync
+from ..utils.json_utils import parse_json_response
+from ..services.response_cache import ResponseCache, get_response_cache
+from ..services.rate_limiter import get_rate_limiter, estimate_tokens
+from ..services.retry_policy import RetryPolicy
+from ..services.usage_meter import record_text_usage
+from ..utils.tracing import span
+from .backends import get_text_backend
 
 logger = get_logger()
 
+SYSTEM_PREAMBLE = "You are a creative AI assistant specialized in generating marketing content and ad creatives."
+
 
 class GeminiClient:
     """Google Gemini client for text generation."""
-    
+
     def __init__(self, api_key: Optional[str] = None, config: Optional[LLMConfig] = None):
         self.config = config or LLMConfig(provider='gemini')
         self.api_key = api_key or self.config.api_key
-        
-        if not self.api_key:
-            raise ValueError("Gemini API key is required")
-        
-        self.client = Client(api_key=self.api_key)
+        self.backend = get_text_backend(self.config, self.api_key)
         model_name = self.config.model or 'gemini-2.5-flash'
         self.model_name = model_name
-        logger.info(f"Initialized Gemini client with model: {model_name}")
-    
-    def generate(
+        self.retry_policy = RetryPolicy(attempt_timeout=self.config.timeout)
+        self.max_concurrency = max(1, self.config.max_concurrency)
+        self.cache: Optional[ResponseCache] = (
+            get_response_cache(ttl_seconds=self.config.cache_ttl_seconds, bypass=self.config.cache_bypass)
+            if self.config.cache_enabled else None
+        )
+        # One semaphore per event loop; asyncio primitives cannot be shared across loops
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+        logger.info(f"Initialized Gemini client with model: {model_name} ({self.backend.name} backend)")
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Get the concurrency semaphore for the running event loop."""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    def _build_request(
+        self,
+        prompt: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        response_schema: Optional[Dict[str, Any]] = None
+    ) -> tuple:
+        """Build the full prompt and generation config for a request."""
+        temperature = temperature if temperature is not None else self.config.temperature
+
+        fields = {
+            "temperature": temperature,
+            "max_output_tokens": max_tokens or self.config.max_tokens,
+        }
+        if response_schema is not None:
+            fields["response_mime_type"] = 'application/json'
+            fields["response_schema"] = response_schema
+        gen_config = self.backend.content_config(**fields)
+
+        full_prompt = f"{SYSTEM_PREAMBLE}\n\n{prompt}"
+        return full_prompt, gen_config
+
+    def _cache_key(
+        self,
+        model_name: str,
+        full_prompt: str,
+        gen_config: Any,
+        response_schema: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Key a request in the response cache."""
+        # Mock responses must never be served in place of real ones
+        if self.backend.name != 'gemini':
+            model_name = f"{self.backend.name}/{model_name}"
+        return ResponseCache.make_key(
+            model_name,
+            full_prompt,
+            gen_config.temperature,
+            gen_config.max_output_tokens,
+            response_schema
+        )
+
+    @staticmethod
+    def _accepts(validate: Optional[Callable[[str], Any]], text: str) -> bool:
+        """Whether a cached reply passes ``validate``; entries from older runs may not."""
+        if validate is None:
+            return True
+        try:
+            validate(text)
+            return True
+        except Exception:
+            return False
+
+    async def agenerate(
         self,
         prompt: str,
         model: Optional[str] = None,
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
+        response_schema: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True,
+        refresh: bool = False,
+        validate: Optional[Callable[[str], Any]] = None,
         **kwargs
     ) -> str:
-        """Generate text using Google Gemini."""
+        """Generate text using Google Gemini without blocking the event loop.
+
+        ``refresh`` skips the cache read but still stores the new reply. A reply
+        is cached only if it is non-empty and ``validate`` (when given) accepts
+        it without raising; a rejected reply is raised to the caller.
+        """
         try:
-            temperature = temperature if temperature is not None else self.config.temperature
-            
-            # Update model if specified
-            if model and model != self.model_name:
-                self.model_name = model
-                logger.debug(f"Switched to model: {model}")
-            
-            gen_config = types.GenerateContentConfig(
-                temperature=temperature,
-                max_output_tokens=max_tokens or self.config.max_tokens,
+            model_name = model or self.model_name
+            full_prompt, gen_config = self._build_request(
+                prompt, temperature, max_tokens, response_schema
             )
-            
-            full_prompt = f"You are a creative AI assistant specialized in generating marketing content and ad creatives.\n\n{prompt}"
-            
-            response = self.client.models.generate_content(
-                model=self.model_name,
+
+            cache_key = None
+            if self.cache is not None and use_cache:
+                cache_key = self._cache_key(model_name, full_prompt, gen_config, response_schema)
+                cached = None if refresh else await asyncio.to_thread(self.cache.get, cache_key)
+                if cached is not None and not self._accepts(validate, cached):
+                    cached = None
+                if cached is not None:
+                    logger.debug("Served Gemini response from cache")
+                    record_text_usage(model_name, cached=True)
+                    return cached
+
+            limiter = get_rate_limiter('text', model_name)
+            reserved = estimate_tokens(full_prompt) + gen_config.max_output_tokens
+
+            @contextlib.asynccontextmanager
+            async def _slot():
+                # Quota first, so a throttled request does not hold a concurrency slot
+                await limiter.aacquire(reserved)
+                async with self._get_semaphore():
+                    yield
+
+            async def _attempt():
+                return await self.backend.generate_content(
+                    model=model_name,
+                    contents=full_prompt,
+                    config=gen_config,
+                )
+
+            with span("gemini.generate_content", category="llm", cpu=False, model=model_name):
+                response = await self.retry_policy.acall(_attempt, slot=_slot)
+            usage = getattr(response, "usage_metadata", None)
+            limiter.settle(reserved, getattr(usage, "total_token_count", None))
+            record_text_usage(model_name, usage)
+
+            content = (getattr(response, "text", "") or "").strip()
+            logger.debug("Generated text with Gemini")
+
+            if validate is not None:
+                validate(content)
+            if cache_key is not None and content:
+                await asyncio.to_thread(self.cache.put, cache_key, content, model_name)
+            return content
+
+        except Exception as e:
+            logger.error(f"Error generating text with Gemini: {e}")
+            raise
+
+    async def agenerate_stream(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        use_cache: bool = True
+    ) -> AsyncIterator[str]:
+        """Stream generated text chunks as they arrive."""
+        model_name = model or self.model_name
+        full_prompt, gen_config = self._build_request(prompt, temperature, max_tokens)
+
+        cache_key = None
+        if self.cache is not None and use_cache:
+            cache_key = self._cache_key(model_name, full_prompt, gen_config)
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached is not None:
+                record_text_usage(model_name, cached=True)
+                yield cached
+                return
+
+        limiter = get_rate_limiter('text', model_name)
+        reserved = estimate_tokens(full_prompt) + gen_config.max_output_tokens
+        parts = []
+        usage = None
+
+        async def _open():
+            return await self.backend.generate_content_stream(
+                model=model_name,
                 contents=full_prompt,
                 config=gen_config,
             )
-            
-            content = getattr(response, "text", "")
-            logger.debug(f"Generated text with Gemini")
-            return content.strip()
-        
+
+        try:
+            with span("gemini.generate_content_stream", category="llm", cpu=False, model=model_name):
+                await limiter.aacquire(reserved)
+                async with self._get_semaphore():
+                    # Only opening the stream is retried; a failure mid-stream propagates
+                    stream = await self.retry_policy.acall(_open)
+                    async for chunk in stream:
+                        usage = getattr(chunk, "usage_metadata", None) or usage
+                        text = getattr(chunk, "text", None)
+                        if text:
+                            parts.append(text)
+                            yield text
         except Exception as e:
-            logger.error(f"Error generating text with Gemini: {e}")
+            logger.error(f"Error streaming text with Gemini: {e}")
             raise
 
+        limiter.settle(reserved, getattr(usage, "total_token_count", None))
+        record_text_usage(model_name, usage)
+        content = "".join(parts).strip()
+        if cache_key is not None and content:
+            await asyncio.to_thread(self.cache.put, cache_key, content, model_name)
+
+    async def agenerate_json(
+        self,
+        prompt: str,
+        response_schema: Dict[str, Any],
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        refresh: bool = False
+    ) -> Any:
+        """Generate structured output constrained by a JSON response schema.
+
+        Replies that do not parse are never cached, so a retry asks the model again.
+        """
+        text = await self.agenerate(
+            prompt,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            response_schema=response_schema,
+            refresh=refresh,
+            validate=parse_json_response
+        )
+        return parse_json_response(text)
+
+    async def agenerate_many(
+        self,
+        prompts: List[str],
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        return_exceptions: bool = False
+    ) -> List[Union[str, BaseException]]:
+        """Generate text for several prompts concurrently, bounded by max_concurrency."""
+        tasks = [
+            self.agenerate(p, model=model, temperature=temperature, max_tokens=max_tokens)
+            for p in prompts
+        ]
+        results = await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+        logger.debug(f"Generated {len(results)} texts concurrently")
+        return list(results)
+
+    def generate(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> str:
+        """Generate text using Google Gemini."""
+        return run_sync(self.agenerate(
+            prompt,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **kwargs
+        ))
+
+    def generate_stream(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        use_cache: bool = True
+    ) -> Iterator[str]:
+        """Stream generated text chunks from synchronous code."""
+        return iterate_sync(self.agenerate_stream(
+            prompt,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            use_cache=use_cache
+        ))
+
+    def generate_json(
+        self,
+        prompt: str,
+        response_schema: Dict[str, Any],
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> Any:
+        """Generate structured output from synchronous code."""
+        return run_sync(self.agenerate_json(
+            prompt,
+            response_schema,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens
+        ))
+
+    def generate_many(
+        self,
+        prompts: List[str],
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        return_exceptions: bool = False
+    ) -> List[Union[str, BaseException]]:
+        """Generate text for several prompts concurrently from synchronous code."""
+        return run_sync(self.agenerate_many(
+            prompts,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            return_exceptions=return_exceptions
+        ))
+
 
 def get_llm_client(api_key: Optional[str] = None, config: Optional[LLMConfig] = None):
     """Get Gemini LLM client."""
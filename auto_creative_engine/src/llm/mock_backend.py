@@ -0,0 +1,180 @@
+"""
+Offline text backend returning deterministic prompts and captions.
+"""
+
+import hashlib
+import json
+import random
+import re
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from ..config.settings import MockBackendConfig
+from ..services.fault_injection import FaultInjector
+from ..services.rate_limiter import estimate_tokens
+from .backends import TextBackend
+
+LIGHTING = [
+    'soft golden-hour light', 'crisp studio lighting', 'dramatic rim light',
+    'diffused window light', 'neon accent lighting', 'bright high-key light',
+]
+SETTINGS = [
+    'on a marble countertop', 'in a sunlit loft', 'against a seamless pastel backdrop',
+    'on a rooftop at dusk', 'in a minimalist showroom', 'surrounded by natural textures',
+]
+COMPOSITIONS = [
+    'centered hero composition', 'rule-of-thirds framing', 'low-angle close-up',
+    'flat-lay arrangement', 'shallow depth of field', 'wide cinematic crop',
+]
+HOOKS = ['Meet', 'Say hello to', 'Upgrade to', 'Discover', 'Fall for', 'Level up with']
+CTAS = ['Shop now.', 'Tap to learn more.', 'Get yours today.', 'Try it this week.', 'Order now.']
+EMOJIS = ['✨', '🔥', '🚀', '💫', '🙌', '🎯']
+
+
+@dataclass
+class MockContentConfig:
+    """Stand-in for ``types.GenerateContentConfig``."""
+    temperature: Optional[float] = None
+    max_output_tokens: Optional[int] = None
+    response_mime_type: Optional[str] = None
+    response_schema: Optional[Dict[str, Any]] = None
+
+
+def _field(contents: str, *labels: str) -> Optional[str]:
+    """Value of the first ``Label: value`` line found in the request."""
+    for label in labels:
+        match = re.search(rf"^{re.escape(label)}:\s*(.+)$", contents, re.MULTILINE)
+        if match and match.group(1).strip() not in ('', 'Not specified'):
+            return match.group(1).strip()
+    return None
+
+
+class _Request:
+    """What the mock needs to know about a request, parsed from its text."""
+
+    def __init__(self, contents: str):
+        self.product = _field(contents, 'Product Description', 'Product') or 'the product'
+        self.brand = _field(contents, 'Brand Name', 'Brand') or 'the brand'
+        self.style = _field(contents, 'Style') or 'modern'
+        self.is_caption = 'caption' in contents.lower()
+        limit = re.search(r"Maximum (\d+) characters", contents)
+        self.max_length = int(limit.group(1)) if limit else 200
+        # Numbered "N. item" lines, e.g. the styles or captions a batch asks for
+        self.items: List[str] = re.findall(r"^\d+\.\s+(.+)$", contents, re.MULTILINE)
+        exactly = re.search(r"exactly (\d+)", contents)
+        self.count = int(exactly.group(1)) if exactly else max(1, len(self.items))
+
+    def style_at(self, position: int) -> str:
+        if position < len(self.items):
+            item = self.items[position]
+            # Caption batches list "Image N, style: S"
+            return item.split('style:', 1)[1].strip() if 'style:' in item else item.strip()
+        return self.style
+
+    def prompt_text(self, rng: random.Random, style: str) -> str:
+        return (
+            f"{style.capitalize()} ad creative of {self.product} for {self.brand}, "
+            f"{rng.choice(SETTINGS)}, {rng.choice(LIGHTING)}, {rng.choice(COMPOSITIONS)}, "
+            f"rich brand colors, high detail, no text"
+        )
+
+    def caption_text(self, rng: random.Random) -> str:
+        product = self.product.split(',')[0].split('.')[0][:60].strip()
+        caption = f"{rng.choice(HOOKS)} {product} by {self.brand}. {rng.choice(CTAS)} {rng.choice(EMOJIS)}"
+        return caption[:self.max_length]
+
+
+class MockTextBackend(TextBackend):
+    """Answers like Gemini would, without a network or API key.
+
+    Output is a pure function of the seed, model and request text, and
+    structured requests get JSON matching their response schema.
+    """
+
+    name = 'mock'
+
+    def __init__(self, config: Optional[MockBackendConfig] = None):
+        self.config = config or MockBackendConfig()
+        self.faults = FaultInjector(
+            latency=self.config.text_latency,
+            rate_limit_rate=self.config.rate_limit_rate,
+            timeout_rate=self.config.timeout_rate,
+            timeout_seconds=self.config.timeout_seconds,
+            latency_scale=self.config.latency_scale,
+            seed=self.config.seed
+        )
+
+    def content_config(self, **fields) -> MockContentConfig:
+        return MockContentConfig(**fields)
+
+    def request_key(self, model: str, contents: str) -> str:
+        return hashlib.sha256(f"{model}\n{contents}".encode("utf-8")).hexdigest()
+
+    def _fill(self, schema: Dict[str, Any], request: _Request, rng: random.Random, position: int = 0) -> Any:
+        """Build a value matching a Gemini response schema."""
+        kind = str(schema.get("type", "STRING")).upper()
+        if kind == "OBJECT":
+            style = request.style_at(position)
+            value = {}
+            for name, sub in schema.get("properties", {}).items():
+                if name == "style":
+                    value[name] = style
+                elif name == "prompt":
+                    value[name] = request.prompt_text(rng, style)
+                elif name == "caption":
+                    value[name] = request.caption_text(rng)
+                else:
+                    value[name] = self._fill(sub, request, rng, position)
+            return value
+        if kind == "ARRAY":
+            return [self._fill(schema.get("items", {}), request, rng, i) for i in range(request.count)]
+        if kind in ("INTEGER", "NUMBER"):
+            return position + 1
+        if kind == "BOOLEAN":
+            return True
+        return request.caption_text(rng) if request.is_caption else request.prompt_text(rng, request.style_at(position))
+
+    def respond(self, model: str, contents: str, response_schema: Optional[Dict[str, Any]] = None) -> str:
+        """Response text for a request: JSON when a schema is given, else plain text."""
+        request = _Request(contents)
+        rng = random.Random(f"{self.config.seed}:{self.request_key(model, contents)}")
+        if response_schema:
+            return json.dumps(self._fill(response_schema, request, rng), ensure_ascii=False)
+        if request.is_caption:
+            return request.caption_text(rng)
+        return request.prompt_text(rng, request.style)
+
+    @staticmethod
+    def usage(contents: str, text: str) -> SimpleNamespace:
+        prompt_tokens, output_tokens = estimate_tokens(contents), estimate_tokens(text)
+        return SimpleNamespace(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=output_tokens,
+            thoughts_token_count=0,
+            total_token_count=prompt_tokens + output_tokens
+        )
+
+    async def generate_content(self, model: str, contents: str, config: Any) -> Any:
+        await self.faults.aapply(f"text:{self.request_key(model, contents)}")
+        text = self.respond(model, contents, getattr(config, "response_schema", None))
+        return SimpleNamespace(text=text, usage_metadata=self.usage(contents, text))
+
+    async def generate_content_stream(self, model: str, contents: str, config: Any) -> AsyncIterator[Any]:
+        # Faults and latency land on opening the stream, where the client retries
+        await self.faults.aapply(f"stream:{self.request_key(model, contents)}")
+        text = self.respond(model, contents, getattr(config, "response_schema", None))
+        usage = self.usage(contents, text)
+
+        async def _chunks():
+            words = text.split(' ')
+            step = max(1, len(words) // 4)
+            for start in range(0, len(words), step):
+                last = start + step >= len(words)
+                piece = ' '.join(words[start:start + step]) + ('' if last else ' ')
+                yield SimpleNamespace(text=piece, usage_metadata=usage if last else None)
+
+        return _chunks()
+
+    def metrics(self) -> Dict[str, int]:
+        return self.faults.metrics()
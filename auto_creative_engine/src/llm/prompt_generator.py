@@ -2,16 +2,37 @@
 Prompt generator for creating image generation prompts.
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Optional, AsyncIterator, Callable, Iterator, Tuple
 from pathlib import Path
 
 from .llm_client import get_llm_client, LLMClient
 from ..config.settings import LLMConfig, BrandConfig
-from ..config.constants import PROMPT_STYLES
+from ..config.constants import PROMPT_STYLES, PROMPT_BATCH_RETRIES, LLM_BATCH_MAX_TOKENS
 from ..utils.logger import get_logger
+from ..utils.async_utils import run_sync, iterate_sync, merge_streams
+from ..utils.json_utils import parse_batch_items
 
 logger = get_logger()
 
+PROMPT_BATCH_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "prompts": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "index": {"type": "INTEGER"},
+                    "style": {"type": "STRING"},
+                    "prompt": {"type": "STRING"},
+                },
+                "required": ["index", "style", "prompt"],
+            },
+        },
+    },
+    "required": ["prompts"],
+}
+
 
 class PromptGenerator:
     """Generates creative prompts for image generation."""
@@ -27,58 +48,250 @@ class PromptGenerator:
             config=llm_config
         )
         self.brand_config = brand_config or BrandConfig()
+        self.batched = llm_config.batch_prompts if llm_config else True
         logger.info("Initialized PromptGenerator")
     
     def generate_image_prompts(
         self,
         product_description: str,
         num_prompts: int = 10,
-        style_variations: Optional[List[str]] = None
+        style_variations: Optional[List[str]] = None,
+        on_delta: Optional[Callable[[int, str, bool], None]] = None
     ) -> List[str]:
         """Generate multiple creative image prompts."""
-        style_variations = style_variations or PROMPT_STYLES[:num_prompts]
+        return run_sync(self.agenerate_image_prompts(
+            product_description,
+            num_prompts=num_prompts,
+            style_variations=style_variations,
+            on_delta=on_delta
+        ))
+    
+    async def agenerate_image_prompts(
+        self,
+        product_description: str,
+        num_prompts: int = 10,
+        style_variations: Optional[List[str]] = None,
+        on_delta: Optional[Callable[[int, str, bool], None]] = None
+    ) -> List[str]:
+        """Generate multiple creative image prompts concurrently.
         
-        prompts = []
-        base_prompt_template = self._get_base_prompt_template()
+        When ``on_delta`` is given, prompts are streamed and the callback receives
+        ``(index, text_so_far, done)`` as tokens arrive.
+        """
+        styles = self._resolve_styles(num_prompts, style_variations)
         
-        for i in range(num_prompts):
-            style = style_variations[i % len(style_variations)]
-            prompt = self._generate_single_prompt(
-                product_description,
-                style,
-                base_prompt_template
-            )
-            prompts.append(prompt)
+        if on_delta is not None:
+            prompts = [""] * len(styles)
+            async for index, text, done in self.astream_image_prompts(
+                product_description, num_prompts, style_variations
+            ):
+                on_delta(index, text, done)
+                if done:
+                    prompts[index] = text
+            logger.info(f"Generated {len(prompts)} image prompts")
+            return prompts
+        
+        if self.batched:
+            return await self._agenerate_batched_prompts(product_description, styles)
+        
+        llm_prompts = [self._build_llm_prompt(product_description, style) for style in styles]
+        responses = await self.llm_client.agenerate_many(
+            llm_prompts,
+            temperature=0.8,
+            max_tokens=300,
+            return_exceptions=True
+        )
+        
+        prompts = []
+        for style, response in zip(styles, responses):
+            if isinstance(response, BaseException):
+                logger.warning(f"LLM prompt generation failed, using template: {response}")
+                prompts.append(self._get_fallback_prompt(product_description, style))
+            else:
+                prompts.append(self._clean_prompt(response))
         
         logger.info(f"Generated {len(prompts)} image prompts")
         return prompts
     
-    def _generate_single_prompt(
+    def generate_prompt(
         self,
         product_description: str,
-        style: str,
-        base_template: str
+        index: int = 0,
+        num_prompts: int = 1,
+        style_variations: Optional[List[str]] = None,
+        on_delta: Optional[Callable[[int, str, bool], None]] = None
     ) -> str:
-        """Generate a single creative prompt using LLM."""
-        llm_prompt = f"""Generate a creative, detailed image generation prompt for an advertisement.
+        """Generate the prompt for one slot of a set of ``num_prompts``."""
+        return run_sync(self.agenerate_prompt(
+            product_description,
+            index=index,
+            num_prompts=num_prompts,
+            style_variations=style_variations,
+            on_delta=on_delta
+        ))
+    
+    async def agenerate_prompt(
+        self,
+        product_description: str,
+        index: int = 0,
+        num_prompts: int = 1,
+        style_variations: Optional[List[str]] = None,
+        on_delta: Optional[Callable[[int, str, bool], None]] = None
+    ) -> str:
+        """Generate one prompt, streaming it to ``on_delta`` if given."""
+        style = self._resolve_styles(num_prompts, style_variations)[index]
+        
+        if on_delta is not None:
+            prompt = ""
+            async for _, text, done in self._astream_single_prompt(index, product_description, style):
+                on_delta(index, text, done)
+                if done:
+                    prompt = text
+            return prompt
+        
+        try:
+            response = await self.llm_client.agenerate(
+                self._build_llm_prompt(product_description, style),
+                temperature=0.8,
+                max_tokens=300
+            )
+            return self._clean_prompt(response) or self._get_fallback_prompt(product_description, style)
+        except Exception as e:
+            logger.warning(f"LLM prompt generation failed, using template: {e}")
+            return self._get_fallback_prompt(product_description, style)
+    
+    async def astream_image_prompts(
+        self,
+        product_description: str,
+        num_prompts: int = 10,
+        style_variations: Optional[List[str]] = None
+    ) -> AsyncIterator[Tuple[int, str, bool]]:
+        """Stream all prompts concurrently, yielding (index, text_so_far, done)."""
+        styles = self._resolve_styles(num_prompts, style_variations)
+        streams = [
+            self._astream_single_prompt(i, product_description, style)
+            for i, style in enumerate(styles)
+        ]
+        async for event in merge_streams(streams):
+            yield event
+    
+    def stream_image_prompts(
+        self,
+        product_description: str,
+        num_prompts: int = 10,
+        style_variations: Optional[List[str]] = None
+    ) -> Iterator[Tuple[int, str, bool]]:
+        """Stream prompts from synchronous code."""
+        return iterate_sync(self.astream_image_prompts(
+            product_description,
+            num_prompts=num_prompts,
+            style_variations=style_variations
+        ))
+    
+    async def _astream_single_prompt(
+        self,
+        index: int,
+        product_description: str,
+        style: str
+    ) -> AsyncIterator[Tuple[int, str, bool]]:
+        """Stream one prompt, finishing with the cleaned text or the fallback."""
+        text = ""
+        try:
+            async for delta in self.llm_client.agenerate_stream(
+                self._build_llm_prompt(product_description, style),
+                temperature=0.8,
+                max_tokens=300
+            ):
+                text += delta
+                yield index, text, False
+        except Exception as e:
+            logger.warning(f"LLM prompt streaming failed, using template: {e}")
+            text = ""
+        
+        cleaned = self._clean_prompt(text)
+        yield index, cleaned or self._get_fallback_prompt(product_description, style), True
+    
+    def _resolve_styles(self, num_prompts: int, style_variations: Optional[List[str]]) -> List[str]:
+        """Assign a style to each prompt slot."""
+        style_variations = style_variations or PROMPT_STYLES[:num_prompts]
+        return [style_variations[i % len(style_variations)] for i in range(num_prompts)]
+    
+    async def _agenerate_batched_prompts(
+        self,
+        product_description: str,
+        styles: List[str]
+    ) -> List[str]:
+        """Generate all prompts in one structured request, re-requesting only missing styles."""
+        prompts: Dict[int, str] = {}
+        pending = list(range(len(styles)))
+        
+        for attempt in range(1 + PROMPT_BATCH_RETRIES):
+            if not pending:
+                break
+            
+            llm_prompt = self._build_batch_llm_prompt(
+                product_description,
+                [styles[i] for i in pending]
+            )
+            try:
+                data = await self.llm_client.agenerate_json(
+                    llm_prompt,
+                    PROMPT_BATCH_SCHEMA,
+                    temperature=0.8,
+                    max_tokens=min(300 * len(pending) + 200, LLM_BATCH_MAX_TOKENS),
+                    refresh=attempt > 0
+                )
+            except Exception as e:
+                logger.warning(f"Batched prompt request failed (attempt {attempt + 1}): {e}")
+                continue
+            
+            for slot, text in parse_batch_items(data, 'prompts', 'prompt', len(pending), self._clean_prompt).items():
+                prompts[pending[slot]] = text
+            
+            pending = [i for i in pending if i not in prompts]
+            if pending:
+                logger.info(f"Batched prompt response missing {len(pending)} styles, re-requesting")
+        
+        for i in pending:
+            logger.warning(f"LLM prompt generation failed for style {styles[i]}, using template")
+            prompts[i] = self._get_fallback_prompt(product_description, styles[i])
+        
+        logger.info(f"Generated {len(styles)} image prompts")
+        return [prompts[i] for i in range(len(styles))]
+    
+    def _build_batch_llm_prompt(self, product_description: str, styles: List[str]) -> str:
+        """Build one LLM request covering several styles."""
+        style_lines = "\n".join(f"{i + 1}. {style}" for i, style in enumerate(styles))
+        return f"""Generate {len(styles)} creative, detailed image generation prompts for an advertisement, one per style below.
 
 Product Description: {product_description}
-Style: {style}
 Brand Name: {self.brand_config.name}
 Brand Theme: {self.brand_config.theme}
 Brand Tone: {self.brand_config.tone}
 Brand Colors: {', '.join(self.brand_config.colors) if self.brand_config.colors else 'Not specified'}
 
-Requirements:
+Styles:
+{style_lines}
+
+Requirements for every prompt:
 - Create a compelling, visually striking ad creative
 - Include the product naturally in the scene
-- Use the specified style and theme
+- Use the listed style and the brand theme
 - Make it suitable for social media advertising
 - Be specific about composition, lighting, mood, and colors
-- Keep the prompt under 200 words
+- Keep each prompt under 200 words
 - Do NOT include any text or words in the image description
 
-Generate ONLY the image prompt, nothing else:"""
+Return JSON with a "prompts" array containing exactly {len(styles)} objects, each with the style number as "index", the "style" name and the "prompt" text."""
+    
+    def _generate_single_prompt(
+        self,
+        product_description: str,
+        style: str,
+        base_template: Optional[str] = None
+    ) -> str:
+        """Generate a single creative prompt using LLM."""
+        llm_prompt = self._build_llm_prompt(product_description, style)
         
         try:
             generated_prompt = self.llm_client.generate(
@@ -86,18 +299,41 @@ Generate ONLY the image prompt, nothing else:"""
                 temperature=0.8,
                 max_tokens=300
             )
-            
-            # Clean up the response
-            generated_prompt = generated_prompt.strip()
-            if generated_prompt.startswith('"') and generated_prompt.endswith('"'):
-                generated_prompt = generated_prompt[1:-1]
-            
-            return generated_prompt
+            return self._clean_prompt(generated_prompt)
         
         except Exception as e:
             logger.warning(f"LLM prompt generation failed, using template: {e}")
             return self._get_fallback_prompt(product_description, style)
     
+    def _build_llm_prompt(self, product_description: str, style: str) -> str:
+        """Build the LLM request for a single image prompt."""
+        return f"""Generate a creative, detailed image generation prompt for an advertisement.
+
+Product Description: {product_description}
+Style: {style}
+Brand Name: {self.brand_config.name}
+Brand Theme: {self.brand_config.theme}
+Brand Tone: {self.brand_config.tone}
+Brand Colors: {', '.join(self.brand_config.colors) if self.brand_config.colors else 'Not specified'}
+
+Requirements:
+- Create a compelling, visually striking ad creative
+- Include the product naturally in the scene
+- Use the specified style and theme
+- Make it suitable for social media advertising
+- Be specific about composition, lighting, mood, and colors
+- Keep the prompt under 200 words
+- Do NOT include any text or words in the image description
+
+Generate ONLY the image prompt, nothing else:"""
+    
+    def _clean_prompt(self, generated_prompt: str) -> str:
+        """Clean up an LLM-generated prompt."""
+        generated_prompt = generated_prompt.strip()
+        if generated_prompt.startswith('"') and generated_prompt.endswith('"'):
+            generated_prompt = generated_prompt[1:-1]
+        return generated_prompt
+    
     def _get_base_prompt_template(self) -> str:
         """Get base prompt template."""
         return """Create a professional advertisement image featuring {product} in a {style} style. 
@@ -0,0 +1,342 @@
+"""
+Multi-campaign batch mode: many products and brands in one process.
+"""
+
+import copy
+import csv
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .orchestrator import Orchestrator
+from .packager import Packager
+from .run_manifest import RunManifest, RUN_COMPLETE, RUN_INCOMPLETE, RUN_FAILED
+from .workspace import prune_workspaces
+from ..config.settings import GenerationSettings
+from ..config.constants import (
+    BATCHES_DIR, BATCH_MAX_CAMPAIGNS, ENHANCE_PRESET, PIPELINE_MAX_WORKERS, PIPELINE_MIN_WORKERS
+)
+from ..image_gen.gemini_image_client import GeminiImageClient
+from ..llm.llm_client import get_llm_client
+from ..services.naming_service import NamingService
+from ..utils.json_utils import save_json
+from ..utils.logger import get_logger
+from ..utils.tracing import Tracer
+
+logger = get_logger()
+
+# Manifest column aliases, mapped onto Campaign fields
+_FIELD_ALIASES = {
+    "campaign": "name",
+    "name": "name",
+    "product_description": "product_description",
+    "description": "product_description",
+    "brand_name": "brand_name",
+    "brand": "brand_name",
+    "num_creatives": "num_creatives",
+    "theme": "theme",
+    "tone": "tone",
+    "caption_tone": "caption_tone",
+    "logo": "logo_path",
+    "logo_path": "logo_path",
+    "product_image": "product_image_path",
+    "product_image_path": "product_image_path",
+}
+
+
+@dataclass
+class Campaign:
+    """One product/brand entry of a batch manifest; unset fields use the CLI defaults."""
+    name: str
+    product_description: str
+    brand_name: Optional[str] = None
+    num_creatives: Optional[int] = None
+    theme: Optional[str] = None
+    tone: Optional[str] = None
+    caption_tone: Optional[str] = None
+    logo_path: Optional[Path] = None
+    product_image_path: Optional[Path] = None
+    # Generation options; queued jobs carry them so every worker renders a job the same way
+    variations: Optional[int] = None
+    num_images: Optional[int] = None
+    enhance: Optional[bool] = None
+    brand_tint: Optional[float] = None
+    backend: Optional[str] = None
+
+    def to_payload(self) -> Dict[str, Any]:
+        """JSON-serialisable form, e.g. for a queued job."""
+        payload = asdict(self)
+        for key in ("logo_path", "product_image_path"):
+            if payload[key] is not None:
+                payload[key] = str(payload[key])
+        return payload
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any]) -> "Campaign":
+        values = dict(payload)
+        for key in ("logo_path", "product_image_path"):
+            if values.get(key):
+                values[key] = Path(values[key])
+        return cls(**values)
+
+
+def _campaign_from_row(row: Dict[str, Any], position: int, base_dir: Path, source: str) -> Campaign:
+    values = {}
+    for key, value in row.items():
+        field_name = _FIELD_ALIASES.get(str(key).strip().lower())
+        if field_name is None or value is None or str(value).strip() == "":
+            continue
+        values[field_name] = value.strip() if isinstance(value, str) else value
+
+    if not values.get("product_description"):
+        raise ValueError(f"{source}: product_description is required")
+    if "num_creatives" in values:
+        try:
+            values["num_creatives"] = int(values["num_creatives"])
+        except ValueError:
+            raise ValueError(f"{source}: num_creatives must be an integer")
+    # Image paths in a manifest are relative to the manifest itself
+    for key in ("logo_path", "product_image_path"):
+        if key in values:
+            path = Path(values[key]).expanduser()
+            values[key] = path if path.is_absolute() else base_dir / path
+    values.setdefault("name", f"campaign_{position:03d}")
+    return Campaign(**values)
+
+
+def load_campaigns(manifest_path: Path) -> List[Campaign]:
+    """Read campaigns from a ``.jsonl`` (one object per line) or ``.csv`` manifest."""
+    suffix = manifest_path.suffix.lower()
+    base_dir = manifest_path.parent
+    campaigns = []
+
+    with open(manifest_path, 'r', encoding='utf-8', newline='') as f:
+        if suffix == '.csv':
+            for position, row in enumerate(csv.DictReader(f), 1):
+                # Header is line 1
+                source = f"{manifest_path.name}:{position + 1}"
+                campaigns.append(_campaign_from_row(row, position, base_dir, source))
+        elif suffix in ('.jsonl', '.ndjson'):
+            position = 0
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                position += 1
+                source = f"{manifest_path.name}:{line_number}"
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{source}: invalid JSON ({e})")
+                if not isinstance(row, dict):
+                    raise ValueError(f"{source}: expected a JSON object")
+                campaigns.append(_campaign_from_row(row, position, base_dir, source))
+        else:
+            raise ValueError(f"Unsupported manifest format '{suffix}': use .jsonl or .csv")
+
+    names = [c.name for c in campaigns]
+    duplicates = sorted({n for n in names if names.count(n) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate campaign names in {manifest_path.name}: {duplicates}")
+    logger.info(f"Loaded {len(campaigns)} campaigns from {manifest_path}")
+    return campaigns
+
+
+class BatchRunner:
+    """Runs many campaigns concurrently over one set of shared clients.
+
+    The LLM and image clients (with their connection pools, rate limiters,
+    adaptive image concurrency and response cache) are created once, so they
+    act as a single budget for the whole batch. At most ``max_parallel``
+    campaigns run at a time and pipeline threads are split between them.
+    A failing campaign is recorded in the report without stopping the rest.
+    """
+
+    def __init__(
+        self,
+        settings: GenerationSettings,
+        api_key: Optional[str] = None,
+        max_parallel: int = BATCH_MAX_CAMPAIGNS
+    ):
+        self.settings = settings
+        self.api_key = api_key
+        self.max_parallel = max(1, max_parallel)
+        self._clients: Dict[str, Tuple[Any, GeminiImageClient]] = {}
+        self._clients_lock = threading.Lock()
+        self.llm_client, self.image_client = self._clients_for(settings)
+        self.naming_service = NamingService()
+        self.packager = Packager()
+        logger.info(f"Initialized BatchRunner (max {self.max_parallel} campaigns in parallel)")
+
+    def _clients_for(self, settings: GenerationSettings) -> Tuple[Any, GeminiImageClient]:
+        """Shared LLM and image clients for the settings' backend, created on first use."""
+        backend = settings.image_config.backend
+        with self._clients_lock:
+            clients = self._clients.get(backend)
+            if clients is None:
+                clients = (
+                    get_llm_client(api_key=self.api_key or settings.llm_config.api_key, config=settings.llm_config),
+                    GeminiImageClient(
+                        api_key=self.api_key or settings.image_config.api_key, config=settings.image_config
+                    )
+                )
+                self._clients[backend] = clients
+            return clients
+
+    def _settings_for(self, campaign: Campaign) -> GenerationSettings:
+        """Per-campaign copy of the base settings with the campaign's overrides."""
+        settings = copy.deepcopy(self.settings)
+        brand = settings.brand_config
+        brand.name = campaign.brand_name or brand.name
+        brand.theme = campaign.theme or brand.theme
+        brand.tone = campaign.tone or brand.tone
+        brand.caption_tone = campaign.caption_tone or brand.caption_tone
+        settings.num_creatives = campaign.num_creatives or settings.num_creatives
+
+        if campaign.variations is not None:
+            settings.variations_per_prompt = campaign.variations
+        if campaign.num_images is not None:
+            settings.image_config.num_images = campaign.num_images
+        postprocess = settings.image_config.postprocess
+        if campaign.enhance is not None:
+            preset = ENHANCE_PRESET if campaign.enhance else (1.0, 1.0, 1.0, 1.0)
+            postprocess.brightness, postprocess.contrast, postprocess.saturation, postprocess.sharpness = preset
+        if campaign.brand_tint is not None:
+            postprocess.brand_tint = campaign.brand_tint
+        if campaign.backend is not None:
+            settings.set_backend(campaign.backend)
+        return settings
+
+    def run_campaign(
+        self,
+        campaign: Campaign,
+        max_workers: int = PIPELINE_MAX_WORKERS,
+        run_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Generate and package one campaign; never raises.
+
+        If ``run_id`` names a run that already has a manifest, that run is
+        resumed instead of starting over.
+        """
+        settings = self._settings_for(campaign)
+        run_id = run_id or self.naming_service.generate_run_id()
+        entry: Dict[str, Any] = {
+            "campaign": campaign.name,
+            "run_id": run_id,
+            "brand": settings.brand_config.name,
+            "total": settings.num_creatives,
+            "completed": 0,
+        }
+        started = time.monotonic()
+        logger.info(f"Starting campaign {campaign.name} (run {run_id})")
+
+        # Trace generation and packaging together, one trace per campaign
+        tracer = Tracer(run_id)
+        try:
+            with tracer.activate():
+                llm_client, image_client = self._clients_for(settings)
+                orchestrator = Orchestrator(settings, self.api_key, llm_client=llm_client, image_client=image_client)
+                orchestrator.engine.max_workers = max_workers
+                if RunManifest.path_for(run_id).exists():
+                    results = orchestrator.resume(run_id)
+                else:
+                    results = orchestrator.run(
+                        product_description=campaign.product_description,
+                        logo_path=campaign.logo_path,
+                        product_image_path=campaign.product_image_path,
+                        num_creatives=settings.num_creatives,
+                        brand_name=settings.brand_config.name,
+                        run_id=run_id,
+                        prune_outputs=False
+                    )
+                zip_path = self.packager.create_zip_from_results(
+                    results=results,
+                    output_dir=results["output_dir"],
+                    brand_name=settings.brand_config.name
+                )
+            complete = results["count"] == len(results["records"])
+            entry.update({
+                "status": RUN_COMPLETE if complete else RUN_INCOMPLETE,
+                "completed": results["count"],
+                "total": len(results["records"]),
+                "output_dir": str(results["output_dir"]),
+                "zip_path": str(zip_path),
+                "usage": results["usage"]["totals"],
+            })
+        except Exception as e:
+            logger.error(f"Campaign {campaign.name} failed: {e}")
+            entry.update({"status": RUN_FAILED, "error": str(e)})
+
+        try:
+            entry["trace_path"] = str(tracer.write(RunManifest.trace_path_for(run_id)))
+        except OSError as e:
+            logger.warning(f"Could not write trace for campaign {campaign.name}: {e}")
+        entry["seconds"] = round(time.monotonic() - started, 3)
+        return entry
+
+    def run(self, campaigns: List[Campaign], batch_id: Optional[str] = None) -> Dict[str, Any]:
+        """Run every campaign and write the batch report."""
+        batch_id = batch_id or self.naming_service.generate_run_id()
+        started_at = datetime.now().isoformat(timespec="seconds")
+        started = time.monotonic()
+
+        # Prune once up front; per-run pruning would delete this batch's own earlier outputs
+        prune_workspaces(self.settings.output_dir)
+
+        # Campaigns split one budget of PIPELINE_MAX_WORKERS, so parallel * workers never exceeds it
+        parallel = max(1, min(self.max_parallel, len(campaigns), PIPELINE_MAX_WORKERS // PIPELINE_MIN_WORKERS))
+        if parallel < min(self.max_parallel, len(campaigns)):
+            logger.info(f"Limiting batch to {parallel} campaigns at once to stay within {PIPELINE_MAX_WORKERS} pipeline workers")
+        workers = PIPELINE_MAX_WORKERS // parallel
+        logger.info(
+            f"Running batch {batch_id}: {len(campaigns)} campaigns, "
+            f"{parallel} in parallel, {workers} pipeline workers each"
+        )
+        with ThreadPoolExecutor(max_workers=parallel, thread_name_prefix="campaign") as pool:
+            entries = list(pool.map(lambda c: self.run_campaign(c, workers), campaigns))
+
+        statuses = [e["status"] for e in entries]
+        report = {
+            "batch_id": batch_id,
+            "started_at": started_at,
+            "wall_seconds": round(time.monotonic() - started, 3),
+            "output_root": str(self.settings.output_dir),
+            "totals": {
+                "campaigns": len(entries),
+                "complete": statuses.count(RUN_COMPLETE),
+                "incomplete": statuses.count(RUN_INCOMPLETE),
+                "failed": statuses.count(RUN_FAILED),
+                "creatives": sum(e["completed"] for e in entries),
+                "cost_usd": round(sum(e.get("usage", {}).get("cost_usd", 0.0) for e in entries), 6),
+            },
+            "campaigns": entries,
+        }
+        report_path = save_json(report, BATCHES_DIR / f"{batch_id}.json")
+        report["report_path"] = str(report_path)
+        logger.info(
+            f"Batch {batch_id} finished: {report['totals']['complete']}/{len(entries)} campaigns complete "
+            f"in {report['wall_seconds']:.1f}s"
+        )
+        return report
+
+
+def format_batch_table(report: Dict[str, Any]) -> str:
+    """Render a batch report as a plain-text table."""
+    header = f"{'campaign':<24}{'status':<12}{'creatives':>10}{'seconds':>10}{'cost $':>10}"
+    lines = [header, "-" * len(header)]
+    for e in report.get("campaigns", []):
+        lines.append(
+            f"{e['campaign'][:23]:<24}{e['status']:<12}{e['completed']:>5}/{e['total']:<4}"
+            f"{e['seconds']:>10.1f}{e.get('usage', {}).get('cost_usd', 0.0):>10.4f}"
+        )
+    totals = report.get("totals", {})
+    lines.append("-" * len(header))
+    lines.append(
+        f"{'total':<24}{str(totals.get('complete', 0)) + ' complete':<12}{totals.get('creatives', 0):>10}"
+        f"{report.get('wall_seconds', 0.0):>10.1f}{totals.get('cost_usd', 0.0):>10.4f}"
+    )
+    return "\n".join(lines)
@@ -1,31 +1,60 @@
-from typing import List, Dict, Optional
+import time
+from contextlib import ExitStack
+from dataclasses import asdict
+from typing import List, Dict, Optional, Callable
 from pathlib import Path
 
 from ..core.prompt_manager import PromptManager
 from ..core.caption_manager import CaptionManager
 from ..core.image_manager import ImageManager
+from ..core.creative_record import (
+    CreativeRecord, STATUS_PROMPTED, STATUS_RENDERED, STATUS_COMPLETE, STATUS_FAILED
+)
+from ..core.fingerprint import StageFingerprints
 from ..image_gen.image_pipeline import ImageGenerationPipeline
+from ..image_gen.gemini_image_client import GeminiImageClient
+from ..image_gen.postprocess import PostProcessSpec
+from ..llm.llm_client import get_llm_client
+from .dag import DagExecutor
+from .workspace import RunWorkspace
 from ..services.brand_color_extractor import BrandColorExtractor
 from ..services.theme_service import ThemeService
 from ..config.settings import GenerationSettings, BrandConfig
+from ..config.constants import PIPELINE_MAX_WORKERS, CAPTION_BATCH_SIZE, IMAGEN_MAX_IMAGES_PER_REQUEST
 from ..utils.logger import get_logger
+from ..utils.tracing import span
 from ..utils.validators import validate_image_path
 
 logger = get_logger()
 
+# Receives (stage, index, text, done) for prompts, images and captions as they progress
+ProgressCallback = Callable[[str, int, str, bool], None]
+
 
 class CreativeEngine:
     """Main engine for generating ad creatives."""
     
-    def __init__(self, settings: Optional[GenerationSettings] = None, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        settings: Optional[GenerationSettings] = None,
+        api_key: Optional[str] = None,
+        llm_client=None,
+        image_client: Optional[GeminiImageClient] = None
+    ):
         self.settings = settings or GenerationSettings()
         self.api_key = api_key
+        # Upper bound on pipeline threads; batch runs split one budget across campaigns
+        self.max_workers = PIPELINE_MAX_WORKERS
         
-        # Initialize components
-        self.prompt_manager = PromptManager(self.settings)
-        self.caption_manager = CaptionManager(self.settings)
+        # Initialize components; prompt and caption stages share one LLM client
+        self.llm_client = llm_client or get_llm_client(
+            api_key=self.api_key or self.settings.llm_config.api_key,
+            config=self.settings.llm_config
+        )
+        self.prompt_manager = PromptManager(self.settings, self.llm_client)
+        self.caption_manager = CaptionManager(self.settings, self.llm_client)
         self.image_manager = ImageManager(self.settings)
-        self.image_pipeline = ImageGenerationPipeline(self.settings, self.api_key)
+        self.image_pipeline = ImageGenerationPipeline(self.settings, self.api_key, image_client=image_client)
         self.color_extractor = BrandColorExtractor()
         self.theme_service = ThemeService()
         
@@ -51,64 +80,370 @@ class CreativeEngine:
         
         return brand_config
     
+    @property
+    def variations_per_prompt(self) -> int:
+        """Creatives per shared prompt, capped at what one image request can return."""
+        return max(1, min(self.settings.variations_per_prompt, IMAGEN_MAX_IMAGES_PER_REQUEST))
+    
+    def styles_for(self, num_creatives: int) -> List[str]:
+        """The style of each creative; variations of one prompt share its style."""
+        k = self.variations_per_prompt
+        styles = self.prompt_manager.styles_for(-(-num_creatives // k))
+        return [styles[i // k] for i in range(num_creatives)]
+    
     def generate_creatives(
         self,
         product_description: str,
         logo_path: Optional[Path] = None,
         product_image_path: Optional[Path] = None,
-        num_creatives: Optional[int] = None
+        num_creatives: Optional[int] = None,
+        progress_callback: Optional[ProgressCallback] = None,
+        records: Optional[List[CreativeRecord]] = None,
+        on_checkpoint: Optional[Callable[[CreativeRecord], None]] = None,
+        workspace: Optional[RunWorkspace] = None
     ) -> Dict[str, any]:
-        """Generate complete set of ad creatives."""
+        """Generate complete set of ad creatives.
+        
+        Stages run as a dependency graph rather than strict phases: each
+        creative moves through prompt -> (image || caption) -> persist on its
+        own, so early images render while later prompts are still being
+        written. With a ``progress_callback``, prompts and captions are
+        streamed and every partial text, finished prompt, image and caption is
+        reported as it arrives.
+        
+        With ``settings.variations_per_prompt`` above one, consecutive
+        creatives share a prompt and their images come from one request; with
+        ``image_config.num_images`` above one, each creative also keeps the
+        extra candidates as alternates.
+        
+        Pass ``records`` restored from an earlier run to generate only what is
+        missing or whose input fingerprint changed; ``on_checkpoint`` is
+        called with a record after each stage completes on it. Artifacts go
+        to ``workspace`` (default: the settings output directory) and are
+        staged, then promoted atomically.
+        """
         logger.info("Starting creative generation pipeline...")
         
         # Process brand inputs
-        brand_config = self.process_brand_inputs(logo_path, product_image_path)
+        with span("engine.brand_inputs", category="brand"):
+            brand_config = self.process_brand_inputs(logo_path, product_image_path)
         self.settings.brand_config = brand_config
+        # Brand tinting in post-processing uses the dominant logo color; the image client may be
+        # shared between campaigns, so it gets this run's spec with every request
+        self.settings.image_config.postprocess.brand_color = brand_config.colors[0] if brand_config.colors else None
         
         # Update prompt and caption generators with brand config
         self.prompt_manager.prompt_generator.brand_config = brand_config
         self.caption_manager.caption_generator.brand_config = brand_config
         
-        # Generate prompts
         num_creatives = num_creatives or self.settings.num_creatives
-        prompts = self.prompt_manager.generate_prompts(
-            product_description,
-            num_prompts=num_creatives
+        workspace = (workspace or RunWorkspace.at(self.settings.output_dir)).create()
+        checkpoint = on_checkpoint or (lambda record: None)
+        image_client = self.image_pipeline.image_client
+        spec = PostProcessSpec.from_config(self.settings.image_config)
+        fingerprints = StageFingerprints(
+            product_description, brand_config,
+            text_model=self.llm_client.model_name, image_model=image_client.model_name,
+            image_postprocess=asdict(spec) if spec.adjusts else None
         )
         
-        # Generate images
-        images_dir = self.settings.output_dir / 'images'
-        self.image_manager.prepare_output_directory(self.settings.output_dir)
+        invalidated = {'prompt': 0, 'image': 0, 'caption': 0}
+        if records is None:
+            records = [
+                CreativeRecord(i, style=style)
+                for i, style in enumerate(self.styles_for(num_creatives))
+            ]
+        else:
+            invalidated = fingerprints.invalidate(records)
+            if any(invalidated.values()):
+                for record in records:
+                    checkpoint(record)
+            self._report_restored(records, progress_callback)
+        prompt_delta = self._stage_callback('prompt', progress_callback)
+        caption_delta = self._stage_callback('caption', progress_callback)
         
-        image_paths = self.image_pipeline.generate_creatives(
-            prompts=prompts,
-            output_dir=images_dir,
-            product_image_path=product_image_path
+        dag = DagExecutor(
+            max_workers=self.max_workers,
+            stage_limits={'images': image_client.concurrency.max_limit}
         )
         
-        # Generate captions
-        image_descriptions = prompts  # Use prompts as descriptions
-        captions = self.caption_manager.generate_captions(
-            image_paths=image_paths,
-            image_descriptions=image_descriptions,
-            product_description=product_description
+        # Name of the task that produces each record's prompt and caption; None when already done
+        prompt_tasks = self._add_prompt_tasks(
+            dag, records, product_description, prompt_delta, checkpoint, fingerprints
         )
+        caption_tasks = self._add_caption_tasks(
+            dag, records, prompt_tasks, product_description, caption_delta, checkpoint, fingerprints
+        )
+        
+        for group in self._groups(records):
+            # Creatives of a group that still need an image are rendered by one request
+            pending = [r for r in group if not r.ok and r.image_path is None]
+            image_task = None
+            if pending:
+                def _images(inputs, pending=pending):
+                    self._render_images(pending, workspace, fingerprints, checkpoint, progress_callback, spec)
+                
+                image_task = dag.add(
+                    f"image_{pending[0].index}", _images,
+                    deps=list(dict.fromkeys(t for t in (prompt_tasks[r.index] for r in pending) if t)),
+                    stage='images', priority=2
+                )
+            
+            for record in group:
+                if record.ok:
+                    continue
+                
+                def _persist(inputs, record=record):
+                    with record.timed('persist'):
+                        if record.image_path is None:
+                            raise ValueError("No image returned for this creative")
+                        self.caption_manager.save_caption(record.name, record.caption, workspace.captions_dir)
+                    record.status = STATUS_COMPLETE
+                    checkpoint(record)
+                
+                i = record.index
+                dag.add(
+                    f"persist_{i}", _persist,
+                    deps=[t for t in (image_task if record in pending else None, caption_tasks[i]) if t],
+                    stage='persist', priority=0
+                )
+        
+        with span("engine.graph", category="pipeline", tasks=len(dag.tasks)):
+            dag.run()
+        
+        # Anything not completed was stopped by its own failure or an upstream one
+        for record in records:
+            if record.status != STATUS_COMPLETE:
+                record.status = STATUS_FAILED
+                record.error = record.error or str(dag.errors.get(f"persist_{record.index}", "incomplete"))
+                checkpoint(record)
         
-        # Save captions
-        captions_dir = self.settings.output_dir / 'captions'
-        self.caption_manager.save_captions(captions, captions_dir)
+        completed = [r for r in records if r.ok]
+        captions = {r.name: r.caption for r in completed}
         
         # Save mapping
-        mapping_path = self.settings.output_dir / 'mapping.json'
-        self.caption_manager.save_caption_mapping(captions, mapping_path)
+        mapping_path = workspace.mapping_path
+        with span("engine.mapping", category="persist"):
+            self.caption_manager.save_caption_mapping(captions, mapping_path, records=records)
         
-        logger.info(f"Successfully generated {len(image_paths)} creatives")
+        logger.info(f"Successfully generated {len(completed)}/{len(records)} creatives")
         
         return {
-            "images": image_paths,
+            "records": records,
+            "images": [r.image_path for r in completed],
             "captions": captions,
-            "prompts": prompts,
+            "prompts": [r.prompt or "" for r in records],
             "mapping_path": mapping_path,
-            "count": len(image_paths)
+            "output_dir": workspace.path,
+            "count": len(completed),
+            "metrics": {
+                "pipeline": dag.metrics(),
+                "invalidated": invalidated,
+                "image_concurrency": image_client.concurrency_metrics(),
+                "image_hedging": image_client.hedging_metrics(),
+                "image_cache": image_client.cache_metrics(),
+                "image_postprocess": image_client.postprocess_metrics()
+            }
         }
+    
+    def _render_images(
+        self,
+        pending: List[CreativeRecord],
+        workspace: RunWorkspace,
+        fingerprints: StageFingerprints,
+        checkpoint: Callable[[CreativeRecord], None],
+        progress_callback: Optional[ProgressCallback],
+        spec: PostProcessSpec
+    ) -> None:
+        """Render creatives sharing a prompt from one request.
+        
+        The first images returned go to the creatives in order; any beyond
+        that are dealt out round-robin as alternates. A creative left without
+        an image (the API may return fewer than asked) fails when persisted.
+        """
+        per_creative = max(1, self.settings.image_config.num_images)
+        count = min(IMAGEN_MAX_IMAGES_PER_REQUEST, len(pending) * per_creative)
+        owners = [pending[j % len(pending)] for j in range(count)]
+        names = [
+            f"{owner.name}.jpg" if j < len(pending) else f"{owner.name}_alt{j // len(pending)}.jpg"
+            for j, owner in enumerate(owners)
+        ]
+        
+        with self._timed(pending, 'image'):
+            staged = self.image_pipeline.generate_creative_set(
+                pending[0].prompt, [workspace.staging_path(name) for name in names], spec=spec
+            )
+            for record in pending:
+                record.alternates = []
+            for j, path in enumerate(staged):
+                if j < len(pending):
+                    owners[j].image_path = workspace.promote(path, workspace.images_dir / names[j])
+                else:
+                    owners[j].alternates.append(workspace.promote(path, workspace.alternates_dir / names[j]))
+        
+        for record in pending:
+            if record.image_path is None:
+                continue
+            fingerprints.stamp(record, 'image')
+            record.status = STATUS_RENDERED
+            checkpoint(record)
+            if progress_callback:
+                progress_callback('image', record.index, str(record.image_path), True)
+    
+    def _add_prompt_tasks(
+        self,
+        dag: DagExecutor,
+        records: List[CreativeRecord],
+        product_description: str,
+        on_delta: Optional[Callable[[int, str, bool], None]],
+        checkpoint: Callable[[CreativeRecord], None],
+        fingerprints: StageFingerprints
+    ) -> List[Optional[str]]:
+        """Add prompt tasks for records without a prompt, one prompt per group of variations.
+        
+        A fresh run uses one batched request; streaming, unbatched and resumed
+        runs use one task per group missing a prompt.
+        """
+        groups = self._groups(records)
+        missing = [r for r in records if not r.prompt]
+        
+        if (
+            on_delta is None
+            and self.prompt_manager.prompt_generator.batched
+            and missing and len(missing) == len(records)
+        ):
+            def _prompts(inputs):
+                started = time.monotonic()
+                prompts = self.prompt_manager.generate_prompts(
+                    product_description, num_prompts=len(groups)
+                )
+                elapsed = round(time.monotonic() - started, 3)
+                for group, prompt in zip(groups, prompts):
+                    for record in group:
+                        record.prompt = prompt
+                        fingerprints.stamp(record, 'prompt')
+                        record.status = STATUS_PROMPTED
+                        record.timings['prompt'] = elapsed
+                        checkpoint(record)
+            
+            dag.add("prompts", _prompts, stage='prompts', priority=1)
+            return ["prompts"] * len(records)
+        
+        names: List[Optional[str]] = [None] * len(records)
+        for g, group in enumerate(groups):
+            missing = [r for r in group if not r.prompt]
+            if not missing:
+                continue
+            
+            def _prompt(inputs, g=g, group=group, missing=missing):
+                with self._timed(missing, 'prompt'):
+                    # A variation that kept its prompt fixes the concept for the rest of its group
+                    prompt = next((r.prompt for r in group if r.prompt), None)
+                    if prompt is None:
+                        def _fanout(_, text, done):
+                            for record in missing:
+                                on_delta(record.index, text, done)
+                        
+                        prompt = self.prompt_manager.generate_prompt(
+                            product_description, g,
+                            num_prompts=len(groups),
+                            on_delta=_fanout if on_delta is not None else None
+                        )
+                for record in missing:
+                    record.prompt = prompt
+                    fingerprints.stamp(record, 'prompt')
+                    record.status = STATUS_PROMPTED
+                    checkpoint(record)
+            
+            name = dag.add(f"prompt_{missing[0].index}", _prompt, stage='prompts', priority=1)
+            for record in missing:
+                names[record.index] = name
+        return names
+    
+    def _add_caption_tasks(
+        self,
+        dag: DagExecutor,
+        records: List[CreativeRecord],
+        prompt_tasks: List[Optional[str]],
+        product_description: str,
+        on_delta: Optional[Callable[[int, str, bool], None]],
+        checkpoint: Callable[[CreativeRecord], None],
+        fingerprints: StageFingerprints
+    ) -> List[Optional[str]]:
+        """Add caption tasks for records without a caption, grouped into batch-sized chunks when batching."""
+        batched = on_delta is None and self.caption_manager.caption_generator.batched
+        chunk_size = CAPTION_BATCH_SIZE if batched else 1
+        missing = [r for r in records if not r.caption]
+        names: List[Optional[str]] = [None] * len(records)
+        
+        for start in range(0, len(missing), chunk_size):
+            chunk = missing[start:start + chunk_size]
+            
+            def _captions(inputs, chunk=chunk):
+                started = time.monotonic()
+                # Report chunk-local positions as the creatives' own indices
+                delta = None
+                if on_delta is not None:
+                    delta = lambda j, text, done: on_delta(chunk[j].index, text, done)
+                # Prompts double as image descriptions
+                captions = self.caption_manager.generate_caption_texts(
+                    [record.prompt for record in chunk],
+                    product_description,
+                    on_delta=delta
+                )
+                elapsed = round(time.monotonic() - started, 3)
+                for record, caption in zip(chunk, captions):
+                    record.caption = caption
+                    fingerprints.stamp(record, 'caption')
+                    record.timings['caption'] = elapsed
+                    checkpoint(record)
+            
+            name = dag.add(
+                f"captions_{chunk[0].index}", _captions,
+                deps=list(filter(None, (prompt_tasks[r.index] for r in chunk))),
+                stage='captions',
+                priority=1
+            )
+            for record in chunk:
+                names[record.index] = name
+        return names
+    
+    def _groups(self, records: List[CreativeRecord]) -> List[List[CreativeRecord]]:
+        """Consecutive records that are variations of one prompt."""
+        k = self.variations_per_prompt
+        return [records[i:i + k] for i in range(0, len(records), k)]
+    
+    @staticmethod
+    def _timed(records: List[CreativeRecord], stage: str) -> ExitStack:
+        """Time a stage shared by several records; a failure marks them all failed."""
+        stack = ExitStack()
+        for record in records:
+            stack.enter_context(record.timed(stage))
+        return stack
+    
+    @staticmethod
+    def _report_restored(
+        records: List[CreativeRecord],
+        progress_callback: Optional[ProgressCallback]
+    ) -> None:
+        """Replay work restored from a checkpoint to the progress callback."""
+        if progress_callback is None:
+            return
+        for record in records:
+            if record.prompt:
+                progress_callback('prompt', record.index, record.prompt, True)
+            if record.image_path:
+                progress_callback('image', record.index, str(record.image_path), True)
+            if record.caption:
+                progress_callback('caption', record.index, record.caption, True)
+    
+    @staticmethod
+    def _stage_callback(
+        stage: str,
+        progress_callback: Optional[ProgressCallback]
+    ) -> Optional[Callable[[int, str, bool], None]]:
+        """Bind a stage name to the progress callback for per-item text updates."""
+        if progress_callback is None:
+            return None
+        return lambda index, text, done: progress_callback(stage, index, text, done)
 
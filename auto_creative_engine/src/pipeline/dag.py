@@ -0,0 +1,179 @@
+"""
+Dependency-graph executor for overlapping pipeline stages.
+"""
+
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from ..services.usage_meter import usage_stage
+from ..utils.tracing import span
+from ..utils.logger import get_logger
+
+logger = get_logger()
+
+# A task receives the results of its dependencies, keyed by task name
+TaskFn = Callable[[Dict[str, Any]], Any]
+
+
+class UpstreamFailed(Exception):
+    """Raised for a task that was skipped because a dependency failed."""
+
+
+@dataclass
+class TaskNode:
+    """One unit of work in the graph."""
+    name: str
+    fn: TaskFn
+    deps: List[str] = field(default_factory=list)
+    stage: Optional[str] = None
+    priority: int = 0
+    started: Optional[float] = None
+    finished: Optional[float] = None
+
+
+class DagExecutor:
+    """Runs tasks on a thread pool as soon as their dependencies finish.
+
+    Ready tasks are started lowest ``priority`` first, and ``stage_limits``
+    caps how many tasks of one stage may run at once so a slow stage cannot
+    occupy every worker. A failed task skips its dependents but independent
+    branches carry on.
+    """
+
+    def __init__(self, max_workers: int = 16, stage_limits: Optional[Dict[str, int]] = None):
+        self.max_workers = max(1, max_workers)
+        self.stage_limits = dict(stage_limits or {})
+        self.tasks: Dict[str, TaskNode] = {}
+        self.results: Dict[str, Any] = {}
+        self.errors: Dict[str, BaseException] = {}
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+
+    def add(
+        self,
+        name: str,
+        fn: TaskFn,
+        deps: Sequence[str] = (),
+        stage: Optional[str] = None,
+        priority: int = 0
+    ) -> str:
+        """Register a task; dependencies must already be registered."""
+        if name in self.tasks:
+            raise ValueError(f"Duplicate task name: {name}")
+        missing = [d for d in deps if d not in self.tasks]
+        if missing:
+            raise ValueError(f"Task {name} depends on unknown tasks: {missing}")
+        self.tasks[name] = TaskNode(name, fn, list(dict.fromkeys(deps)), stage, priority)
+        return name
+
+    def _execute(self, task: TaskNode) -> Any:
+        inputs = {dep: self.results[dep] for dep in task.deps}
+        task.started = time.monotonic()
+        try:
+            with span(task.name, category=task.stage or "other"):
+                if task.stage:
+                    with usage_stage(task.stage):
+                        return task.fn(inputs)
+                return task.fn(inputs)
+        finally:
+            task.finished = time.monotonic()
+
+    def _skip_dependents(self, failed: str, dependents: Dict[str, List[str]], ready: List[str]) -> None:
+        """Mark every transitive dependent of a failed task as skipped."""
+        stack = list(dependents[failed])
+        while stack:
+            name = stack.pop()
+            if name in self.errors:
+                continue
+            self.errors[name] = UpstreamFailed(f"{name} skipped: upstream {failed} failed")
+            if name in ready:
+                ready.remove(name)
+            stack.extend(dependents[name])
+
+    def run(self) -> Dict[str, Any]:
+        """Execute the graph and return results of the tasks that succeeded."""
+        dependents: Dict[str, List[str]] = {name: [] for name in self.tasks}
+        remaining = {name: len(task.deps) for name, task in self.tasks.items()}
+        for name, task in self.tasks.items():
+            for dep in task.deps:
+                dependents[dep].append(name)
+
+        ready = [name for name, count in remaining.items() if count == 0]
+        running: Dict[Future, str] = {}
+        stage_running: Dict[str, int] = {}
+        self._started_at = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pipeline") as pool:
+            while ready or running:
+                ready.sort(key=lambda n: self.tasks[n].priority)
+                for name in list(ready):
+                    if len(running) >= self.max_workers:
+                        break
+                    stage = self.tasks[name].stage
+                    limit = self.stage_limits.get(stage)
+                    if limit is not None and stage_running.get(stage, 0) >= limit:
+                        continue
+                    ready.remove(name)
+                    stage_running[stage] = stage_running.get(stage, 0) + 1
+                    # Copy context per task so usage metering follows the work onto worker threads
+                    future = pool.submit(contextvars.copy_context().run, self._execute, self.tasks[name])
+                    running[future] = name
+
+                if not running:
+                    break
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    stage = self.tasks[name].stage
+                    stage_running[stage] -= 1
+                    error = future.exception()
+                    if error is not None:
+                        logger.warning(f"Pipeline task {name} failed: {error}")
+                        self.errors[name] = error
+                        self._skip_dependents(name, dependents, ready)
+                        continue
+                    self.results[name] = future.result()
+                    for child in dependents[name]:
+                        remaining[child] -= 1
+                        if remaining[child] == 0 and child not in self.errors:
+                            ready.append(child)
+
+        self._finished_at = time.monotonic()
+        logger.info(
+            f"Pipeline graph finished {len(self.results)}/{len(self.tasks)} tasks "
+            f"in {self._finished_at - self._started_at:.1f}s"
+        )
+        return self.results
+
+    def metrics(self) -> Dict[str, Any]:
+        """Wall time plus per-stage task counts, busy time and active span."""
+        if self._started_at is None:
+            return {}
+        origin = self._started_at
+        stages: Dict[str, Dict[str, Any]] = {}
+        for task in self.tasks.values():
+            bucket = stages.setdefault(task.stage or "other", {
+                "tasks": 0, "failed": 0, "busy_seconds": 0.0, "first_start": None, "last_end": None
+            })
+            bucket["tasks"] += 1
+            if task.name in self.errors:
+                bucket["failed"] += 1
+            if task.started is None or task.finished is None:
+                continue
+            bucket["busy_seconds"] += task.finished - task.started
+            start, end = task.started - origin, task.finished - origin
+            bucket["first_start"] = start if bucket["first_start"] is None else min(bucket["first_start"], start)
+            bucket["last_end"] = end if bucket["last_end"] is None else max(bucket["last_end"], end)
+
+        for bucket in stages.values():
+            for key in ("busy_seconds", "first_start", "last_end"):
+                if bucket[key] is not None:
+                    bucket[key] = round(bucket[key], 3)
+        return {
+            "wall_seconds": round((self._finished_at or time.monotonic()) - origin, 3),
+            "stages": stages,
+        }
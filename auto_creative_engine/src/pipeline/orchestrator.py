@@ -2,12 +2,19 @@
 Pipeline orchestrator for coordinating the generation workflow.
 """
 
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from pathlib import Path
 
-from .creative_engine import CreativeEngine
+from .creative_engine import CreativeEngine, ProgressCallback
+from .run_manifest import RunManifest, RUN_RUNNING, RUN_COMPLETE, RUN_INCOMPLETE, RUN_FAILED
+from .workspace import RunWorkspace, prune_workspaces
+from ..core.creative_record import CreativeRecord, STATUS_COMPLETE, STATUS_RENDERED
 from ..config.settings import GenerationSettings
+from ..services.naming_service import NamingService
+from ..services.usage_meter import UsageMeter
+from ..utils.file_utils import link_or_copy
 from ..utils.logger import get_logger
+from ..utils.tracing import Tracer, current_tracer, span
 
 logger = get_logger()
 
@@ -15,9 +22,16 @@ logger = get_logger()
 class Orchestrator:
     """Orchestrates the complete creative generation workflow."""
     
-    def __init__(self, settings: Optional[GenerationSettings] = None, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        settings: Optional[GenerationSettings] = None,
+        api_key: Optional[str] = None,
+        llm_client=None,
+        image_client=None
+    ):
         self.settings = settings or GenerationSettings()
-        self.engine = CreativeEngine(self.settings, api_key)
+        self.engine = CreativeEngine(self.settings, api_key, llm_client=llm_client, image_client=image_client)
+        self.naming_service = NamingService()
         logger.info("Initialized Orchestrator")
     
     def run(
@@ -26,23 +40,173 @@ class Orchestrator:
         logo_path: Optional[Path] = None,
         product_image_path: Optional[Path] = None,
         num_creatives: Optional[int] = None,
-        brand_name: Optional[str] = None
+        brand_name: Optional[str] = None,
+        progress_callback: Optional[ProgressCallback] = None,
+        run_id: Optional[str] = None,
+        prune_outputs: bool = True,
+        base_run_id: Optional[str] = None
     ) -> Dict:
-        """Run the complete generation workflow."""
-        logger.info("Starting orchestration...")
+        """Run the complete generation workflow.
+        
+        Each run writes into its own workspace under the output directory, so
+        concurrent runs never share files; old workspaces are pruned first
+        unless ``prune_outputs`` is False. With ``base_run_id``, the earlier
+        run's prompts, images and captions are reused wherever their input
+        fingerprints still match, so only changed stages are regenerated.
+        Progress is journaled to a run manifest so the run can be resumed with
+        ``resume(run_id)``. Token, image and cost usage is metered for the run
+        and appended to the usage ledger, even when generation fails part-way.
+        """
+        run_id = run_id or self.naming_service.generate_run_id()
+        logger.info(f"Starting orchestration for run {run_id}...")
         
         # Update brand name if provided
         if brand_name:
             self.settings.brand_config.name = brand_name
         
-        # Run generation
-        results = self.engine.generate_creatives(
-            product_description=product_description,
-            logo_path=logo_path,
-            product_image_path=product_image_path,
+        num_creatives = num_creatives or self.settings.num_creatives
+        brand = self.settings.brand_config
+        base = RunManifest.load(base_run_id) if base_run_id else None
+        if prune_outputs:
+            prune_workspaces(self.settings.output_dir, exclude={run_id, base_run_id})
+        workspace = RunWorkspace(run_id, root=self.settings.output_dir).create()
+        manifest = RunManifest.create(
+            run_id,
+            inputs={
+                "product_description": product_description,
+                "logo_path": str(logo_path) if logo_path else None,
+                "product_image_path": str(product_image_path) if product_image_path else None,
+                "num_creatives": num_creatives,
+                "variations_per_prompt": self.settings.variations_per_prompt,
+                "num_images": self.settings.image_config.num_images,
+                "brand_name": brand.name,
+                "theme": brand.theme,
+                "tone": brand.tone,
+                "caption_tone": brand.caption_tone,
+                "base_run_id": base_run_id,
+            },
+            output_dir=workspace.path,
             num_creatives=num_creatives
         )
+        records = self._seed_records(base, workspace, num_creatives) if base else None
+        return self._execute(
+            manifest, workspace, product_description, logo_path, product_image_path,
+            num_creatives, progress_callback, records=records
+        )
+    
+    def resume(self, run_id: str, progress_callback: Optional[ProgressCallback] = None) -> Dict:
+        """Resume a journaled run, regenerating only missing prompts, images and captions."""
+        manifest = RunManifest.load(run_id)
+        inputs = manifest.inputs
+        logger.info(f"Resuming run {run_id} ({manifest.summary()['completed']} creatives already complete)")
         
-        logger.info("Orchestration completed successfully")
-        return results
+        self.settings.num_creatives = inputs["num_creatives"]
+        # Regroup exactly as the original run did so variations keep sharing their prompt
+        self.settings.variations_per_prompt = inputs.get("variations_per_prompt", 1)
+        self.settings.image_config.num_images = inputs.get("num_images", 1)
+        brand = self.settings.brand_config
+        brand.name = inputs.get("brand_name") or brand.name
+        brand.theme = inputs.get("theme") or brand.theme
+        brand.tone = inputs.get("tone") or brand.tone
+        brand.caption_tone = inputs.get("caption_tone")
+        
+        logo_path = Path(inputs["logo_path"]) if inputs.get("logo_path") else None
+        product_image_path = Path(inputs["product_image_path"]) if inputs.get("product_image_path") else None
+        workspace = RunWorkspace.at(manifest.output_dir).create()
+        manifest.set_status(RUN_RUNNING)
+        return self._execute(
+            manifest, workspace, inputs["product_description"], logo_path, product_image_path,
+            inputs["num_creatives"], progress_callback, records=manifest.records()
+        )
+    
+    def _seed_records(
+        self,
+        base: RunManifest,
+        workspace: RunWorkspace,
+        num_creatives: int
+    ) -> List[CreativeRecord]:
+        """Start a run from an earlier run's records, with its images linked into the new workspace."""
+        records = base.records()[:num_creatives]
+        styles = self.engine.styles_for(num_creatives)
+        seeded = len(records)
+        records += [CreativeRecord(i, style=styles[i]) for i in range(seeded, num_creatives)]
+        
+        for record in records[:seeded]:
+            if record.image_path is not None:
+                record.image_path = link_or_copy(record.image_path, workspace.images_dir / record.image_path.name)
+                record.alternates = [
+                    link_or_copy(path, workspace.alternates_dir / path.name) for path in record.alternates
+                ]
+            # Persist again so the caption file lands in the new workspace
+            if record.status == STATUS_COMPLETE:
+                record.status = STATUS_RENDERED
+        logger.info(f"Seeded {seeded} creatives from run {base.run_id}")
+        return records
+    
+    def _execute(
+        self,
+        manifest: RunManifest,
+        workspace: RunWorkspace,
+        product_description: str,
+        logo_path: Optional[Path],
+        product_image_path: Optional[Path],
+        num_creatives: int,
+        progress_callback: Optional[ProgressCallback],
+        records: Optional[List[CreativeRecord]] = None
+    ) -> Dict:
+        """Generate under a usage meter and tracer, journaling each record to the manifest.
 
+        A tracer already active in the caller (e.g. the CLI, which also traces
+        packaging) is used and left for the caller to export; otherwise the
+        run's own trace is written next to its manifest.
+        """
+        run_id = manifest.run_id
+        meter = UsageMeter(run_id, brand=self.settings.brand_config.name)
+        tracer = current_tracer()
+        owns_tracer = tracer is None
+        if owns_tracer:
+            tracer = Tracer(run_id)
+        try:
+            # Run generation
+            with meter.activate(), tracer.activate(), span("orchestrator.run", category="run", run_id=run_id):
+                results = self.engine.generate_creatives(
+                    product_description=product_description,
+                    logo_path=logo_path,
+                    product_image_path=product_image_path,
+                    num_creatives=num_creatives,
+                    progress_callback=progress_callback,
+                    records=records,
+                    on_checkpoint=manifest.checkpoint,
+                    workspace=workspace
+                )
+        except Exception as e:
+            manifest.set_status(RUN_FAILED, error=str(e))
+            raise
+        finally:
+            try:
+                # Mock runs cost nothing, so they stay out of the spend ledger
+                usage = meter.write_ledger() if self.settings.llm_config.backend == 'gemini' else meter.summary()
+            except OSError as e:
+                logger.warning(f"Could not write usage ledger: {e}")
+                usage = meter.summary()
+            if owns_tracer:
+                try:
+                    tracer.write(RunManifest.trace_path_for(run_id))
+                except OSError as e:
+                    logger.warning(f"Could not write trace: {e}")
+        
+        complete = results["count"] == len(results["records"])
+        manifest.data["usage"] = usage
+        manifest.set_status(RUN_COMPLETE if complete else RUN_INCOMPLETE)
+        
+        results["run_id"] = run_id
+        results["usage"] = usage
+        results["manifest_path"] = manifest.path
+        if owns_tracer:
+            results["trace"] = tracer.summary()
+            results["trace_path"] = RunManifest.trace_path_for(run_id)
+        logger.info(
+            f"Orchestration completed {'successfully' if complete else 'with missing creatives'} "
+            f"(estimated cost ${usage['totals']['cost_usd']:.4f})"
+        )
+        return results
@@ -7,9 +7,11 @@ from pathlib import Path
 from typing import List, Dict, Optional
 
 from ..config.constants import ZIP_FILENAME, MAX_ZIP_SIZE_MB
+from ..core.creative_record import CreativeRecord
 from ..services.naming_service import NamingService
 from ..utils.logger import get_logger
-from ..utils.file_utils import ensure_dir
+from ..utils.tracing import traced
+from ..utils.file_utils import ensure_dir, temp_path_for, promote_file
 
 logger = get_logger()
 
@@ -21,6 +23,7 @@ class Packager:
         self.naming_service = NamingService()
         logger.info("Initialized Packager")
     
+    @traced("packager.create_zip", category="zip")
     def create_zip(
         self,
         images_dir: Path,
@@ -38,7 +41,9 @@ class Packager:
         
         logger.info(f"Creating ZIP package: {output_path}")
         
-        with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        # Build next to the target and rename, so a download never sees a partial ZIP
+        tmp_path = temp_path_for(output_path)
+        with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
             # Add images
             image_files = sorted(images_dir.glob('*.jpg'))
             for img_file in image_files:
@@ -55,6 +60,7 @@ class Packager:
             if mapping_path.exists():
                 zipf.write(mapping_path, "mapping.json")
                 logger.debug("Added mapping.json")
+        promote_file(tmp_path, output_path)
         
         # Check file size
         zip_size_mb = output_path.stat().st_size / (1024 * 1024)
@@ -65,6 +71,42 @@ class Packager:
         
         return output_path
     
+    @traced("packager.create_zip_from_records", category="zip")
+    def create_zip_from_records(
+        self,
+        records: List[CreativeRecord],
+        mapping_path: Optional[Path],
+        output_path: Path
+    ) -> Path:
+        """Create a ZIP from completed records, adding exactly their files."""
+        ensure_dir(output_path.parent)
+        
+        logger.info(f"Creating ZIP package: {output_path}")
+        
+        tmp_path = temp_path_for(output_path)
+        with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+            for record in records:
+                if not record.ok:
+                    continue
+                zipf.write(record.image_path, f"images/{record.image_path.name}")
+                for path in record.alternates:
+                    zipf.write(path, f"alternates/{path.name}")
+                zipf.writestr(f"captions/{record.name}.txt", record.caption or "")
+                logger.debug(f"Added creative: {record.name}")
+            
+            if mapping_path is not None and mapping_path.exists():
+                zipf.write(mapping_path, "mapping.json")
+                logger.debug("Added mapping.json")
+        promote_file(tmp_path, output_path)
+        
+        zip_size_mb = output_path.stat().st_size / (1024 * 1024)
+        logger.info(f"ZIP created: {output_path} ({zip_size_mb:.2f} MB)")
+        
+        if zip_size_mb > MAX_ZIP_SIZE_MB:
+            logger.warning(f"ZIP file exceeds recommended size: {zip_size_mb:.2f} MB")
+        
+        return output_path
+    
     def create_zip_from_results(
         self,
         results: Dict,
@@ -72,6 +114,13 @@ class Packager:
         brand_name: Optional[str] = None
     ) -> Path:
         """Create ZIP from generation results."""
+        if results.get('records') is not None:
+            return self.create_zip_from_records(
+                results['records'],
+                mapping_path=results.get('mapping_path'),
+                output_path=output_dir / ZIP_FILENAME
+            )
+        
         images_dir = output_dir / 'images'
         captions_dir = output_dir / 'captions'
         mapping_path = output_dir / 'mapping.json'
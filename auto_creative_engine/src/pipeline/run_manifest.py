@@ -0,0 +1,185 @@
+"""
+On-disk run manifest that journals per-creative progress so runs can resume.
+"""
+
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..config.constants import RUNS_DIR
+from ..core.creative_record import (
+    CreativeRecord, STATUS_PROMPTED, STATUS_RENDERED, STATUS_COMPLETE
+)
+from ..utils.json_utils import save_json, load_json
+from ..utils.logger import get_logger
+
+logger = get_logger()
+
+RUN_RUNNING = 'running'
+RUN_COMPLETE = 'complete'
+RUN_INCOMPLETE = 'incomplete'
+RUN_FAILED = 'failed'
+
+
+class RunManifest:
+    """Journal of one run's inputs and per-creative progress.
+
+    Every checkpoint rewrites the manifest atomically, so a crash or a
+    Streamlit rerun leaves the last completed prompt, image and caption of
+    each creative on disk for ``--resume``.
+    """
+
+    def __init__(self, run_id: str, data: Dict[str, Any], path: Optional[Path] = None):
+        self.run_id = run_id
+        self.path = path or self.path_for(run_id)
+        self.data = data
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def path_for(run_id: str) -> Path:
+        return RUNS_DIR / run_id / 'manifest.json'
+
+    @staticmethod
+    def trace_path_for(run_id: str) -> Path:
+        """Where the run's Chrome trace is written, next to its manifest."""
+        return RUNS_DIR / run_id / 'trace.json'
+
+    @classmethod
+    def create(
+        cls,
+        run_id: str,
+        inputs: Dict[str, Any],
+        output_dir: Path,
+        num_creatives: int
+    ) -> "RunManifest":
+        """Start a manifest for a new run."""
+        now = datetime.now().isoformat(timespec="seconds")
+        data = {
+            "run_id": run_id,
+            "status": RUN_RUNNING,
+            "created_at": now,
+            "updated_at": now,
+            "output_dir": str(output_dir),
+            "inputs": inputs,
+            "creatives": [CreativeRecord(i).to_dict() for i in range(num_creatives)],
+        }
+        manifest = cls(run_id, data)
+        manifest.save()
+        return manifest
+
+    @classmethod
+    def load(cls, run_id: str) -> "RunManifest":
+        """Load the manifest of an earlier run."""
+        path = cls.path_for(run_id)
+        if not path.exists():
+            raise FileNotFoundError(f"No manifest found for run {run_id} at {path}")
+        return cls(run_id, load_json(path), path)
+
+    @property
+    def inputs(self) -> Dict[str, Any]:
+        return self.data.get("inputs", {})
+
+    @property
+    def output_dir(self) -> Path:
+        return Path(self.data["output_dir"])
+
+    @property
+    def status(self) -> str:
+        return self.data.get("status", RUN_RUNNING)
+
+    def records(self) -> List[CreativeRecord]:
+        """Rebuild records from the journal, keeping only work whose output still exists."""
+        images_dir = self.output_dir / 'images'
+        alternates_dir = self.output_dir / 'alternates'
+        records = []
+        for entry in self.data.get("creatives", []):
+            record = CreativeRecord(entry["index"], style=entry.get("style"), prompt=entry.get("prompt"))
+            record.caption = entry.get("caption")
+            record.timings = dict(entry.get("timings") or {})
+            record.fingerprints = dict(entry.get("fingerprints") or {})
+            image_name = entry.get("image")
+            if image_name and (images_dir / image_name).exists():
+                record.image_path = images_dir / image_name
+                record.alternates = [
+                    alternates_dir / name for name in entry.get("alternates") or []
+                    if (alternates_dir / name).exists()
+                ]
+            if entry.get("status") == STATUS_COMPLETE and record.image_path and record.caption:
+                record.status = STATUS_COMPLETE
+            elif record.image_path:
+                record.status = STATUS_RENDERED
+            elif record.prompt:
+                record.status = STATUS_PROMPTED
+            records.append(record)
+        return records
+
+    def checkpoint(self, record: CreativeRecord) -> None:
+        """Journal the current state of one creative."""
+        with self._lock:
+            self.data["creatives"][record.index] = record.to_dict()
+            self._save_locked()
+
+    def set_status(self, status: str, error: Optional[str] = None) -> None:
+        with self._lock:
+            self.data["status"] = status
+            if error is not None:
+                self.data["error"] = error
+            else:
+                self.data.pop("error", None)
+            self._save_locked()
+
+    def save(self) -> None:
+        with self._lock:
+            self._save_locked()
+
+    def _save_locked(self) -> None:
+        self.data["updated_at"] = datetime.now().isoformat(timespec="seconds")
+        save_json(self.data, self.path)
+
+    def results(self) -> Dict[str, Any]:
+        """The run's results in the shape ``Orchestrator.run`` returns, rebuilt from disk."""
+        records = self.records()
+        completed = [r for r in records if r.ok]
+        return {
+            "run_id": self.run_id,
+            "records": records,
+            "images": [r.image_path for r in completed],
+            "captions": {r.name: r.caption for r in completed},
+            "prompts": [r.prompt or "" for r in records],
+            "mapping_path": self.output_dir / 'mapping.json',
+            "output_dir": self.output_dir,
+            "count": len(completed),
+            "usage": self.data.get("usage"),
+            "manifest_path": self.path,
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        """Run id, status and how many creatives are complete."""
+        creatives = self.data.get("creatives", [])
+        return {
+            "run_id": self.run_id,
+            "status": self.status,
+            "brand": self.inputs.get("brand_name"),
+            "created_at": self.data.get("created_at"),
+            "updated_at": self.data.get("updated_at"),
+            "completed": sum(1 for c in creatives if c.get("status") == STATUS_COMPLETE),
+            "total": len(creatives),
+        }
+
+
+def list_runs(resumable_only: bool = False) -> List[Dict[str, Any]]:
+    """Summaries of journaled runs, newest first."""
+    runs = []
+    if not RUNS_DIR.exists():
+        return runs
+    for path in RUNS_DIR.glob('*/manifest.json'):
+        try:
+            manifest = RunManifest(path.parent.name, load_json(path), path)
+        except Exception as e:
+            logger.warning(f"Skipping unreadable run manifest {path}: {e}")
+            continue
+        if resumable_only and manifest.status == RUN_COMPLETE:
+            continue
+        runs.append(manifest.summary())
+    return sorted(runs, key=lambda r: r.get("created_at") or "", reverse=True)
@@ -0,0 +1,108 @@
+"""
+Worker that drains generation jobs from the durable job queue.
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Optional
+
+from .batch import BatchRunner, Campaign
+from .run_manifest import RUN_COMPLETE
+from .workspace import prune_workspaces
+from ..config.constants import JOB_LEASE_SECONDS, JOB_HEARTBEAT_SECONDS, JOB_POLL_INTERVAL
+from ..services.job_queue import Job, JobQueue, default_worker_id
+from ..utils.logger import get_logger
+
+logger = get_logger()
+
+
+class JobWorker:
+    """Leases jobs one at a time and runs them through the orchestrator.
+
+    The job id doubles as the run id, so a job retried after a crash or a
+    partial failure resumes its run and regenerates only what is missing.
+    A background heartbeat keeps the lease while a job runs.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        runner: BatchRunner,
+        worker_id: Optional[str] = None,
+        lease_seconds: float = JOB_LEASE_SECONDS,
+        heartbeat_seconds: float = JOB_HEARTBEAT_SECONDS,
+        poll_interval: float = JOB_POLL_INTERVAL
+    ):
+        self.queue = queue
+        self.runner = runner
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = lease_seconds
+        self.heartbeat_seconds = min(heartbeat_seconds, lease_seconds / 3)
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        logger.info(f"Initialized JobWorker {self.worker_id}")
+
+    def stop(self) -> None:
+        """Stop after the current job."""
+        self._stop.set()
+
+    def run(self, max_jobs: Optional[int] = None, exit_when_idle: bool = False) -> int:
+        """Process jobs until stopped, ``max_jobs`` are done, or the queue is empty with ``exit_when_idle``."""
+        prune_workspaces(self.runner.settings.output_dir)
+        processed = 0
+        while not self._stop.is_set():
+            job = self.queue.lease(self.worker_id, self.lease_seconds)
+            if job is None:
+                if exit_when_idle:
+                    break
+                self._stop.wait(self.poll_interval)
+                continue
+
+            self.process(job)
+            processed += 1
+            if max_jobs is not None and processed >= max_jobs:
+                break
+
+        logger.info(f"Worker {self.worker_id} stopping after {processed} jobs")
+        return processed
+
+    def process(self, job: Job) -> None:
+        """Run one leased job and report the outcome to the queue."""
+        try:
+            campaign = Campaign.from_payload(job.payload)
+        except (TypeError, ValueError) as e:
+            self.queue.fail(job.id, self.worker_id, f"invalid job payload: {e}", retry=False)
+            return
+
+        with self._heartbeat(job):
+            entry = self.runner.run_campaign(campaign, run_id=job.id)
+
+        if entry["status"] == RUN_COMPLETE:
+            if not self.queue.complete(job.id, self.worker_id, result=entry):
+                logger.warning(f"Job {job.id} finished after its lease was lost")
+            return
+
+        error = entry.get("error") or f"{entry['completed']}/{entry['total']} creatives completed"
+        self.queue.fail(job.id, self.worker_id, error, result=entry)
+
+    @contextmanager
+    def _heartbeat(self, job: Job):
+        """Extend the job's lease in the background while the block runs."""
+        done = threading.Event()
+
+        def _beat():
+            while not done.wait(self.heartbeat_seconds):
+                try:
+                    if not self.queue.heartbeat(job.id, self.worker_id, self.lease_seconds):
+                        logger.warning(f"Lost lease on job {job.id}")
+                        return
+                except Exception as e:
+                    logger.warning(f"Heartbeat for job {job.id} failed: {e}")
+
+        thread = threading.Thread(target=_beat, name=f"heartbeat-{job.id}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            done.set()
+            thread.join()
@@ -0,0 +1,130 @@
+"""
+Run-scoped output workspaces with atomic artifact promotion and retention.
+"""
+
+import shutil
+import time
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from ..config.constants import (
+    OUTPUT_DIR, RUNS_DIR, OUTPUT_RETENTION_RUNS, OUTPUT_RETENTION_DAYS, ZIP_FILENAME
+)
+from ..utils.file_utils import ensure_dir, promote_file
+from ..utils.json_utils import load_json
+from ..utils.logger import get_logger
+
+logger = get_logger()
+
+# Marks a directory as a run workspace so retention never touches anything else
+WORKSPACE_MARKER = '.workspace'
+
+
+class RunWorkspace:
+    """Output directory owned by a single run: ``<root>/<run_id>/``.
+
+    Artifacts are written under ``.staging`` and promoted into place with an
+    atomic rename, so packagers and concurrent readers only ever see
+    finished files.
+    """
+
+    def __init__(self, run_id: str, root: Path = OUTPUT_DIR):
+        self.run_id = run_id
+        self.root = root
+        self.path = root / run_id
+
+    @classmethod
+    def at(cls, path: Path) -> "RunWorkspace":
+        """Workspace rooted at an existing directory path."""
+        return cls(path.name, path.parent)
+
+    @property
+    def images_dir(self) -> Path:
+        return self.path / 'images'
+
+    @property
+    def alternates_dir(self) -> Path:
+        return self.path / 'alternates'
+
+    @property
+    def captions_dir(self) -> Path:
+        return self.path / 'captions'
+
+    @property
+    def staging_dir(self) -> Path:
+        return self.path / '.staging'
+
+    @property
+    def mapping_path(self) -> Path:
+        return self.path / 'mapping.json'
+
+    @property
+    def zip_path(self) -> Path:
+        return self.path / ZIP_FILENAME
+
+    def create(self) -> "RunWorkspace":
+        ensure_dir(self.images_dir)
+        ensure_dir(self.captions_dir)
+        ensure_dir(self.staging_dir)
+        # Rewriting the marker refreshes its mtime, which retention uses as last activity
+        (self.path / WORKSPACE_MARKER).write_text(self.run_id, encoding='utf-8')
+        return self
+
+    def staging_path(self, name: str) -> Path:
+        """Where to write an artifact before it is promoted."""
+        return ensure_dir(self.staging_dir) / name
+
+    def promote(self, staged: Path, destination: Path) -> Path:
+        return promote_file(staged, destination)
+
+
+def _is_active(run_id: str, max_age_seconds: float) -> bool:
+    """A run whose manifest says running and was touched recently."""
+    manifest_path = RUNS_DIR / run_id / 'manifest.json'
+    if not manifest_path.exists():
+        return False
+    try:
+        status = load_json(manifest_path).get('status')
+    except Exception:
+        return False
+    return status == 'running' and time.time() - manifest_path.stat().st_mtime < max_age_seconds
+
+
+def prune_workspaces(
+    root: Path = OUTPUT_DIR,
+    keep_runs: int = OUTPUT_RETENTION_RUNS,
+    max_age_days: Optional[float] = OUTPUT_RETENTION_DAYS,
+    exclude: Iterable[str] = ()
+) -> List[str]:
+    """Delete run workspaces beyond the newest ``keep_runs`` or older than ``max_age_days``.
+
+    Runs still in progress and ids in ``exclude`` are never removed. Their
+    run manifests are removed with them since they can no longer resume.
+    """
+    if not root.exists():
+        return []
+
+    max_age_seconds = max_age_days * 86400 if max_age_days is not None else float('inf')
+    workspaces = sorted(
+        (p for p in root.iterdir() if (p / WORKSPACE_MARKER).is_file()),
+        key=lambda p: (p / WORKSPACE_MARKER).stat().st_mtime,
+        reverse=True
+    )
+    excluded = set(exclude)
+    now = time.time()
+    removed = []
+
+    for position, workspace in enumerate(workspaces):
+        run_id = workspace.name
+        expired = now - (workspace / WORKSPACE_MARKER).stat().st_mtime > max_age_seconds
+        if position < keep_runs and not expired:
+            continue
+        if run_id in excluded or _is_active(run_id, max_age_seconds):
+            continue
+        shutil.rmtree(workspace, ignore_errors=True)
+        shutil.rmtree(RUNS_DIR / run_id, ignore_errors=True)
+        removed.append(run_id)
+
+    if removed:
+        logger.info(f"Pruned {len(removed)} old run workspaces")
+    return removed
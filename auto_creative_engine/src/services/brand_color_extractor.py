@@ -12,6 +12,7 @@ from sklearn.cluster import KMeans
 
 from ..config.constants import DEFAULT_COLOR_COUNT
 from ..utils.logger import get_logger
+from ..utils.tracing import traced
 
 logger = get_logger()
 
@@ -23,6 +24,7 @@ class BrandColorExtractor:
         self.num_colors = num_colors
         logger.info(f"Initialized BrandColorExtractor (colors: {num_colors})")
     
+    @traced("brand_colors.extract", category="kmeans")
     def extract_colors(self, image_path: Path) -> List[str]:
         """Extract dominant colors from an image."""
         try:
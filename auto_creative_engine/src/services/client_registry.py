@@ -0,0 +1,130 @@
+"""
+Process-wide registry of Google Gen AI clients with pooled HTTP connections.
+"""
+
+import importlib.util
+import threading
+from typing import TYPE_CHECKING, Dict, Iterable, Optional, Tuple
+
+from ..config.constants import (
+    HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_KEEPALIVE_EXPIRY
+)
+from ..utils.logger import get_logger
+from ..utils.async_utils import run_sync
+
+if TYPE_CHECKING:
+    from google.genai import Client
+
+logger = get_logger()
+
+_clients: Dict[Tuple, "Client"] = {}
+_warmed: set = set()
+_lock = threading.Lock()
+
+
+def _http2_available() -> bool:
+    """HTTP/2 in httpx needs the optional h2 package."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def _pool_args() -> dict:
+    """Build httpx client arguments for a tuned keep-alive connection pool."""
+    import httpx
+
+    return {
+        "http2": _http2_available(),
+        "limits": httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+    }
+
+
+def _build_client(api_key: str, timeout: Optional[float], base_url: Optional[str]) -> "Client":
+    """Construct a client, degrading gracefully on SDKs without pool options."""
+    # Imported here so the offline mock backend runs without the SDK installed
+    from google.genai import Client, types
+
+    options = {}
+    if timeout is not None:
+        options["timeout"] = int(timeout * 1000)
+    if base_url:
+        options["base_url"] = base_url
+
+    try:
+        pool = _pool_args()
+        pooled = dict(options, client_args=pool)
+        # aiohttp, when installed, replaces httpx for async calls and rejects httpx arguments
+        if importlib.util.find_spec("aiohttp") is None:
+            pooled["async_client_args"] = pool
+        return Client(api_key=api_key, http_options=types.HttpOptions(**pooled))
+    except Exception as e:
+        logger.debug(f"Pooled HTTP options unavailable, using SDK defaults: {e}")
+
+    if options:
+        return Client(api_key=api_key, http_options=types.HttpOptions(**options))
+    return Client(api_key=api_key)
+
+
+def get_genai_client(
+    api_key: str,
+    timeout: Optional[float] = None,
+    base_url: Optional[str] = None
+) -> "Client":
+    """Get the shared client for an API key and option set, creating it once."""
+    if not api_key:
+        raise ValueError("Gemini API key is required")
+
+    key = (api_key, timeout, base_url)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _build_client(api_key, timeout, base_url)
+            _clients[key] = client
+            logger.info(f"Created shared Google Gen AI client (http2={_http2_available()})")
+        return client
+
+
+def warm_up(
+    api_key: str,
+    models: Iterable[str] = ("gemini-2.5-flash",),
+    timeout: Optional[float] = None,
+    base_url: Optional[str] = None
+) -> None:
+    """Open the sync and async connection pools ahead of the first real request."""
+    key = (api_key, timeout, base_url)
+    with _lock:
+        if key in _warmed:
+            return
+        _warmed.add(key)
+
+    client = get_genai_client(api_key, timeout=timeout, base_url=base_url)
+    for model in models:
+        try:
+            client.models.get(model=model)
+            run_sync(client.aio.models.get(model=model))
+            logger.info(f"Warmed up Gen AI connections for {model}")
+        except Exception as e:
+            logger.warning(f"Gen AI warm-up failed for {model}: {e}")
+
+
+def warm_up_in_background(api_key: str, **kwargs) -> threading.Thread:
+    """Warm up without blocking the caller."""
+    thread = threading.Thread(
+        target=warm_up,
+        args=(api_key,),
+        kwargs=kwargs,
+        name="genai-warm-up",
+        daemon=True
+    )
+    thread.start()
+    return thread
+
+
+def clear_clients() -> None:
+    """Drop all shared clients, e.g. after an API key rotation."""
+    with _lock:
+        _clients.clear()
+        _warmed.clear()
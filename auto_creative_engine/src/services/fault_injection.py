@@ -0,0 +1,130 @@
+"""
+Latency and failure injection for the offline mock Gemini backend.
+"""
+
+import asyncio
+import hashlib
+import math
+import random
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, Optional
+
+from ..utils.logger import get_logger
+
+logger = get_logger()
+
+
+class MockAPIError(Exception):
+    """Injected API error shaped like a google-genai ``APIError``."""
+
+    def __init__(self, code: int, message: str, retry_delay: Optional[float] = None):
+        super().__init__(f"{code} {message}")
+        self.code = code
+        self.message = message
+        # RetryPolicy reads RetryInfo from the details, as with real quota errors
+        self.details = {"retryDelay": f"{retry_delay:g}s"} if retry_delay is not None else None
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Build a latency sampler, in seconds, from a spec string.
+
+    ``none``, ``fixed:S``, ``uniform:LOW:HIGH`` or ``lognormal:MEDIAN:SIGMA``.
+    """
+    name, _, args = (spec or 'none').strip().lower().partition(':')
+    try:
+        values = [float(v) for v in args.split(':')] if args else []
+        if name in ('none', '0', ''):
+            return lambda rng: 0.0
+        if name == 'fixed':
+            (seconds,) = values
+            return lambda rng: seconds
+        if name == 'uniform':
+            low, high = values
+            return lambda rng: rng.uniform(low, high)
+        if name == 'lognormal':
+            median, sigma = values
+            return lambda rng: rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+    except ValueError:
+        pass
+    raise ValueError(f"Invalid latency spec {spec!r}; use none, fixed:S, uniform:LOW:HIGH or lognormal:MEDIAN:SIGMA")
+
+
+class FaultInjector:
+    """Samples a latency and an optional 429 or timeout for each mock call.
+
+    Draws are seeded by the request and how many times it has been made, so
+    the same run injects the same faults in the same places regardless of
+    how concurrent calls interleave.
+    """
+
+    def __init__(
+        self,
+        latency: str = 'none',
+        rate_limit_rate: float = 0.0,
+        timeout_rate: float = 0.0,
+        timeout_seconds: float = 2.0,
+        latency_scale: float = 1.0,
+        seed: int = 0
+    ):
+        self.latency_spec = latency
+        self._sample_latency = parse_latency(latency)
+        self.rate_limit_rate = max(0.0, rate_limit_rate)
+        self.timeout_rate = max(0.0, timeout_rate)
+        self.timeout_seconds = timeout_seconds
+        self.latency_scale = max(0.0, latency_scale)
+        self.seed = seed
+        self._attempts: Dict[str, int] = defaultdict(int)
+        self._counts = {"calls": 0, "rate_limited": 0, "timeouts": 0}
+        self._lock = threading.Lock()
+
+    def _draw(self, key: str):
+        """Decide the fate of one call: (delay, error or None)."""
+        with self._lock:
+            attempt = self._attempts[key]
+            self._attempts[key] += 1
+            self._counts["calls"] += 1
+        digest = hashlib.sha256(f"{self.seed}:{key}:{attempt}".encode("utf-8")).digest()
+        rng = random.Random(int.from_bytes(digest[:8], "big"))
+
+        roll = rng.random()
+        if roll < self.rate_limit_rate:
+            with self._lock:
+                self._counts["rate_limited"] += 1
+            # Quota errors come back fast with a short server-requested delay
+            delay = min(0.05, self._sample_latency(rng)) * self.latency_scale
+            return delay, MockAPIError(429, "RESOURCE_EXHAUSTED (injected)", retry_delay=rng.choice((1, 2)))
+        if roll < self.rate_limit_rate + self.timeout_rate:
+            with self._lock:
+                self._counts["timeouts"] += 1
+            return self.timeout_seconds * self.latency_scale, TimeoutError("Request timed out (injected)")
+        return self._sample_latency(rng) * self.latency_scale, None
+
+    def apply(self, key: str, timeout: Optional[float] = None) -> None:
+        """Sleep for the sampled latency, then raise the injected error if any.
+
+        A call slower than ``timeout`` gives up after ``timeout`` seconds, as
+        an HTTP client with that timeout would.
+        """
+        delay, error = self._draw(key)
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"Request exceeded its {timeout:g}s timeout")
+        if delay > 0:
+            time.sleep(delay)
+        if error is not None:
+            raise error
+
+    async def aapply(self, key: str) -> None:
+        """Async ``apply`` that yields to the event loop while sleeping."""
+        delay, error = self._draw(key)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+
+    def metrics(self) -> Dict[str, int]:
+        """How many calls were made and how many had faults injected."""
+        with self._lock:
+            return dict(self._counts)
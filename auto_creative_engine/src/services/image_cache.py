@@ -0,0 +1,234 @@
+"""
+Persistent, content-addressed cache for generated images.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..config.constants import IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_BYTES, IMAGE_CACHE_MAX_ENTRIES
+from ..utils.file_utils import atomic_write_bytes
+from ..utils.logger import get_logger
+from ..utils.sqlite_utils import open_connection
+
+logger = get_logger()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_images_last_access ON images(last_access);
+"""
+
+
+class ImageCache:
+    """Encoded images on disk, indexed in SQLite, with size-bounded LRU eviction.
+
+    Each entry is one candidate of a request, so a request for fewer images
+    can be served from an earlier, larger one. Files are sharded by key
+    prefix and checked against their SHA-256 on every read; a corrupt or
+    missing file counts as a miss and drops the entry. Safe to share
+    between threads and processes, like ``ResponseCache``.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path = IMAGE_CACHE_DIR,
+        max_bytes: int = IMAGE_CACHE_MAX_BYTES,
+        max_entries: int = IMAGE_CACHE_MAX_ENTRIES
+    ):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "corrupt": 0, "errors": 0}
+
+        self._connection().executescript(_SCHEMA)
+        logger.info(f"Initialized ImageCache at {cache_dir}")
+
+    @staticmethod
+    def make_key(
+        model: str,
+        prompt: str,
+        aspect_ratio: str,
+        seed: Optional[int],
+        output: Dict[str, Any],
+        candidate: int = 0
+    ) -> str:
+        """Build a content-addressed key for one image of a generation request.
+
+        ``output`` holds the settings that shape the stored bytes (format,
+        quality, maximum size) so differently encoded images never collide.
+        """
+        payload = json.dumps(
+            {
+                "model": model,
+                "prompt": prompt,
+                "aspect_ratio": aspect_ratio,
+                "seed": seed,
+                "output": output,
+                "candidate": candidate,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def path_for(self, key: str) -> Path:
+        """Where an entry's bytes live; the first two hex digits pick the shard."""
+        return self.cache_dir / key[:2] / f"{key}.bin"
+
+    def _connection(self):
+        """Get this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = open_connection(self.cache_dir / 'index.sqlite3')
+            self._local.conn = conn
+        return conn
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[name] += amount
+
+    def get_many(self, keys: List[str]) -> Optional[List[bytes]]:
+        """Return the bytes for every key, or None unless all of them are cached and intact."""
+        try:
+            conn = self._connection()
+            found = []
+            for key in keys:
+                row = conn.execute("SELECT sha256 FROM images WHERE key = ?", (key,)).fetchone()
+                data = self._read(conn, key, row["sha256"]) if row is not None else None
+                if data is None:
+                    self._count("misses")
+                    return None
+                found.append(data)
+
+            now = time.time()
+            conn.executemany("UPDATE images SET last_access = ? WHERE key = ?", [(now, key) for key in keys])
+            self._count("hits")
+            return found
+
+        except Exception as e:
+            self._count("errors")
+            logger.warning(f"Image cache read failed: {e}")
+            return None
+
+    def _read(self, conn, key: str, sha256: str) -> Optional[bytes]:
+        """Read an entry's file, dropping the entry if it is gone or does not match its hash."""
+        path = self.path_for(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            data = None
+        if data is not None and hashlib.sha256(data).hexdigest() == sha256:
+            return data
+
+        self._count("corrupt")
+        logger.warning(f"Dropping corrupt image cache entry {key[:12]}")
+        conn.execute("DELETE FROM images WHERE key = ?", (key,))
+        path.unlink(missing_ok=True)
+        return None
+
+    def put_many(self, entries: Dict[str, bytes], model: str) -> None:
+        """Store images by key and evict least recently used entries over the bounds."""
+        if not entries:
+            return
+
+        try:
+            # Files land before their index rows, so an indexed entry always has its bytes
+            for key, data in entries.items():
+                atomic_write_bytes(self.path_for(key), data)
+
+            conn = self._connection()
+            now = time.time()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO images (key, model, sha256, size, created_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (key, model, hashlib.sha256(data).hexdigest(), len(data), now, now)
+                        for key, data in entries.items()
+                    ]
+                )
+                evicted = self._evict(conn)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+            for key in evicted:
+                self.path_for(key).unlink(missing_ok=True)
+            self._count("writes", len(entries))
+            if evicted:
+                self._count("evictions", len(evicted))
+                logger.debug(f"Evicted {len(evicted)} cached images")
+
+        except Exception as e:
+            self._count("errors")
+            logger.warning(f"Image cache write failed: {e}")
+
+    def _evict(self, conn) -> List[str]:
+        """Drop LRU entries until within size bounds; returns their keys."""
+        row = conn.execute("SELECT COUNT(*) AS n, COALESCE(SUM(size), 0) AS bytes FROM images").fetchone()
+        count, total = row["n"], row["bytes"]
+        evicted = []
+        if count <= self.max_entries and total <= self.max_bytes:
+            return evicted
+
+        for victim in conn.execute("SELECT key, size FROM images ORDER BY last_access ASC").fetchall():
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM images WHERE key = ?", (victim["key"],))
+            count -= 1
+            total -= victim["size"]
+            evicted.append(victim["key"])
+        return evicted
+
+    def clear(self) -> None:
+        """Remove every cached image."""
+        conn = self._connection()
+        keys = [row["key"] for row in conn.execute("SELECT key FROM images").fetchall()]
+        conn.execute("DELETE FROM images")
+        for key in keys:
+            self.path_for(key).unlink(missing_ok=True)
+        logger.info("Cleared image cache")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for this process and on-disk totals."""
+        with self._lock:
+            stats = dict(self._stats)
+
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        try:
+            row = self._connection().execute(
+                "SELECT COUNT(*) AS n, COALESCE(SUM(size), 0) AS bytes FROM images"
+            ).fetchone()
+            stats["entries"], stats["bytes"] = row["n"], row["bytes"]
+        except Exception as e:
+            logger.warning(f"Could not read image cache size: {e}")
+        return stats
+
+
+_caches: Dict[Path, ImageCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_image_cache(cache_dir: Path = IMAGE_CACHE_DIR, **kwargs) -> ImageCache:
+    """Get the process-wide cache for a directory so counters are shared."""
+    with _caches_lock:
+        cache = _caches.get(cache_dir)
+        if cache is None:
+            cache = ImageCache(cache_dir, **kwargs)
+            _caches[cache_dir] = cache
+        return cache
@@ -0,0 +1,272 @@
+"""
+Durable SQLite-backed queue of generation jobs shared by worker processes.
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..config.constants import (
+    JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS, JOB_RETRY_BASE_DELAY, JOB_RETRY_MAX_DELAY
+)
+from ..config.env import JOB_QUEUE_PATH, JOB_QUEUE_WAL
+from ..utils.logger import get_logger
+from ..utils.sqlite_utils import open_connection
+
+logger = get_logger()
+
+JOB_QUEUED = 'queued'
+JOB_LEASED = 'leased'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    worker TEXT,
+    lease_expires REAL,
+    available_at REAL NOT NULL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs(status, priority, available_at);
+"""
+
+
+def default_worker_id() -> str:
+    """Host and pid, unique across workers sharing a queue."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+@dataclass
+class Job:
+    """A snapshot of one queued job."""
+    id: str
+    payload: Dict[str, Any]
+    status: str
+    priority: int
+    attempts: int
+    max_attempts: int
+    worker: Optional[str]
+    lease_expires: Optional[float]
+    result: Optional[Dict[str, Any]]
+    error: Optional[str]
+    created_at: float
+    updated_at: float
+
+    @classmethod
+    def from_row(cls, row) -> "Job":
+        return cls(
+            id=row["id"],
+            payload=json.loads(row["payload"]),
+            status=row["status"],
+            priority=row["priority"],
+            attempts=row["attempts"],
+            max_attempts=row["max_attempts"],
+            worker=row["worker"],
+            lease_expires=row["lease_expires"],
+            result=json.loads(row["result"]) if row["result"] else None,
+            error=row["error"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+        )
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+
+
+class JobQueue:
+    """Job queue with leases, heartbeats and retries.
+
+    A worker leases a job for ``lease_seconds`` and must heartbeat to keep
+    it. A job whose lease runs out (the worker crashed or hung) becomes
+    available again, so another worker can take it over. Failed jobs are
+    retried with exponential backoff up to ``max_attempts``. Ready jobs are
+    leased lowest ``priority`` first, then oldest first.
+
+    Safe to share between threads (one connection per thread) and between
+    processes (immediate write transactions).
+    """
+
+    def __init__(self, db_path: Path = JOB_QUEUE_PATH, wal: bool = JOB_QUEUE_WAL):
+        self.db_path = db_path
+        self.wal = wal
+        self._local = threading.local()
+        self._connection().executescript(_SCHEMA)
+        logger.info(f"Initialized JobQueue at {db_path}")
+
+    def _connection(self):
+        """Get this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = open_connection(self.db_path, wal=self.wal)
+            self._local.conn = conn
+        return conn
+
+    def _write(self, sql: str, params: tuple) -> int:
+        """Run one write statement and return the number of rows changed."""
+        return self._connection().execute(sql, params).rowcount
+
+    def submit(
+        self,
+        payload: Dict[str, Any],
+        priority: int = 0,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+        job_id: Optional[str] = None
+    ) -> str:
+        """Add a job and return its id."""
+        job_id = job_id or uuid.uuid4().hex
+        now = time.time()
+        self._write(
+            "INSERT INTO jobs (id, payload, status, priority, attempts, max_attempts, "
+            "available_at, created_at, updated_at) VALUES (?, ?, ?, ?, 0, ?, ?, ?, ?)",
+            (job_id, json.dumps(payload, ensure_ascii=False), JOB_QUEUED,
+             priority, max(1, max_attempts), now, now, now)
+        )
+        logger.info(f"Queued job {job_id}")
+        return job_id
+
+    def lease(self, worker: str, lease_seconds: float = JOB_LEASE_SECONDS) -> Optional[Job]:
+        """Claim the next ready job, or an expired lease, for ``worker``."""
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Expired leases that already used every attempt are given up on
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = COALESCE(error, 'lease expired'), "
+                "worker = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE status = ? AND lease_expires < ? AND attempts >= max_attempts",
+                (JOB_FAILED, now, JOB_LEASED, now)
+            )
+            row = conn.execute(
+                "SELECT id FROM jobs "
+                "WHERE (status = ? AND available_at <= ?) OR (status = ? AND lease_expires < ?) "
+                "ORDER BY priority ASC, created_at ASC LIMIT 1",
+                (JOB_QUEUED, now, JOB_LEASED, now)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, worker = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (JOB_LEASED, worker, now + lease_seconds, now, row["id"])
+            )
+            job = Job.from_row(conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone())
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        logger.info(f"Worker {worker} leased job {job.id} (attempt {job.attempts}/{job.max_attempts})")
+        return job
+
+    def heartbeat(self, job_id: str, worker: str, lease_seconds: float = JOB_LEASE_SECONDS) -> bool:
+        """Extend a lease; False means the lease was lost to another worker."""
+        now = time.time()
+        return self._write(
+            "UPDATE jobs SET lease_expires = ?, updated_at = ? "
+            "WHERE id = ? AND worker = ? AND status = ?",
+            (now + lease_seconds, now, job_id, worker, JOB_LEASED)
+        ) == 1
+
+    def complete(self, job_id: str, worker: str, result: Optional[Dict[str, Any]] = None) -> bool:
+        """Mark a leased job done; False if ``worker`` no longer holds it."""
+        changed = self._write(
+            "UPDATE jobs SET status = ?, result = ?, error = NULL, worker = NULL, "
+            "lease_expires = NULL, updated_at = ? WHERE id = ? AND worker = ? AND status = ?",
+            (JOB_DONE, json.dumps(result, ensure_ascii=False) if result is not None else None,
+             time.time(), job_id, worker, JOB_LEASED)
+        )
+        if changed:
+            logger.info(f"Job {job_id} done")
+        return changed == 1
+
+    def fail(
+        self,
+        job_id: str,
+        worker: str,
+        error: str,
+        result: Optional[Dict[str, Any]] = None,
+        retry: bool = True
+    ) -> Optional[str]:
+        """Release a failed job for a retry after backoff, or fail it for good.
+
+        Returns the job's new status, or None if ``worker`` no longer holds it.
+        """
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND worker = ? AND status = ?",
+                (job_id, worker, JOB_LEASED)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            attempts = row["attempts"]
+            status = JOB_QUEUED if retry and attempts < row["max_attempts"] else JOB_FAILED
+            delay = min(JOB_RETRY_MAX_DELAY, JOB_RETRY_BASE_DELAY * (2 ** (attempts - 1)))
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, result = ?, worker = NULL, lease_expires = NULL, "
+                "available_at = ?, updated_at = ? WHERE id = ?",
+                (status, error, json.dumps(result, ensure_ascii=False) if result is not None else None,
+                 now + delay, now, job_id)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        if status == JOB_QUEUED:
+            logger.warning(f"Job {job_id} failed (attempt {attempts}), retrying in {delay:.0f}s: {error}")
+        else:
+            logger.error(f"Job {job_id} failed permanently after {attempts} attempts: {error}")
+        return status
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a job that has not started yet."""
+        return self._write(
+            "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status = ?",
+            (JOB_CANCELLED, time.time(), job_id, JOB_QUEUED)
+        ) == 1
+
+    def get(self, job_id: str) -> Optional[Job]:
+        row = self._connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job.from_row(row) if row else None
+
+    def list_jobs(self, status: Optional[str] = None, limit: int = 50) -> List[Job]:
+        """Most recently created jobs first, optionally filtered by status."""
+        if status is None:
+            rows = self._connection().execute(
+                "SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        else:
+            rows = self._connection().execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY created_at DESC LIMIT ?", (status, limit)
+            ).fetchall()
+        return [Job.from_row(row) for row in rows]
+
+    def stats(self) -> Dict[str, int]:
+        """Number of jobs in each status."""
+        rows = self._connection().execute(
+            "SELECT status, COUNT(*) AS n FROM jobs GROUP BY status"
+        ).fetchall()
+        return {row["status"]: row["n"] for row in rows}
@@ -4,6 +4,7 @@ Naming service for generating consistent file names.
 
 from typing import Optional
 from pathlib import Path
+import uuid
 from datetime import datetime
 
 from ..config.constants import TIMESTAMP_FORMAT, CREATIVE_PREFIX, CAPTION_PREFIX
@@ -19,6 +20,11 @@ class NamingService:
         self.prefix = prefix
         logger.info("Initialized NamingService")
     
+    def generate_run_id(self) -> str:
+        """Generate a unique, time-sortable identifier for a generation run."""
+        ts = datetime.now().strftime(TIMESTAMP_FORMAT)
+        return f"{ts}_{uuid.uuid4().hex[:6]}"
+    
     def generate_image_name(
         self,
         index: int,
@@ -0,0 +1,137 @@
+"""
+Token-bucket rate limiting for Gemini requests-per-minute and tokens-per-minute quotas.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from ..config.env import (
+    GEMINI_TEXT_RPM, GEMINI_TEXT_TPM,
+    GEMINI_IMAGE_RPM, GEMINI_IMAGE_TPM
+)
+from ..utils.logger import get_logger
+
+logger = get_logger()
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (about four characters per token)."""
+    return len(text) // 4 + 1
+
+
+class TokenBucket:
+    """Thread-safe token bucket that refills continuously.
+
+    Reservations may drive the balance negative; later callers then wait
+    behind earlier ones, which keeps admission fair and the long-run rate at
+    exactly the configured ceiling.
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take tokens and return how many seconds the caller must wait before using them."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= amount
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def try_reserve(self, amount: float) -> bool:
+        """Take tokens only if they are available now, without going into debt."""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens < amount:
+                return False
+            self.tokens -= amount
+            return True
+
+    def refund(self, amount: float) -> None:
+        """Return unused tokens, e.g. when a request used fewer than estimated."""
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class RateLimiter:
+    """Combined requests-per-minute and tokens-per-minute limiter for one model."""
+
+    def __init__(self, name: str, rpm: Optional[int] = None, tpm: Optional[int] = None):
+        self.name = name
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.waited_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: int) -> float:
+        wait = 0.0
+        if self.requests is not None:
+            wait = max(wait, self.requests.reserve(1))
+        if self.tokens is not None and tokens:
+            wait = max(wait, self.tokens.reserve(tokens))
+        if wait > 0:
+            with self._lock:
+                self.waited_seconds += wait
+            logger.debug(f"Rate limiter {self.name} delaying request by {wait:.2f}s")
+        return wait
+
+    def acquire(self, tokens: int = 0) -> None:
+        """Block until a request of the given token size is within quota."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def aacquire(self, tokens: int = 0) -> None:
+        """Wait without blocking the event loop until a request is within quota."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def try_acquire(self, tokens: int = 0) -> bool:
+        """Admit a request only if it is within quota right now; never waits."""
+        if self.requests is not None and not self.requests.try_reserve(1):
+            return False
+        if self.tokens is not None and tokens and not self.tokens.try_reserve(tokens):
+            if self.requests is not None:
+                self.requests.refund(1)
+            return False
+        return True
+
+    def settle(self, reserved: int, actual: Optional[int]) -> None:
+        """Reconcile an estimated token reservation with the reported usage."""
+        if self.tokens is None or actual is None:
+            return
+        if reserved > actual:
+            self.tokens.refund(reserved - actual)
+        elif actual > reserved:
+            self.tokens.reserve(actual - reserved)
+
+
+_limiters: Dict[Tuple[str, str], RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(kind: str, model: str) -> RateLimiter:
+    """Get the process-wide limiter for a model; kind is 'text' or 'image'."""
+    key = (kind, model)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            if kind == 'image':
+                limiter = RateLimiter(model, rpm=GEMINI_IMAGE_RPM, tpm=GEMINI_IMAGE_TPM)
+            else:
+                limiter = RateLimiter(model, rpm=GEMINI_TEXT_RPM, tpm=GEMINI_TEXT_TPM)
+            _limiters[key] = limiter
+        return limiter
@@ -0,0 +1,214 @@
+"""
+Persistent, content-addressed cache for LLM text responses.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from ..config.constants import (
+    LLM_CACHE_PATH, LLM_CACHE_TTL_SECONDS,
+    LLM_CACHE_MAX_BYTES, LLM_CACHE_MAX_ENTRIES
+)
+from ..utils.logger import get_logger
+from ..utils.sqlite_utils import open_connection
+
+logger = get_logger()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access);
+"""
+
+
+class ResponseCache:
+    """SQLite-backed LLM response cache with TTL and size-bounded LRU eviction.
+
+    Safe to share between threads (one connection per thread) and between
+    processes (WAL journal plus immediate write transactions). With
+    ``bypass`` every read misses but fresh responses are still stored, which
+    refreshes the cache.
+    """
+
+    def __init__(
+        self,
+        db_path: Path = LLM_CACHE_PATH,
+        ttl_seconds: Optional[float] = LLM_CACHE_TTL_SECONDS,
+        max_bytes: int = LLM_CACHE_MAX_BYTES,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        bypass: bool = False
+    ):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.bypass = bypass
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "errors": 0}
+
+        self._connection().executescript(_SCHEMA)
+        logger.info(f"Initialized ResponseCache at {db_path}")
+
+    @staticmethod
+    def make_key(
+        model: str,
+        prompt: str,
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        response_schema: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Build a content-addressed key for a generation request."""
+        payload = json.dumps(
+            {
+                "model": model,
+                "prompt": prompt,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "response_schema": response_schema,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _connection(self):
+        """Get this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = open_connection(self.db_path)
+            self._local.conn = conn
+        return conn
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[name] += amount
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a cached response, or None on miss, expiry or bypass."""
+        if self.bypass:
+            return None
+
+        try:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            now = time.time()
+            if row is None:
+                self._count("misses")
+                return None
+
+            if self.ttl_seconds is not None and now - row["created_at"] > self.ttl_seconds:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._count("misses")
+                return None
+
+            conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._count("hits")
+            return row["value"]
+
+        except Exception as e:
+            self._count("errors")
+            logger.warning(f"Response cache read failed: {e}")
+            return None
+
+    def put(self, key: str, value: str, model: str) -> None:
+        """Store a response and evict least recently used entries over the bounds."""
+        if not value:
+            return
+
+        try:
+            conn = self._connection()
+            now = time.time()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, model, value, size, created_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, model, value, len(value.encode('utf-8')), now, now)
+                )
+                evicted = self._evict(conn, now)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+            self._count("writes")
+            if evicted:
+                self._count("evictions", evicted)
+                logger.debug(f"Evicted {evicted} cached responses")
+
+        except Exception as e:
+            self._count("errors")
+            logger.warning(f"Response cache write failed: {e}")
+
+    def _evict(self, conn, now: float) -> int:
+        """Drop expired entries, then LRU entries until within size bounds."""
+        evicted = 0
+        if self.ttl_seconds is not None:
+            evicted += conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)
+            ).rowcount
+
+        row = conn.execute("SELECT COUNT(*) AS n, COALESCE(SUM(size), 0) AS bytes FROM responses").fetchone()
+        if row["n"] <= self.max_entries and row["bytes"] <= self.max_bytes:
+            return evicted
+
+        # Keep the most recently used entries that fit both bounds; the rest go in one statement
+        evicted += conn.execute(
+            "DELETE FROM responses WHERE key IN ("
+            "  SELECT key FROM ("
+            "    SELECT key, ROW_NUMBER() OVER recent AS position, SUM(size) OVER recent AS running"
+            "    FROM responses WINDOW recent AS (ORDER BY last_access DESC, key ROWS UNBOUNDED PRECEDING)"
+            "  ) WHERE position > ? OR running > ?"
+            ")",
+            (self.max_entries, self.max_bytes)
+        ).rowcount
+        return evicted
+
+    def clear(self) -> None:
+        """Remove every cached response."""
+        self._connection().execute("DELETE FROM responses")
+        logger.info("Cleared response cache")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for this process and on-disk totals."""
+        with self._lock:
+            stats = dict(self._stats)
+
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        try:
+            row = self._connection().execute(
+                "SELECT COUNT(*) AS n, COALESCE(SUM(size), 0) AS bytes FROM responses"
+            ).fetchone()
+            stats["entries"], stats["bytes"] = row["n"], row["bytes"]
+        except Exception as e:
+            logger.warning(f"Could not read response cache size: {e}")
+        return stats
+
+
+_caches: Dict[Tuple[Path, bool], ResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_response_cache(db_path: Path = LLM_CACHE_PATH, bypass: bool = False, **kwargs) -> ResponseCache:
+    """Get the process-wide cache for a database path so counters are shared."""
+    with _caches_lock:
+        cache = _caches.get((db_path, bypass))
+        if cache is None:
+            cache = ResponseCache(db_path, bypass=bypass, **kwargs)
+            _caches[(db_path, bypass)] = cache
+        return cache
@@ -0,0 +1,167 @@
+"""
+Retry policy with exponential backoff, jitter, Retry-After and deadlines for Gemini calls.
+"""
+
+import asyncio
+import random
+import re
+import time
+from contextlib import nullcontext
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncContextManager, Awaitable, Callable, Optional
+
+from ..config.constants import (
+    GEMINI_MAX_RETRIES, GEMINI_CALL_DEADLINE,
+    RETRY_BASE_DELAY, RETRY_MAX_DELAY
+)
+from ..utils.logger import get_logger
+
+logger = get_logger()
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+THROTTLE_STATUS_CODES = {429, 503}
+TRANSPORT_ERROR_NAMES = {
+    'ConnectError', 'ConnectTimeout', 'ReadError', 'ReadTimeout', 'WriteError',
+    'WriteTimeout', 'PoolTimeout', 'RemoteProtocolError', 'ServerDisconnectedError',
+    'ClientConnectionError',
+}
+
+
+def get_status_code(exc: BaseException) -> Optional[int]:
+    """Extract an HTTP status code from SDK or transport exceptions."""
+    for attr in ('code', 'status_code', 'status'):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(exc, 'response', None)
+    value = getattr(response, 'status_code', None) or getattr(response, 'status', None)
+    return value if isinstance(value, int) else None
+
+
+def is_throttled(exc: BaseException) -> bool:
+    """Whether the error signals quota exhaustion or overload."""
+    return get_status_code(exc) in THROTTLE_STATUS_CODES
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Whether an error is transient and worth retrying."""
+    if isinstance(exc, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    if type(exc).__name__ in TRANSPORT_ERROR_NAMES:
+        return True
+    return get_status_code(exc) in RETRYABLE_STATUS_CODES
+
+
+def get_retry_after(exc: BaseException) -> Optional[float]:
+    """Read the server-requested delay from a Retry-After header or RetryInfo detail."""
+    headers = getattr(getattr(exc, 'response', None), 'headers', None)
+    value = headers.get('retry-after') if headers is not None else None
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+
+    # Gemini reports RetryInfo as e.g. {"retryDelay": "12s"} in the error details
+    details = getattr(exc, 'details', None)
+    match = re.search(r"retryDelay['\"]?\s*:\s*['\"]?(\d+(?:\.\d+)?)s", str(details or ''))
+    if match:
+        return float(match.group(1))
+    return None
+
+
+class RetryPolicy:
+    """Retries transient failures with capped, jittered exponential backoff."""
+
+    def __init__(
+        self,
+        max_retries: int = GEMINI_MAX_RETRIES,
+        base_delay: float = RETRY_BASE_DELAY,
+        max_delay: float = RETRY_MAX_DELAY,
+        deadline: Optional[float] = GEMINI_CALL_DEADLINE,
+        attempt_timeout: Optional[float] = None,
+        on_retry: Optional[Callable[[BaseException, int, float], None]] = None
+    ):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.attempt_timeout = attempt_timeout
+        self.on_retry = on_retry
+
+    def backoff(self, attempt: int, exc: BaseException) -> float:
+        """Delay before the next attempt: Retry-After if given, else full-jitter backoff."""
+        retry_after = get_retry_after(exc)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay * 4)
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def _next_delay(self, attempt: int, exc: BaseException, started: float) -> Optional[float]:
+        """Return the delay before retrying, or None to give up."""
+        if attempt >= self.max_retries or not is_retryable(exc):
+            return None
+        delay = self.backoff(attempt, exc)
+        if self.deadline is not None and time.monotonic() - started + delay > self.deadline:
+            logger.warning(f"Retry deadline of {self.deadline}s reached, giving up")
+            return None
+        logger.warning(
+            f"Transient error (attempt {attempt + 1}/{self.max_retries + 1}), "
+            f"retrying in {delay:.1f}s: {exc}"
+        )
+        if self.on_retry:
+            self.on_retry(exc, attempt, delay)
+        return delay
+
+    def _attempt_timeout(self, started: float) -> Optional[float]:
+        """Per-attempt timeout, shortened so the attempt cannot overrun the deadline."""
+        timeout = self.attempt_timeout
+        if self.deadline is not None:
+            remaining = max(0.1, self.deadline - (time.monotonic() - started))
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        return timeout
+
+    def call(self, fn: Callable[..., Any], timed: bool = False) -> Any:
+        """Call a synchronous function with retries.
+
+        A blocking call cannot be cancelled from outside, so with ``timed``
+        ``fn`` receives each attempt's timeout in seconds (or None) and must
+        enforce it itself, e.g. as the request's HTTP timeout.
+        """
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            try:
+                return fn(self._attempt_timeout(started)) if timed else fn()
+            except Exception as e:
+                delay = self._next_delay(attempt, e, started)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+
+    async def acall(
+        self,
+        fn: Callable[[], Awaitable[Any]],
+        slot: Optional[Callable[[], AsyncContextManager[Any]]] = None
+    ) -> Any:
+        """Await a coroutine factory with retries and per-attempt timeouts.
+
+        ``slot`` is entered around each attempt, outside its timeout, so waiting
+        for quota or a concurrency slot never counts against the attempt.
+        """
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            try:
+                async with (slot() if slot is not None else nullcontext()):
+                    return await asyncio.wait_for(fn(), timeout=self._attempt_timeout(started))
+            except Exception as e:
+                delay = self._next_delay(attempt, e, started)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
@@ -0,0 +1,203 @@
+"""
+Token, image and cost metering per stage and per run, with a persisted usage ledger.
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..config.constants import USAGE_LEDGER_PATH, MODEL_PRICING
+from ..utils.logger import get_logger
+
+logger = get_logger()
+
+_current_meter: ContextVar[Optional["UsageMeter"]] = ContextVar("usage_meter", default=None)
+_current_stage: ContextVar[str] = ContextVar("usage_stage", default="other")
+
+
+def _empty_bucket() -> Dict[str, Any]:
+    return {
+        "calls": 0,
+        "cached_calls": 0,
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "total_tokens": 0,
+        "images": 0,
+        "cost_usd": 0.0,
+    }
+
+
+def estimate_cost(model: str, input_tokens: int = 0, output_tokens: int = 0, images: int = 0) -> float:
+    """Estimate USD cost from the MODEL_PRICING table; unknown models cost 0."""
+    pricing = MODEL_PRICING.get(model, {})
+    return (
+        input_tokens * pricing.get("input_per_1m", 0.0) / 1_000_000
+        + output_tokens * pricing.get("output_per_1m", 0.0) / 1_000_000
+        + images * pricing.get("per_image", 0.0)
+    )
+
+
+class UsageMeter:
+    """Aggregates usage for one run, broken down by stage and by model."""
+
+    def __init__(self, run_id: str, brand: Optional[str] = None):
+        self.run_id = run_id
+        self.brand = brand
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self._stages: Dict[str, Dict[str, Any]] = {}
+        self._models: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _add(self, stage: str, model: str, **amounts) -> None:
+        with self._lock:
+            for buckets, key in ((self._stages, stage), (self._models, model)):
+                bucket = buckets.setdefault(key, _empty_bucket())
+                for name, value in amounts.items():
+                    bucket[name] += value
+
+    def record_text(self, model: str, usage: Any = None, cached: bool = False) -> None:
+        """Record one text call from its response usage_metadata."""
+        stage = _current_stage.get()
+        if cached:
+            self._add(stage, model, calls=1, cached_calls=1)
+            return
+
+        input_tokens = getattr(usage, "prompt_token_count", None) or 0
+        output_tokens = (
+            (getattr(usage, "candidates_token_count", None) or 0)
+            + (getattr(usage, "thoughts_token_count", None) or 0)
+        )
+        total_tokens = getattr(usage, "total_token_count", None) or input_tokens + output_tokens
+        self._add(
+            stage, model,
+            calls=1,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            total_tokens=total_tokens,
+            cost_usd=estimate_cost(model, input_tokens, output_tokens),
+        )
+
+    def record_images(self, model: str, count: int, cached: bool = False) -> None:
+        """Record one image call returning ``count`` images."""
+        stage = _current_stage.get()
+        if cached:
+            self._add(stage, model, calls=1, cached_calls=1)
+            return
+        self._add(stage, model, calls=1, images=count, cost_usd=estimate_cost(model, images=count))
+
+    @contextmanager
+    def activate(self):
+        """Attribute calls made in this context (and tasks/threads spawned with it) to this meter."""
+        token = _current_meter.set(self)
+        try:
+            yield self
+        finally:
+            _current_meter.reset(token)
+
+    def summary(self) -> Dict[str, Any]:
+        """Per-stage, per-model and total usage for the run."""
+        with self._lock:
+            stages = {k: dict(v) for k, v in self._stages.items()}
+            models = {k: dict(v) for k, v in self._models.items()}
+
+        totals = _empty_bucket()
+        for bucket in stages.values():
+            for name in totals:
+                totals[name] += bucket[name]
+        for bucket in (*stages.values(), *models.values(), totals):
+            bucket["cost_usd"] = round(bucket["cost_usd"], 6)
+
+        return {
+            "run_id": self.run_id,
+            "brand": self.brand,
+            "started_at": self.started_at,
+            "stages": stages,
+            "models": models,
+            "totals": totals,
+        }
+
+    def write_ledger(self, ledger_path: Path = USAGE_LEDGER_PATH) -> Dict[str, Any]:
+        """Append this run's summary as one line to the usage ledger."""
+        entry = self.summary()
+        entry["recorded_at"] = datetime.now().isoformat(timespec="seconds")
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+
+        ledger_path.parent.mkdir(parents=True, exist_ok=True)
+        # A single O_APPEND write keeps concurrent writers from interleaving lines
+        fd = os.open(str(ledger_path), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode("utf-8"))
+        finally:
+            os.close(fd)
+
+        logger.info(f"Recorded usage for run {self.run_id} in {ledger_path}")
+        return entry
+
+
+@contextmanager
+def usage_stage(stage: str):
+    """Attribute usage recorded inside this block to a pipeline stage."""
+    token = _current_stage.set(stage)
+    try:
+        yield
+    finally:
+        _current_stage.reset(token)
+
+
+def record_text_usage(model: str, usage: Any = None, cached: bool = False) -> None:
+    """Record a text call against the active meter, if any."""
+    meter = _current_meter.get()
+    if meter is not None:
+        meter.record_text(model, usage, cached=cached)
+
+
+def record_image_usage(model: str, count: int, cached: bool = False) -> None:
+    """Record an image call against the active meter, if any."""
+    meter = _current_meter.get()
+    if meter is not None:
+        meter.record_images(model, count, cached=cached)
+
+
+def read_ledger(ledger_path: Path = USAGE_LEDGER_PATH) -> List[Dict[str, Any]]:
+    """Load every ledger entry, skipping malformed lines."""
+    if not ledger_path.exists():
+        return []
+    entries = []
+    with open(ledger_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return entries
+
+
+def summarize_ledger(ledger_path: Path = USAGE_LEDGER_PATH, group_by: str = "brand") -> Dict[str, Dict[str, Any]]:
+    """Total ledger usage grouped by an entry field such as brand or run_id."""
+    groups: Dict[str, Dict[str, Any]] = {}
+    for entry in read_ledger(ledger_path):
+        key = str(entry.get(group_by) or "unknown")
+        bucket = groups.setdefault(key, dict(_empty_bucket(), runs=0))
+        bucket["runs"] += 1
+        for name, value in entry.get("totals", {}).items():
+            if name in bucket:
+                bucket[name] += value
+    return groups
+
+
+def format_usage_table(summary: Dict[str, Any]) -> str:
+    """Render a run summary as a plain-text table."""
+    header = f"{'stage':<12}{'calls':>7}{'cached':>8}{'in tok':>10}{'out tok':>10}{'images':>8}{'cost $':>10}"
+    lines = [header, "-" * len(header)]
+    rows = list(summary.get("stages", {}).items()) + [("total", summary.get("totals", _empty_bucket()))]
+    for name, b in rows:
+        lines.append(
+            f"{name:<12}{b['calls']:>7}{b['cached_calls']:>8}{b['input_tokens']:>10}"
+            f"{b['output_tokens']:>10}{b['images']:>8}{b['cost_usd']:>10.4f}"
+        )
+    return "\n".join(lines)
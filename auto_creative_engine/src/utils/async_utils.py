@@ -0,0 +1,111 @@
+"""
+Asyncio helpers for bridging synchronous callers to async clients.
+"""
+
+import asyncio
+import contextvars
+import threading
+from typing import Any, AsyncIterator, Awaitable, Iterator, List, Optional
+
+from .logger import get_logger
+
+logger = get_logger()
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def get_background_loop() -> asyncio.AbstractEventLoop:
+    """Get the process-wide event loop, starting its thread on first use.
+
+    Async SDK clients keep connection pools bound to the loop that opened
+    them, so every sync bridge call runs on this one long-lived loop instead
+    of creating a fresh loop per call.
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=loop.run_forever,
+                name="creative-engine-loop",
+                daemon=True
+            )
+            thread.start()
+            _loop = loop
+            logger.debug("Started background event loop")
+        return _loop
+
+
+def run_sync(coro: Awaitable[Any]) -> Any:
+    """Run a coroutine to completion from synchronous code."""
+    loop = get_background_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+
+    if running is loop:
+        raise RuntimeError("run_sync() cannot be called from the background loop itself")
+
+    # Carry the caller's context variables (e.g. usage attribution) onto the loop
+    context = contextvars.copy_context()
+
+    async def _in_context():
+        for var, value in context.items():
+            var.set(value)
+        return await coro
+
+    future = asyncio.run_coroutine_threadsafe(_in_context(), loop)
+    return future.result()
+
+
+def iterate_sync(agen: AsyncIterator[Any]) -> Iterator[Any]:
+    """Consume an async iterator from synchronous code, one item at a time."""
+    async def _next():
+        return await agen.__anext__()
+
+    try:
+        while True:
+            try:
+                yield run_sync(_next())
+            except StopAsyncIteration:
+                return
+    finally:
+        aclose = getattr(agen, "aclose", None)
+        if aclose is not None:
+            run_sync(aclose())
+
+
+async def merge_streams(streams: List[AsyncIterator[Any]]) -> AsyncIterator[Any]:
+    """Interleave items from several async iterators as they arrive.
+
+    If a stream raises, the merged stream raises the same error and the
+    other streams are cancelled.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    finished = object()
+
+    async def _pump(stream):
+        error = None
+        try:
+            async for item in stream:
+                await queue.put(item)
+        except Exception as e:
+            error = e
+        await queue.put((finished, error))
+
+    tasks = [asyncio.ensure_future(_pump(s)) for s in streams]
+    remaining = len(tasks)
+    try:
+        while remaining:
+            item = await queue.get()
+            if isinstance(item, tuple) and len(item) == 2 and item[0] is finished:
+                if item[1] is not None:
+                    raise item[1]
+                remaining -= 1
+                continue
+            yield item
+    finally:
+        for task in tasks:
+            task.cancel()
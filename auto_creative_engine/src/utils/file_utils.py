@@ -2,7 +2,9 @@
 File utility functions for handling file operations.
 """
 
+import os
 import shutil
+import threading
 from pathlib import Path
 from typing import List, Optional, Tuple
 from PIL import Image
@@ -86,6 +88,36 @@ def resize_image(
         raise
 
 
+def temp_path_for(path: Path) -> Path:
+    """A unique hidden sibling of ``path`` for write-then-rename."""
+    return path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> Path:
+    """Write a file so readers only ever see the old or the complete new content."""
+    ensure_dir(path.parent)
+    tmp_path = temp_path_for(path)
+    try:
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return path
+
+
+def atomic_write_text(path: Path, text: str, encoding: str = 'utf-8') -> Path:
+    """Text counterpart of ``atomic_write_bytes``."""
+    return atomic_write_bytes(path, text.encode(encoding))
+
+
+def promote_file(staged: Path, destination: Path) -> Path:
+    """Atomically move a finished file into place (same filesystem)."""
+    ensure_dir(destination.parent)
+    os.replace(staged, destination)
+    return destination
+
+
 def copy_file(source: Path, destination: Path) -> Path:
     """Copy a file from source to destination."""
     ensure_dir(destination.parent)
@@ -93,6 +125,18 @@ def copy_file(source: Path, destination: Path) -> Path:
     return destination
 
 
+def link_or_copy(source: Path, destination: Path) -> Path:
+    """Hard-link a file into place, copying when linking is not possible."""
+    ensure_dir(destination.parent)
+    if destination.exists():
+        destination.unlink()
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copy2(source, destination)
+    return destination
+
+
 def get_image_dimensions(image_path: Path) -> Tuple[int, int]:
     """Get image dimensions (width, height)."""
     try:
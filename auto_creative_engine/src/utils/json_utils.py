@@ -3,8 +3,11 @@ JSON utility functions for handling JSON operations.
 """
 
 import json
+import os
+import re
+import threading
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional
 
 from .logger import get_logger
 
@@ -12,12 +15,14 @@ logger = get_logger()
 
 
 def save_json(data: Dict[str, Any], file_path: Path, indent: int = 2) -> Path:
-    """Save data to a JSON file."""
+    """Save data to a JSON file atomically, so readers never see a partial write."""
     try:
         file_path.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(file_path, 'w', encoding='utf-8') as f:
+        tmp_path = file_path.with_name(f".{file_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
             json.dump(data, f, indent=indent, ensure_ascii=False)
+        os.replace(tmp_path, file_path)
         
         logger.debug(f"Saved JSON to {file_path}")
         return file_path
@@ -50,3 +55,68 @@ def update_json(file_path: Path, updates: Dict[str, Any]) -> Dict[str, Any]:
     save_json(existing_data, file_path)
     return existing_data
 
+
+def parse_json_response(text: str) -> Any:
+    """Parse JSON from an LLM response, tolerating code fences and surrounding prose."""
+    if not text or not text.strip():
+        raise ValueError("Empty JSON response")
+    
+    cleaned = text.strip()
+    fence = re.match(r"^```(?:json)?\s*(.*?)\s*```$", cleaned, re.DOTALL | re.IGNORECASE)
+    if fence:
+        cleaned = fence.group(1)
+    
+    try:
+        return json.loads(cleaned)
+    except json.JSONDecodeError:
+        pass
+    
+    # Fall back to the outermost object or array embedded in the text
+    decoder = json.JSONDecoder()
+    for i, char in enumerate(cleaned):
+        if char in '{[':
+            try:
+                data, _ = decoder.raw_decode(cleaned[i:])
+                return data
+            except json.JSONDecodeError:
+                continue
+    
+    raise ValueError(f"Could not parse JSON from response: {text[:100]}")
+
+
+def parse_batch_items(
+    data: Any,
+    list_key: str,
+    item_key: str,
+    expected: int,
+    clean: Callable[[str], str]
+) -> Dict[int, str]:
+    """Map a batched LLM response to zero-based slots, dropping invalid entries.
+    
+    ``data`` is a list, or an object holding one under ``list_key``; items
+    are plain strings or ``{"index": n, item_key: text}`` objects. Texts
+    are passed through ``clean``.
+    """
+    items = data.get(list_key, []) if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        return {}
+    
+    parsed = {}
+    for position, item in enumerate(items):
+        if isinstance(item, str):
+            index, text = position + 1, item
+        elif isinstance(item, dict):
+            index, text = item.get("index", position + 1), item.get(item_key)
+        else:
+            continue
+        
+        try:
+            slot = int(index) - 1
+        except (TypeError, ValueError):
+            slot = position
+        
+        if not isinstance(text, str) or not text.strip():
+            continue
+        if 0 <= slot < expected and slot not in parsed:
+            parsed[slot] = clean(text)
+    return parsed
@@ -0,0 +1,28 @@
+"""
+SQLite helpers shared by the on-disk caches and stores.
+"""
+
+import sqlite3
+from pathlib import Path
+
+DEFAULT_BUSY_TIMEOUT = 30.0
+
+
+def open_connection(
+    db_path: Path,
+    timeout: float = DEFAULT_BUSY_TIMEOUT,
+    wal: bool = True
+) -> sqlite3.Connection:
+    """Open a connection configured for concurrent use by several threads and processes.
+
+    WAL needs shared memory between processes, so pass ``wal=False`` for a
+    database on a network volume that several machines open.
+    """
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_path), timeout=timeout, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA journal_mode={'WAL' if wal else 'DELETE'}")
+    # NORMAL is only crash-safe with WAL
+    conn.execute(f"PRAGMA synchronous={'NORMAL' if wal else 'FULL'}")
+    conn.execute(f"PRAGMA busy_timeout={int(timeout * 1000)}")
+    return conn
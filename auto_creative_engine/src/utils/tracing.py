@@ -0,0 +1,187 @@
+"""
+Lightweight nested tracing spans with wall and CPU time, exported as Chrome traces.
+"""
+
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .json_utils import save_json
+from .logger import get_logger
+
+logger = get_logger()
+
+_current_tracer: ContextVar[Optional["Tracer"]] = ContextVar("tracer", default=None)
+_current_span: ContextVar[Optional[int]] = ContextVar("trace_span", default=None)
+
+
+class Tracer:
+    """Collects finished spans for one run.
+
+    Spans nest through context variables, so children started on pipeline
+    threads, hedging threads or the shared event loop still find their
+    parent. With no active tracer, ``span`` costs a single lookup.
+    """
+
+    def __init__(self, run_id: str):
+        self.run_id = run_id
+        self.spans: List[Dict[str, Any]] = []
+        self._origin = time.perf_counter()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def activate(self):
+        """Make this the tracer for spans opened inside the block."""
+        token = _current_tracer.set(self)
+        try:
+            yield self
+        finally:
+            _current_tracer.reset(token)
+
+    def _new_id(self) -> int:
+        with self._lock:
+            self._next_id += 1
+            return self._next_id
+
+    def _finish(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self.spans.append(record)
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Chrome trace-event JSON, viewable in chrome://tracing or Perfetto."""
+        with self._lock:
+            spans = list(self.spans)
+        events = []
+        for s in sorted(spans, key=lambda s: s["start"]):
+            args = dict(s["attrs"], span_id=s["id"], parent_id=s["parent"])
+            if s["cpu"] is not None:
+                args["cpu_ms"] = round(s["cpu"] * 1000, 3)
+            if s["error"]:
+                args["error"] = s["error"]
+            events.append({
+                "name": s["name"],
+                "cat": s["category"],
+                "ph": "X",
+                "ts": round(s["start"] * 1e6, 1),
+                "dur": round(s["wall"] * 1e6, 1),
+                "pid": os.getpid(),
+                "tid": s["thread"],
+                "args": args,
+            })
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"run_id": self.run_id},
+        }
+
+    def write(self, path: Path) -> Path:
+        """Export the trace to ``path`` as Chrome trace JSON."""
+        save_json(self.to_chrome_trace(), path)
+        logger.info(f"Wrote trace with {len(self.spans)} spans to {path}")
+        return path
+
+    def summary(self) -> Dict[str, Any]:
+        """Span count, summed wall and CPU seconds and the slowest span, per category."""
+        with self._lock:
+            spans = list(self.spans)
+        categories: Dict[str, Dict[str, Any]] = {}
+        for s in spans:
+            bucket = categories.setdefault(s["category"], {
+                "spans": 0, "errors": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0, "max_seconds": 0.0
+            })
+            bucket["spans"] += 1
+            bucket["errors"] += 1 if s["error"] else 0
+            bucket["wall_seconds"] += s["wall"]
+            bucket["cpu_seconds"] += s["cpu"] or 0.0
+            bucket["max_seconds"] = max(bucket["max_seconds"], s["wall"])
+        for bucket in categories.values():
+            for key in ("wall_seconds", "cpu_seconds", "max_seconds"):
+                bucket[key] = round(bucket[key], 3)
+
+        roots = [s for s in spans if s["parent"] is None]
+        return {
+            "run_id": self.run_id,
+            "wall_seconds": round(max((s["start"] + s["wall"] for s in roots), default=0.0), 3),
+            "categories": categories,
+        }
+
+
+def current_tracer() -> Optional[Tracer]:
+    return _current_tracer.get()
+
+
+@contextmanager
+def span(name: str, category: str = "other", cpu: bool = True, **attrs):
+    """Time the block as a span of the active tracer, if any.
+
+    CPU time is that of the calling thread; pass ``cpu=False`` in async
+    code, where the event loop thread also runs other coroutines.
+    """
+    tracer = _current_tracer.get()
+    if tracer is None:
+        yield
+        return
+
+    span_id = tracer._new_id()
+    parent = _current_span.get()
+    token = _current_span.set(span_id)
+    start = time.perf_counter()
+    cpu_start = time.thread_time() if cpu else None
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        end = time.perf_counter()
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            # An async generator finalised from another context; nothing to restore there
+            pass
+        tracer._finish({
+            "id": span_id,
+            "parent": parent,
+            "name": name,
+            "category": category,
+            "start": start - tracer._origin,
+            "wall": end - start,
+            "cpu": time.thread_time() - cpu_start if cpu else None,
+            "thread": threading.get_ident(),
+            "attrs": attrs,
+            "error": error,
+        })
+
+
+def traced(name: Optional[str] = None, category: str = "other") -> Callable:
+    """Decorator form of ``span`` for synchronous functions."""
+    def decorator(fn: Callable) -> Callable:
+        span_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name, category):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def format_trace_table(summary: Dict[str, Any]) -> str:
+    """Render a trace summary as a plain-text table, slowest category first."""
+    header = f"{'stage':<14}{'spans':>7}{'errors':>8}{'wall s':>10}{'cpu s':>10}{'max s':>10}"
+    lines = [header, "-" * len(header)]
+    rows = sorted(summary.get("categories", {}).items(), key=lambda kv: kv[1]["wall_seconds"], reverse=True)
+    for name, b in rows:
+        lines.append(
+            f"{name:<14}{b['spans']:>7}{b['errors']:>8}{b['wall_seconds']:>10.3f}"
+            f"{b['cpu_seconds']:>10.3f}{b['max_seconds']:>10.3f}"
+        )
+    lines.append(f"{'run wall':<14}{'':>7}{'':>8}{summary.get('wall_seconds', 0.0):>10.3f}")
+    return "\n".join(lines)
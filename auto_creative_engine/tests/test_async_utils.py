@@ -0,0 +1,35 @@
+"""
+Tests for merging async streams.
+"""
+
+import asyncio
+from pathlib import Path
+import sys
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.utils.async_utils import merge_streams
+
+
+async def _items(*items, error=None):
+    for item in items:
+        await asyncio.sleep(0)
+        yield item
+    if error is not None:
+        raise error
+
+
+async def _collect(streams):
+    return [item async for item in merge_streams(streams)]
+
+
+def test_merges_every_item():
+    items = asyncio.run(_collect([_items(1, 2), _items(3), _items()]))
+    assert sorted(items) == [1, 2, 3]
+
+
+def test_failed_stream_raises_to_the_consumer():
+    with pytest.raises(ValueError, match="stream broke"):
+        asyncio.run(_collect([_items(1, 2, 3), _items(4, error=ValueError("stream broke"))]))
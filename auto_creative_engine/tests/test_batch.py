@@ -0,0 +1,59 @@
+"""
+Tests for carrying a campaign's generation options through a queued job.
+"""
+
+import json
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config.constants import ENHANCE_PRESET
+from src.config.settings import GenerationSettings, ImageGenConfig, LLMConfig
+from src.pipeline.batch import BatchRunner, Campaign
+
+
+def mock_settings():
+    return GenerationSettings(
+        image_config=ImageGenConfig(backend='mock', cache_enabled=False),
+        llm_config=LLMConfig(backend='mock', cache_enabled=False)
+    )
+
+
+def test_payload_round_trip_keeps_generation_options():
+    campaign = Campaign(
+        name="spring", product_description="A steel bottle", logo_path=Path("/brand/logo.png"),
+        variations=3, num_images=2, enhance=False, brand_tint=0.2, backend='mock'
+    )
+
+    payload = json.loads(json.dumps(campaign.to_payload()))
+    assert Campaign.from_payload(payload) == campaign
+
+
+def test_campaign_options_override_the_base_settings():
+    runner = BatchRunner(mock_settings())
+    campaign = Campaign(
+        name="spring", product_description="A steel bottle",
+        variations=3, num_images=2, enhance=True, brand_tint=0.2
+    )
+
+    settings = runner._settings_for(campaign)
+    postprocess = settings.image_config.postprocess
+    assert settings.variations_per_prompt == 3
+    assert settings.image_config.num_images == 2
+    assert (postprocess.brightness, postprocess.contrast, postprocess.saturation,
+            postprocess.sharpness) == ENHANCE_PRESET
+    assert postprocess.brand_tint == 0.2
+    # The runner's own settings are left alone
+    assert runner.settings.variations_per_prompt == 1
+
+
+def test_unset_options_keep_the_base_settings():
+    runner = BatchRunner(mock_settings())
+    base = runner.settings
+
+    settings = runner._settings_for(Campaign(name="plain", product_description="A steel bottle"))
+    assert settings.variations_per_prompt == base.variations_per_prompt
+    assert settings.image_config.num_images == base.image_config.num_images
+    assert settings.image_config.postprocess == base.image_config.postprocess
+    assert settings.image_config.backend == 'mock'
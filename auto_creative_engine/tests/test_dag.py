@@ -0,0 +1,79 @@
+"""
+Tests for the pipeline's dependency-graph executor.
+"""
+
+from pathlib import Path
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.pipeline.dag import DagExecutor, UpstreamFailed
+
+
+def test_tasks_receive_their_dependencies_results():
+    dag = DagExecutor(max_workers=4)
+    dag.add("a", lambda inputs: 2)
+    dag.add("b", lambda inputs: 3)
+    dag.add("sum", lambda inputs: inputs["a"] + inputs["b"], deps=["a", "b"])
+
+    assert dag.run() == {"a": 2, "b": 3, "sum": 5}
+
+
+def test_failure_skips_dependents_but_not_independent_branches():
+    def boom(inputs):
+        raise RuntimeError("boom")
+
+    dag = DagExecutor(max_workers=2)
+    dag.add("bad", boom)
+    dag.add("child", lambda inputs: "never", deps=["bad"])
+    dag.add("grandchild", lambda inputs: "never", deps=["child"])
+    dag.add("other", lambda inputs: "ok")
+
+    assert dag.run() == {"other": "ok"}
+    assert isinstance(dag.errors["bad"], RuntimeError)
+    assert isinstance(dag.errors["child"], UpstreamFailed)
+    assert isinstance(dag.errors["grandchild"], UpstreamFailed)
+
+
+def test_ready_tasks_start_lowest_priority_first():
+    order = []
+    dag = DagExecutor(max_workers=1)
+    for name, priority in (("late", 2), ("early", 0), ("middle", 1)):
+        dag.add(name, lambda inputs, name=name: order.append(name), priority=priority)
+
+    dag.run()
+    assert order == ["early", "middle", "late"]
+
+
+def test_stage_limit_caps_concurrent_tasks():
+    lock = threading.Lock()
+    running = {"now": 0, "peak": 0}
+
+    def task(inputs):
+        with lock:
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+        time.sleep(0.02)
+        with lock:
+            running["now"] -= 1
+
+    dag = DagExecutor(max_workers=8, stage_limits={"images": 2})
+    for i in range(6):
+        dag.add(f"image_{i}", task, stage="images")
+
+    dag.run()
+    assert running["peak"] == 2
+    assert dag.metrics()["stages"]["images"]["tasks"] == 6
+
+
+def test_unknown_and_duplicate_tasks_are_rejected():
+    dag = DagExecutor()
+    dag.add("a", lambda inputs: None)
+    with pytest.raises(ValueError):
+        dag.add("a", lambda inputs: None)
+    with pytest.raises(ValueError):
+        dag.add("b", lambda inputs: None, deps=["missing"])
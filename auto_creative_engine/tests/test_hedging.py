@@ -0,0 +1,66 @@
+"""
+Tests for hedged requests: budget, claims and the hedge callable.
+"""
+
+from pathlib import Path
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.image_gen.concurrency import AdaptiveConcurrencyLimiter
+from src.image_gen.hedging import RequestHedger
+
+
+def _hedger(name, max_hedge_ratio=0.0):
+    hedger = RequestHedger(name, min_samples=2, min_delay=0.02, max_hedge_ratio=max_hedge_ratio)
+    for _ in range(2):
+        hedger.tracker.record(0.01)
+    return hedger
+
+
+def _slow():
+    time.sleep(0.3)
+    return "primary"
+
+
+def test_hedge_runs_hedge_fn_after_claiming():
+    hedger = _hedger("hedge-fires")
+    claims = []
+
+    result = hedger.run(_slow, can_hedge=lambda: claims.append(1) or True, hedge_fn=lambda: "hedge")
+
+    assert result == "hedge"
+    assert claims == [1]
+    assert hedger.metrics()["hedges_won"] == 1
+
+
+def test_budget_is_checked_before_claiming():
+    hedger = _hedger("hedge-budget")
+    hedger.run(_slow, hedge_fn=lambda: "hedge")
+    claims = []
+
+    # The budget of one hedge is spent, so nothing may be claimed for another
+    assert hedger.run(_slow, can_hedge=lambda: claims.append(1) or True) == "primary"
+    assert claims == []
+    assert hedger.metrics()["budget_denied"] == 1
+
+
+def test_refused_claim_returns_the_budget():
+    hedger = _hedger("hedge-blocked")
+
+    assert hedger.run(_slow, can_hedge=lambda: False) == "primary"
+    metrics = hedger.metrics()
+    assert metrics["hedges_fired"] == 0
+    assert metrics["hedges_blocked"] == 1
+
+
+def test_concurrency_try_acquire_and_abandon():
+    limiter = AdaptiveConcurrencyLimiter("hedge-slots", initial=1, min_limit=1, max_limit=1)
+
+    started = limiter.try_acquire()
+    assert started is not None
+    assert limiter.try_acquire() is None
+    limiter.abandon()
+    assert limiter.in_flight == 0
+    assert limiter.metrics()["success"] == 0
@@ -0,0 +1,117 @@
+"""
+Tests for the durable job queue: leases, heartbeats, expiry re-claim and retries.
+"""
+
+from pathlib import Path
+import sys
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config.constants import JOB_RETRY_BASE_DELAY
+from src.services import job_queue
+from src.services.job_queue import JobQueue, JOB_DONE, JOB_FAILED, JOB_LEASED, JOB_QUEUED
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(job_queue, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    return JobQueue(tmp_path / 'jobs.sqlite3')
+
+
+def test_lease_takes_each_job_once(queue):
+    job_id = queue.submit({"name": "a"})
+
+    job = queue.lease("w1", lease_seconds=30)
+    assert (job.id, job.status, job.worker, job.attempts) == (job_id, JOB_LEASED, "w1", 1)
+    assert queue.lease("w2", lease_seconds=30) is None
+
+
+def test_lower_priority_value_is_leased_first(queue, clock):
+    queue.submit({}, job_id="later", priority=5)
+    clock.now += 1
+    queue.submit({}, job_id="urgent", priority=0)
+
+    assert queue.lease("w1").id == "urgent"
+
+
+def test_heartbeat_keeps_the_lease(queue, clock):
+    job_id = queue.submit({})
+    queue.lease("w1", lease_seconds=30)
+
+    clock.now += 20
+    assert queue.heartbeat(job_id, "w1", lease_seconds=30)
+    clock.now += 20
+    assert queue.lease("w2", lease_seconds=30) is None
+
+
+def test_expired_lease_is_reclaimed_by_another_worker(queue, clock):
+    job_id = queue.submit({}, max_attempts=3)
+    queue.lease("w1", lease_seconds=30)
+
+    clock.now += 31
+    job = queue.lease("w2", lease_seconds=30)
+    assert (job.id, job.worker, job.attempts) == (job_id, "w2", 2)
+    # The first worker lost the job and can no longer touch it
+    assert not queue.heartbeat(job_id, "w1")
+    assert not queue.complete(job_id, "w1")
+    assert queue.fail(job_id, "w1", "late") is None
+    assert queue.complete(job_id, "w2", result={"ok": True})
+    assert queue.get(job_id).status == JOB_DONE
+
+
+def test_expired_lease_on_the_last_attempt_fails_the_job(queue, clock):
+    job_id = queue.submit({}, max_attempts=1)
+    queue.lease("w1", lease_seconds=30)
+
+    clock.now += 31
+    assert queue.lease("w2") is None
+    job = queue.get(job_id)
+    assert (job.status, job.error) == (JOB_FAILED, "lease expired")
+
+
+def test_failed_job_retries_after_backoff_until_attempts_run_out(queue, clock):
+    job_id = queue.submit({}, max_attempts=2)
+
+    queue.lease("w1")
+    assert queue.fail(job_id, "w1", "boom") == JOB_QUEUED
+    # Not available again until the backoff has passed
+    assert queue.lease("w1") is None
+    clock.now += JOB_RETRY_BASE_DELAY
+    assert queue.lease("w1").attempts == 2
+
+    assert queue.fail(job_id, "w1", "boom again") == JOB_FAILED
+    job = queue.get(job_id)
+    assert (job.status, job.attempts, job.error) == (JOB_FAILED, 2, "boom again")
+
+
+def test_non_retryable_failure_is_final(queue):
+    job_id = queue.submit({}, max_attempts=5)
+    queue.lease("w1")
+
+    assert queue.fail(job_id, "w1", "bad payload", retry=False) == JOB_FAILED
+
+
+def test_only_queued_jobs_can_be_cancelled(queue):
+    leased = queue.submit({}, priority=0)
+    queued = queue.submit({}, priority=1)
+    queue.lease("w1")
+
+    assert not queue.cancel(leased)
+    assert queue.cancel(queued)
+    assert queue.stats() == {"cancelled": 1, "leased": 1}
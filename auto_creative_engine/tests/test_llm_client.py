@@ -0,0 +1,80 @@
+"""
+Regression tests for the Gemini client's response cache.
+"""
+
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+import sys
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config.settings import LLMConfig
+from src.llm.backends import TextBackend
+from src.llm.llm_client import GeminiClient
+from src.services.response_cache import ResponseCache
+
+SCHEMA = {"type": "object", "properties": {"prompts": {"type": "array"}}}
+
+
+class ScriptedBackend(TextBackend):
+    """Replies with each scripted text in turn and counts the calls."""
+
+    name = 'scripted'
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.calls = 0
+
+    def content_config(self, **fields):
+        return SimpleNamespace(**fields)
+
+    async def generate_content(self, model, contents, config):
+        reply = self.replies[min(self.calls, len(self.replies) - 1)]
+        self.calls += 1
+        return SimpleNamespace(text=reply, usage_metadata=None)
+
+
+@pytest.fixture
+def make_client(tmp_path):
+    def _make(replies):
+        client = GeminiClient(api_key='test', config=LLMConfig(backend='mock', cache_enabled=False))
+        client.backend = ScriptedBackend(replies)
+        client.cache = ResponseCache(tmp_path / 'llm_cache.sqlite3')
+        return client
+    return _make
+
+
+def test_unparseable_reply_is_not_cached(make_client):
+    client = make_client(['{"prompts": [', '{"prompts": ["a"]}'])
+
+    with pytest.raises(Exception):
+        asyncio.run(client.agenerate_json("Write prompts", SCHEMA))
+    # The same request goes back to the model instead of replaying the bad reply
+    assert asyncio.run(client.agenerate_json("Write prompts", SCHEMA)) == {"prompts": ["a"]}
+    assert client.backend.calls == 2
+
+    # The good reply is cached and served without another call
+    assert asyncio.run(client.agenerate_json("Write prompts", SCHEMA)) == {"prompts": ["a"]}
+    assert client.backend.calls == 2
+
+
+def test_invalid_cached_entry_is_ignored(make_client):
+    client = make_client(['{"prompts": ["fresh"]}'])
+    full_prompt, gen_config = client._build_request("Write prompts", None, None, SCHEMA)
+    key = client._cache_key(client.model_name, full_prompt, gen_config, SCHEMA)
+    client.cache.put(key, 'not json', client.model_name)
+
+    assert asyncio.run(client.agenerate_json("Write prompts", SCHEMA)) == {"prompts": ["fresh"]}
+    assert client.backend.calls == 1
+    assert client.cache.get(key) == '{"prompts": ["fresh"]}'
+
+
+def test_refresh_skips_cache_read(make_client):
+    client = make_client(['{"prompts": ["first"]}', '{"prompts": ["second"]}'])
+
+    asyncio.run(client.agenerate_json("Write prompts", SCHEMA))
+    assert asyncio.run(client.agenerate_json("Write prompts", SCHEMA, refresh=True)) == {"prompts": ["second"]}
+    assert client.backend.calls == 2
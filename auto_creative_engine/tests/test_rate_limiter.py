@@ -0,0 +1,76 @@
+"""
+Tests for the token-bucket rate limiter.
+"""
+
+from pathlib import Path
+import sys
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.services import rate_limiter
+from src.services.rate_limiter import RateLimiter, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    return clock
+
+
+def test_reservations_queue_behind_each_other(clock):
+    bucket = TokenBucket(per_minute=60, capacity=2)
+
+    assert bucket.reserve(1) == 0.0
+    assert bucket.reserve(1) == 0.0
+    # One token a second: the third caller waits one second, the fourth two
+    assert bucket.reserve(1) == pytest.approx(1.0)
+    assert bucket.reserve(1) == pytest.approx(2.0)
+
+
+def test_bucket_refills_up_to_capacity(clock):
+    bucket = TokenBucket(per_minute=60, capacity=2)
+    bucket.reserve(2)
+
+    clock.now += 1.0
+    assert bucket.reserve(1) == 0.0
+    clock.now += 60.0
+    bucket.reserve(0)
+    assert bucket.tokens == pytest.approx(2.0)
+
+
+def test_try_reserve_never_goes_into_debt(clock):
+    bucket = TokenBucket(per_minute=60, capacity=1)
+
+    assert bucket.try_reserve(1)
+    assert not bucket.try_reserve(1)
+    assert bucket.tokens == pytest.approx(0.0)
+
+
+def test_try_acquire_gives_back_the_request_when_tokens_run_out(clock):
+    limiter = RateLimiter("model", rpm=10, tpm=100)
+
+    assert not limiter.try_acquire(500)
+    assert limiter.requests.tokens == pytest.approx(10.0)
+    assert limiter.try_acquire(50)
+    assert limiter.requests.tokens == pytest.approx(9.0)
+
+
+def test_settle_refunds_and_charges_the_difference(clock):
+    limiter = RateLimiter("model", tpm=1000)
+    limiter.tokens.reserve(300)
+
+    limiter.settle(300, 100)
+    assert limiter.tokens.tokens == pytest.approx(900.0)
+    limiter.settle(100, 400)
+    assert limiter.tokens.tokens == pytest.approx(600.0)
@@ -0,0 +1,50 @@
+"""
+Tests for the LLM response cache's eviction and bypass.
+"""
+
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.services.response_cache import ResponseCache
+
+
+def _fill(cache, count, size=10):
+    for i in range(count):
+        cache.put(f"k{i}", "x" * size, "model")
+        # Distinct, increasing access times without sleeping
+        cache._connection().execute("UPDATE responses SET last_access = ? WHERE key = ?", (i, f"k{i}"))
+
+
+def test_evicts_least_recently_used_over_entry_bound(tmp_path):
+    cache = ResponseCache(tmp_path / 'cache.sqlite3', ttl_seconds=None, max_entries=3)
+    _fill(cache, 3)
+    cache.get("k0")
+
+    cache.put("k3", "x" * 10, "model")
+
+    assert cache.get("k1") is None
+    assert all(cache.get(key) is not None for key in ("k0", "k2", "k3"))
+    assert cache.stats()["evictions"] == 1
+
+
+def test_evicts_least_recently_used_over_byte_bound(tmp_path):
+    cache = ResponseCache(tmp_path / 'cache.sqlite3', ttl_seconds=None, max_bytes=35)
+    _fill(cache, 3)
+
+    cache.put("k3", "x" * 10, "model")
+
+    assert cache.stats()["entries"] == 3
+    assert cache.get("k0") is None
+    assert cache.get("k3") is not None
+
+
+def test_bypass_skips_reads_but_refreshes(tmp_path):
+    path = tmp_path / 'cache.sqlite3'
+    ResponseCache(path).put("k", "old", "model")
+    bypassed = ResponseCache(path, bypass=True)
+
+    assert bypassed.get("k") is None
+    bypassed.put("k", "new", "model")
+    assert ResponseCache(path).get("k") == "new"
@@ -0,0 +1,158 @@
+"""
+Tests for RetryPolicy backoff, Retry-After handling, deadlines and attempt timeouts.
+"""
+
+import asyncio
+import contextlib
+from pathlib import Path
+from types import SimpleNamespace
+import sys
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.services import retry_policy
+from src.services.retry_policy import RetryPolicy, get_retry_after
+
+
+class FakeClock:
+    """Stands in for the ``time`` module; sleeping only advances the clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class APIError(Exception):
+    def __init__(self, code, headers=None, details=None):
+        super().__init__(f"{code} error")
+        self.code = code
+        self.response = SimpleNamespace(headers=headers or {})
+        self.details = details
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(retry_policy, "time", clock)
+    # Full jitter picks anywhere up to the ceiling; pin it to the ceiling
+    monkeypatch.setattr(retry_policy.random, "uniform", lambda low, high: high)
+    return clock
+
+
+def failing(errors, result="ok"):
+    """A function that raises each error in turn, then returns ``result``."""
+    errors = list(errors)
+    calls = []
+
+    def fn(*args):
+        calls.append(args)
+        if errors:
+            raise errors.pop(0)
+        return result
+
+    fn.calls = calls
+    return fn
+
+
+def test_backoff_doubles_up_to_the_cap(clock):
+    policy = RetryPolicy(max_retries=4, base_delay=1.0, max_delay=3.0, deadline=None)
+    fn = failing([APIError(503)] * 4)
+
+    assert policy.call(fn) == "ok"
+    assert clock.sleeps == [1.0, 2.0, 3.0, 3.0]
+
+
+def test_gives_up_after_max_retries(clock):
+    policy = RetryPolicy(max_retries=2, base_delay=1.0, deadline=None)
+    fn = failing([APIError(500)] * 5)
+
+    with pytest.raises(APIError):
+        policy.call(fn)
+    assert len(fn.calls) == 3
+
+
+def test_non_retryable_error_is_raised_at_once(clock):
+    fn = failing([APIError(400)])
+
+    with pytest.raises(APIError):
+        RetryPolicy().call(fn)
+    assert len(fn.calls) == 1
+    assert clock.sleeps == []
+
+
+def test_retry_after_header_sets_the_delay(clock):
+    policy = RetryPolicy(base_delay=1.0, max_delay=2.0, deadline=None)
+    fn = failing([APIError(429, headers={"retry-after": "5"})])
+
+    policy.call(fn)
+    # The server's delay wins over backoff, capped at four times max_delay
+    assert clock.sleeps == [5.0]
+
+
+def test_retry_after_is_capped(clock):
+    policy = RetryPolicy(max_delay=2.0, deadline=None)
+    policy.call(failing([APIError(429, headers={"retry-after": "60"})]))
+    assert clock.sleeps == [8.0]
+
+
+def test_retry_info_details_are_read():
+    assert get_retry_after(APIError(429, details={"retryDelay": "12s"})) == 12.0
+    assert get_retry_after(APIError(429)) is None
+
+
+def test_deadline_stops_retries(clock):
+    policy = RetryPolicy(max_retries=10, base_delay=4.0, max_delay=4.0, deadline=10.0)
+    fn = failing([APIError(503)] * 10)
+
+    with pytest.raises(APIError):
+        policy.call(fn)
+    assert clock.sleeps == [4.0, 4.0]
+
+
+def test_timed_call_receives_the_attempt_timeout(clock):
+    policy = RetryPolicy(base_delay=4.0, max_delay=4.0, deadline=10.0, attempt_timeout=8.0)
+    fn = failing([APIError(503)])
+
+    policy.call(fn, timed=True)
+    # The second attempt only has what is left of the deadline
+    assert fn.calls == [(8.0,), (6.0,)]
+
+
+def test_async_slot_wait_does_not_count_against_the_attempt():
+    @contextlib.asynccontextmanager
+    async def slot():
+        await asyncio.sleep(0.2)
+        yield
+
+    async def fn():
+        await asyncio.sleep(0.01)
+        return "ok"
+
+    policy = RetryPolicy(max_retries=0, attempt_timeout=0.1, deadline=None)
+    assert asyncio.run(policy.acall(fn, slot=slot)) == "ok"
+
+
+def test_stalled_image_request_is_cut_at_the_attempt_timeout():
+    from src.config.settings import ImageGenConfig, MockBackendConfig
+    from src.image_gen.gemini_image_client import GeminiImageClient
+
+    config = ImageGenConfig(
+        backend='mock', mock=MockBackendConfig(image_latency='fixed:30'), timeout=0.1, cache_enabled=False
+    )
+    client = GeminiImageClient(config=config)
+    client.retry_policy.max_retries = 0
+
+    with pytest.raises(TimeoutError):
+        client._request_images("A steel bottle")
@@ -153,11 +153,18 @@ def render_sidebar():
             help="Creative theme style"
         )
 
+        caption_tone = st.text_input(
+            "Caption Tone",
+            value="",
+            help="Tone for captions only (e.g. witty); changing it rewrites captions without re-rendering images"
+        )
+
         return {
             "api_key": api_key,
             "num_creatives": num_creatives,
             "brand_name": brand_name,
-            "theme": theme
+            "theme": theme,
+            "caption_tone": caption_tone
         }
 
 
@@ -266,6 +273,39 @@ def render_prompt_caption_panel(
             st.caption("Captions will appear after generation.")
 
 
+def render_usage_panel(usage: Optional[dict] = None) -> None:
+    """Show token, image and estimated cost usage for a run."""
+    if not usage:
+        return
+
+    totals = usage.get("totals", {})
+    st.subheader("💰 Usage & Cost")
+    cols = st.columns(4)
+    with cols[0]:
+        st.metric("Estimated Cost", f"${totals.get('cost_usd', 0.0):.4f}")
+    with cols[1]:
+        st.metric("Tokens", f"{totals.get('total_tokens', 0):,}")
+    with cols[2]:
+        st.metric("Images Billed", totals.get("images", 0))
+    with cols[3]:
+        st.metric("Cached Calls", f"{totals.get('cached_calls', 0)}/{totals.get('calls', 0)}")
+
+    with st.expander("Usage by stage"):
+        st.table([
+            {
+                "Stage": stage,
+                "Calls": b["calls"],
+                "Cached": b["cached_calls"],
+                "Input tokens": b["input_tokens"],
+                "Output tokens": b["output_tokens"],
+                "Images": b["images"],
+                "Cost ($)": round(b["cost_usd"], 4),
+            }
+            for stage, b in usage.get("stages", {}).items()
+        ])
+        st.caption(f"Run {usage.get('run_id')} · prices are list-price estimates")
+
+
 def render_download_section(zip_path: Optional[Path] = None):
     """Render download section."""
     st.subheader("📥 Download Output")